@@ -0,0 +1,216 @@
+"""Interchangeable regex engines for secret pattern scanning.
+
+A backend runs every secret pattern over a piece of content and returns
+per-pattern match lists, exactly like running ``pattern.finditer`` with
+Python's ``re``. The engine is chosen once, when a `PatternMatcher` is
+built, from ``SANITIZER_REGEX_BACKEND``:
+
+- ``re``: the single-pass literal-prefix scanner (`MultiPatternScanner`)
+- ``regex``: the ``regex`` module, matching with the GIL released
+- ``re2``: RE2 via ``pyre2`` or ``google-re2`` (linear-time matching)
+- ``hyperscan``: one Hyperscan pass decides which patterns occur at all;
+  only those are run with ``re``
+- ``auto``: the first of hyperscan, re2, regex and re that is installed
+
+The optional engines are installed with ``pip install neverdown[scan-engines]``.
+Backends that are not installed or fail to compile fall back to ``re``.
+Patterns an engine cannot compile (e.g. lookarounds under RE2) are run
+with ``re`` individually. RE2 and Hyperscan use ASCII character classes
+(``\\s`` excludes ``\\v`` and ``\\x1c``-``\\x1f``), so content outside
+the characters where both engines agree with ``re`` is scanned with
+``re`` instead.
+"""
+
+import importlib
+import re
+from typing import TYPE_CHECKING, Any, List, Optional, Pattern, Tuple
+
+from agents.agent_0_sanitizer.scanner import MultiPatternScanner
+from config.logging_config import get_logger
+
+if TYPE_CHECKING:
+    from agents.agent_0_sanitizer.patterns import SecretPattern
+
+logger = get_logger(__name__)
+
+# Preference order for "auto"
+AUTO_ORDER = ("hyperscan", "re2", "regex", "re")
+
+# Characters outside these are matched differently by ASCII-only engines
+_NON_PORTABLE = re.compile(r'[^\x00-\x0a\x0c-\x1b\x20-\x7f]')
+
+_INLINE_FLAGS = ((re.IGNORECASE, "i"), (re.MULTILINE, "m"), (re.DOTALL, "s"), (re.VERBOSE, "x"))
+
+
+def is_portable(content: str) -> bool:
+    """Check if ASCII-only engines match ``content`` exactly like ``re``."""
+    return _NON_PORTABLE.search(content) is None
+
+
+def _inline_pattern(pattern: Pattern[str]) -> str:
+    """Pattern source with its compile flags written as an inline group."""
+    flags = "".join(char for flag, char in _INLINE_FLAGS if pattern.flags & flag)
+    return f"(?{flags}){pattern.pattern}" if flags else pattern.pattern
+
+
+class ReBackend(MultiPatternScanner):
+    """Python ``re`` with the single-pass literal prefilter."""
+
+    name = "re"
+
+
+class RegexBackend:
+    """The ``regex`` module, releasing the GIL while matching."""
+
+    name = "regex"
+
+    def __init__(self, patterns: List["SecretPattern"]):
+        regex = importlib.import_module("regex")
+        self.patterns = patterns
+        self._compiled = [regex.compile(p.pattern.pattern, p.pattern.flags) for p in patterns]
+
+    def scan(self, content: str) -> List[List[Any]]:
+        """Run every pattern over the content, like `MultiPatternScanner.scan`."""
+        return [list(compiled.finditer(content, concurrent=True)) for compiled in self._compiled]
+
+
+class Re2Backend:
+    """RE2 for patterns it supports, ``re`` for the rest."""
+
+    name = "re2"
+
+    def __init__(self, patterns: List["SecretPattern"]):
+        re2 = importlib.import_module("re2")
+        self.patterns = patterns
+        self._compiled: List[Optional[Any]] = []
+        for secret_pattern in patterns:
+            try:
+                self._compiled.append(re2.compile(_inline_pattern(secret_pattern.pattern)))
+            except Exception:
+                self._compiled.append(None)  # Unsupported syntax
+
+    def scan(self, content: str) -> List[List[Any]]:
+        """Run every pattern over the content, like `MultiPatternScanner.scan`."""
+        portable = is_portable(content)
+        return [
+            list(compiled.finditer(content)) if compiled is not None and portable
+            else secret_pattern.find_matches(content)
+            for secret_pattern, compiled in zip(self.patterns, self._compiled)
+        ]
+
+
+class HyperscanBackend:
+    """Hyperscan as an exact filter in front of ``re``.
+
+    Hyperscan reports every match end rather than ``finditer``'s
+    leftmost non-overlapping matches, so it is only asked which patterns
+    match anywhere in the content (one pass for all of them). Those
+    patterns are then run with ``re``; the rest are skipped.
+    """
+
+    name = "hyperscan"
+
+    def __init__(self, patterns: List["SecretPattern"]):
+        hyperscan = importlib.import_module("hyperscan")
+        self.patterns = patterns
+
+        # Case folding differs from re beyond ASCII, so caseless patterns always run
+        supported: List[Tuple[int, bytes, int]] = []
+        self._always: List[int] = []
+        for index, secret_pattern in enumerate(patterns):
+            pattern = secret_pattern.pattern
+            if pattern.flags & (re.IGNORECASE | re.VERBOSE):
+                self._always.append(index)
+                continue
+
+            flags = hyperscan.HS_FLAG_SINGLEMATCH
+            if pattern.flags & re.MULTILINE:
+                flags |= hyperscan.HS_FLAG_MULTILINE
+            if pattern.flags & re.DOTALL:
+                flags |= hyperscan.HS_FLAG_DOTALL
+            expression = pattern.pattern.encode()
+            try:
+                hyperscan.Database().compile(expressions=[expression], ids=[index], flags=[flags])
+            except Exception:
+                self._always.append(index)  # Unsupported syntax
+                continue
+            supported.append((index, expression, flags))
+
+        self._database = None
+        if supported:
+            self._database = hyperscan.Database()
+            self._database.compile(
+                expressions=[expression for _, expression, _ in supported],
+                ids=[index for index, _, _ in supported],
+                flags=[flags for _, _, flags in supported],
+            )
+
+    def scan(self, content: str) -> List[List[Any]]:
+        """Run every pattern over the content, like `MultiPatternScanner.scan`."""
+        if self._database is None or not is_portable(content):
+            return [p.find_matches(content) for p in self.patterns]
+
+        hits = set(self._always)
+
+        def on_match(index: int, start: int, end: int, flags: int, context: Any) -> None:
+            hits.add(index)
+
+        self._database.scan(content.encode("ascii"), match_event_handler=on_match)
+
+        return [
+            secret_pattern.find_matches(content) if index in hits else []
+            for index, secret_pattern in enumerate(self.patterns)
+        ]
+
+
+BACKENDS = {
+    "re": ReBackend,
+    "regex": RegexBackend,
+    "re2": Re2Backend,
+    "hyperscan": HyperscanBackend,
+}
+
+
+def available_backends() -> List[str]:
+    """Names of the backends whose engine is installed."""
+    names = []
+    for name in BACKENDS:
+        if name == "re":
+            names.append(name)
+            continue
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def create_backend(name: str, patterns: List["SecretPattern"]):
+    """Build the scanning backend ``name`` for a list of patterns.
+
+    Args:
+        name: Backend name from `BACKENDS`, or "auto"
+        patterns: Secret patterns in priority order
+
+    Returns:
+        A backend with ``name``, ``patterns`` and ``scan(content)``;
+        `ReBackend` if the requested engine is unavailable
+    """
+    name = (name or "re").lower()
+    candidates = AUTO_ORDER if name == "auto" else (name,)
+
+    for candidate in candidates:
+        backend_cls = BACKENDS.get(candidate)
+        if backend_cls is None:
+            logger.warning("Unknown regex backend, using re", backend=candidate)
+            break
+        try:
+            return backend_cls(patterns)
+        except ImportError:
+            if name != "auto":
+                logger.warning("Regex backend not installed, using re", backend=candidate)
+        except Exception as e:
+            logger.warning("Regex backend failed to compile, using re", backend=candidate, error=str(e))
+
+    return ReBackend(patterns)
@@ -0,0 +1,246 @@
+"""Content-addressed cache of sanitization results.
+
+Files are keyed by their git blob SHA (``sha1("blob <size>\\0" + data)``),
+computed from the bytes on disk so it always matches what is scanned,
+together with the rule-set version of the `PatternMatcher` that produced
+the result. A hit returns the redacted content and the entries found,
+so byte-identical files are never scanned twice.
+
+Only sanitizer output is stored: redacted text and placeholder entries.
+Original secret values never reach the cache.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from models.analysis import SanitizationEntry
+
+# Bump when the stored format or the sanitization algorithm changes
+CACHE_FORMAT_VERSION = 3
+
+# Pending writes are flushed once this many accumulate
+FLUSH_THRESHOLD = 256
+
+
+def git_blob_sha(data: bytes) -> str:
+    """Compute the git blob SHA-1 of raw file content.
+
+    Args:
+        data: File bytes
+
+    Returns:
+        Hex digest identical to ``git hash-object``
+    """
+    digest = hashlib.sha1(b"blob %d\0" % len(data))
+    digest.update(data)
+    return digest.hexdigest()
+
+
+@dataclass
+class CachedResult:
+    """A cached sanitization result for one file's content."""
+    redacted_content: Optional[str]  # None when the file had no secrets
+    entries: List[Dict[str, Any]]
+
+    def to_entries(self, rel_path: str) -> List[SanitizationEntry]:
+        """Rebuild sanitization entries for a file path."""
+        return [SanitizationEntry(file_path=rel_path, **entry) for entry in self.entries]
+
+
+class SanitizationCache:
+    """Persistent LRU cache of sanitization results, bounded by size.
+
+    Backed by SQLite so it can be shared by the API process and the
+    sanitizer's pool workers. Lookups are served immediately; new results
+    and access-time updates are buffered and written in batches. One
+    instance may be used from several threads.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int, ruleset_version: str):
+        """Open (or create) the cache.
+
+        Args:
+            cache_dir: Directory holding the cache database
+            max_bytes: Size budget enforced by `evict`
+            ruleset_version: Version of the rules producing cached results
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.ruleset_version = ruleset_version
+        self.hits = 0
+        self.misses = 0
+
+        self._pending_puts: List[Tuple[str, Optional[str], str, int, float]] = []
+        self._pending_touches: Dict[str, float] = {}
+        self._lock = threading.RLock()
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            self.cache_dir / "sanitizer-cache.db", timeout=30, check_same_thread=False,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                redacted TEXT,
+                entries TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access)"
+        )
+        self._conn.commit()
+
+    def make_key(self, blob_sha: str, include_entropy: bool, file_format: Optional[str]) -> str:
+        """Build the cache key for a file's content and scan mode.
+
+        Args:
+            blob_sha: Git blob SHA of the content
+            include_entropy: Whether entropy detection was enabled
+            file_format: Config format the file was parsed as, or None
+
+        Returns:
+            Cache key
+        """
+        return (
+            f"v{CACHE_FORMAT_VERSION}:{self.ruleset_version}:"
+            f"{int(include_entropy)}{file_format or '-'}:{blob_sha}"
+        )
+
+    def get(self, key: str) -> Optional[CachedResult]:
+        """Look up a cached result, counting the hit or miss.
+
+        Database errors are treated as misses so a broken cache only costs
+        a rescan, never a skipped file.
+        """
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT redacted, entries FROM results WHERE key = ?", (key,)
+                ).fetchone()
+            except sqlite3.Error:
+                row = None
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._pending_touches[key] = time.time()
+            if len(self._pending_touches) >= FLUSH_THRESHOLD:
+                self.flush()
+            return CachedResult(redacted_content=row[0], entries=json.loads(row[1]))
+
+    def put(
+        self,
+        key: str,
+        redacted_content: Optional[str],
+        entries: List[SanitizationEntry],
+    ) -> None:
+        """Store the result of sanitizing a file's content.
+
+        Args:
+            key: Cache key from `make_key`
+            redacted_content: Redacted text, or None if nothing was redacted
+            entries: Entries found in the content
+        """
+        with self._lock:
+            serialized = json.dumps([entry.model_dump(exclude={"file_path"}) for entry in entries])
+            size = len(serialized) + (len(redacted_content) if redacted_content else 0)
+            self._pending_puts.append((key, redacted_content, serialized, size, time.time()))
+            if len(self._pending_puts) >= FLUSH_THRESHOLD:
+                self.flush()
+
+    def flush(self) -> None:
+        """Write buffered results and access times to disk.
+
+        Writes that fail (e.g. the database stays locked) are dropped; the
+        affected files are simply scanned again next time.
+        """
+        with self._lock:
+            if not self._pending_puts and not self._pending_touches:
+                return
+
+            try:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO results (key, redacted, entries, size, last_access) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        self._pending_puts,
+                    )
+                    self._conn.executemany(
+                        "UPDATE results SET last_access = ? WHERE key = ?",
+                        [(accessed, key) for key, accessed in self._pending_touches.items()],
+                    )
+            except sqlite3.Error:
+                pass
+            finally:
+                self._pending_puts.clear()
+                self._pending_touches.clear()
+
+    def total_size(self) -> int:
+        """Total size of cached results, in bytes."""
+        with self._lock:
+            row = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()
+            return int(row[0])
+
+    def evict(self) -> int:
+        """Drop least recently used results until the cache fits its budget.
+
+        Returns:
+            Number of results evicted
+        """
+        with self._lock:
+            self.flush()
+            excess = self.total_size() - self.max_bytes
+            if excess <= 0:
+                return 0
+
+            victims: List[str] = []
+            for key, size in self._conn.execute(
+                "SELECT key, size FROM results ORDER BY last_access"
+            ):
+                victims.append(key)
+                excess -= size
+                if excess <= 0:
+                    break
+
+            with self._conn:
+                self._conn.executemany("DELETE FROM results WHERE key = ?", [(k,) for k in victims])
+            return len(victims)
+
+    def close(self) -> None:
+        """Flush pending writes and close the database."""
+        with self._lock:
+            self.flush()
+            self._conn.close()
+
+
+def open_cache(
+    cache_dir: Optional[str],
+    max_bytes: int,
+    ruleset_version: str,
+) -> Optional[SanitizationCache]:
+    """Open the sanitization cache, or return None if it is disabled.
+
+    A cache that cannot be opened (read-only disk, corrupt database)
+    disables caching instead of failing sanitization.
+    """
+    if not cache_dir:
+        return None
+    try:
+        return SanitizationCache(os.path.expanduser(cache_dir), max_bytes, ruleset_version)
+    except (OSError, sqlite3.Error):
+        return None
@@ -0,0 +1,81 @@
+"""Text/binary classification of files from the bytes already read.
+
+Files are classified by extension while walking (no I/O) and by content
+once they are read for scanning, so each file is opened only once. A
+file is binary if its first `NUL_SNIFF_BYTES` contain a NUL byte, or if
+it starts with a known magic signature and its first `SNIFF_BYTES` are
+not valid UTF-8. Text in legacy 8-bit encodings is still scanned.
+"""
+
+import codecs
+from pathlib import Path
+
+# Bytes inspected along with a magic signature
+SNIFF_BYTES = 8000
+
+# Bytes inspected for NULs. Binary files are not scanned, so a wider
+# window than this would let text with a late NUL skip redaction.
+NUL_SNIFF_BYTES = 1024
+
+BINARY_EXTENSIONS = frozenset({
+    '.png', '.jpg', '.jpeg', '.gif', '.ico', '.bmp', '.webp',
+    '.pdf', '.doc', '.docx', '.xls', '.xlsx',
+    '.zip', '.tar', '.gz', '.rar', '.7z',
+    '.exe', '.dll', '.so', '.dylib',
+    '.pyc', '.pyo', '.class',
+    '.woff', '.woff2', '.ttf', '.eot',
+    '.mp3', '.mp4', '.wav', '.avi', '.mov',
+})
+
+MAGIC_SIGNATURES = (
+    b'\x89PNG\r\n\x1a\n', b'\xff\xd8\xff', b'GIF87a', b'GIF89a', b'BM', b'II*\x00', b'MM\x00*',
+    b'RIFF', b'OggS', b'ID3', b'fLaC',                          # Images and media
+    b'%PDF-', b'PK\x03\x04', b'PK\x05\x06', b'\x1f\x8b', b'BZh', b'\xfd7zXZ\x00',
+    b"7z\xbc\xaf'\x1c", b'Rar!\x1a\x07', b'(\xb5/\xfd',         # Documents and archives
+    b'\x7fELF', b'MZ', b'\xca\xfe\xba\xbe', b'\xfe\xed\xfa\xce', b'\xfe\xed\xfa\xcf',
+    b'\xce\xfa\xed\xfe', b'\xcf\xfa\xed\xfe', b'\x00asm',        # Executables
+    b'wOFF', b'wOF2', b'SQLite format 3\x00',
+)
+
+
+def has_binary_extension(file_path: Path) -> bool:
+    """Check if a file's extension marks it as binary."""
+    return file_path.suffix.lower() in BINARY_EXTENSIONS
+
+
+def _is_utf8(head: bytes) -> bool:
+    """Check if bytes are valid UTF-8, allowing a character cut off at the end."""
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(head, final=False)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def is_binary(data: bytes) -> bool:
+    """Check if file content (or its first `SNIFF_BYTES`) is binary.
+
+    Args:
+        data: File content, or a prefix of at least `SNIFF_BYTES`
+
+    Returns:
+        True if the content should not be scanned as text
+    """
+    if b'\x00' in data[:NUL_SNIFF_BYTES]:
+        return True
+    head = data[:SNIFF_BYTES]
+    return head.startswith(MAGIC_SIGNATURES) and not _is_utf8(head)
+
+
+def is_binary_file(file_path: Path) -> bool:
+    """Classify a file that has not been read, by extension and then content.
+
+    Unreadable files count as binary.
+    """
+    if has_binary_extension(file_path):
+        return True
+    try:
+        with open(file_path, 'rb') as f:
+            return is_binary(f.read(SNIFF_BYTES))
+    except OSError:
+        return True
@@ -0,0 +1,186 @@
+"""Global index of file contents known to contain no secrets.
+
+Holds the git blob SHAs of files the sanitizer has scanned, under the
+current rule set, without a single pattern or entropy match. Before a
+tracked file is read, its blob SHA and size are taken from
+``git ls-tree``; if the SHA is in the index and the checkout has the
+blob's size, the file is linked unread. Vendored libraries, licences
+and lockfiles seen in any monitored repository cost one ``stat``.
+
+The index is a sorted array of raw 20-byte SHAs in one file, searched
+by bisection, so it takes 20 bytes per blob on disk and in memory. Its
+file name carries the rule-set version: results from other rules are
+never consulted, and their files are deleted when the index is opened.
+
+Only plain source files are recorded (see `config_format`), and only
+from scans with entropy detection on, so a hit is valid for any scan.
+A size mismatch (LFS pointers, encrypted or eol-converted checkouts)
+always falls back to reading the file.
+"""
+
+import os
+import tempfile
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+from agents.agent_0_sanitizer.cache import CACHE_FORMAT_VERSION
+from agents.agent_0_sanitizer.incremental import run_git
+
+RECORD_SIZE = 20
+
+# The index starts over once it would exceed this many blobs
+MAX_ENTRIES = 2_000_000
+
+# Tracked regular files (not symlinks or submodules)
+_REGULAR_MODES = (b"100644", b"100755")
+
+
+class _Records:
+    """Sequence view of fixed-size records in a bytes object, for bisect."""
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+    def __len__(self) -> int:
+        return len(self.data) // RECORD_SIZE
+
+    def __getitem__(self, i: int) -> bytes:
+        return self.data[i * RECORD_SIZE:(i + 1) * RECORD_SIZE]
+
+
+class CleanIndex:
+    """Persistent set of blob SHAs proven free of secrets."""
+
+    def __init__(self, index_dir: str, ruleset_version: str, max_entries: int = MAX_ENTRIES):
+        """Open the index for a rule set, deleting indexes of other rule sets.
+
+        Args:
+            index_dir: Directory holding index files
+            ruleset_version: `PatternMatcher.ruleset_version` of the scans
+            max_entries: Size at which the index starts over
+        """
+        self.index_dir = Path(index_dir)
+        self.max_entries = max_entries
+        self.path = self.index_dir / f"clean-v{CACHE_FORMAT_VERSION}-{ruleset_version}.idx"
+
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        for stale in self.index_dir.glob("clean-*.idx"):
+            if stale != self.path:
+                stale.unlink(missing_ok=True)
+
+        self._records = _Records(self._load())
+        self._pending: Set[bytes] = set()
+
+    def _load(self) -> bytes:
+        """Read the index file, treating a missing or torn file as empty."""
+        try:
+            data = self.path.read_bytes()
+        except FileNotFoundError:
+            return b""
+        return data if len(data) % RECORD_SIZE == 0 else b""
+
+    def __len__(self) -> int:
+        return len(self._records) + len(self._pending)
+
+    def __contains__(self, blob_sha: str) -> bool:
+        digest = bytes.fromhex(blob_sha)
+        if digest in self._pending:
+            return True
+        i = bisect_left(self._records, digest)
+        return i < len(self._records) and self._records[i] == digest
+
+    def add(self, blob_sha: str) -> None:
+        """Record a blob as clean (persisted by `flush`)."""
+        self._pending.add(bytes.fromhex(blob_sha))
+
+    def flush(self) -> None:
+        """Merge pending blobs into the index file.
+
+        The file is re-read first so blobs added by other processes are
+        kept, then replaced atomically. Concurrent flushes can drop each
+        other's additions, which only costs a rescan later.
+        """
+        if not self._pending:
+            return
+
+        current = self._load()
+        merged = {current[i:i + RECORD_SIZE] for i in range(0, len(current), RECORD_SIZE)}
+        merged |= self._pending
+        if len(merged) > self.max_entries:
+            merged = self._pending
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.index_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(b"".join(sorted(merged)))
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+        self._records = _Records(b"".join(sorted(merged)))
+        self._pending = set()
+
+
+def open_clean_index(index_dir: Optional[str], ruleset_version: str) -> Optional[CleanIndex]:
+    """Open the known-clean index, or return None if it is disabled.
+
+    An index that cannot be opened disables the short-circuit instead of
+    failing sanitization.
+    """
+    if not index_dir:
+        return None
+    try:
+        return CleanIndex(os.path.expanduser(index_dir), ruleset_version)
+    except OSError:
+        return None
+
+
+def parse_ls_tree(output: bytes) -> Dict[str, Tuple[str, int]]:
+    """Parse ``git ls-tree -r -l -z`` output into regular files' blobs.
+
+    Args:
+        output: Raw NUL-separated listing
+
+    Returns:
+        (blob SHA, size) per path
+    """
+    blobs: Dict[str, Tuple[str, int]] = {}
+    for entry in output.split(b"\0"):
+        if not entry:
+            continue
+        meta, _, path = entry.partition(b"\t")
+        mode, kind, sha, size = meta.split()
+        if kind != b"blob" or mode not in _REGULAR_MODES:
+            continue
+        blobs[path.decode("utf-8", errors="surrogateescape")] = (sha.decode(), int(size))
+    return blobs
+
+
+async def tracked_blobs(repo_path: Path) -> Dict[str, Tuple[str, int]]:
+    """Blob SHA and size of every tracked file whose checkout matches HEAD.
+
+    Args:
+        repo_path: Git checkout
+
+    Returns:
+        (blob SHA, size) per path relative to the repository root; empty
+        if ``repo_path`` is not a git checkout
+    """
+    if not (repo_path / ".git").exists():
+        return {}
+
+    listing = await run_git(repo_path, "ls-tree", "-r", "-l", "-z", "--full-tree", "HEAD")
+    # Porcelain diff refreshes stat data first: linking files into a shadow
+    # repository changes their ctime, which plumbing reports as a change
+    modified = await run_git(
+        repo_path, "diff", "--no-ext-diff", "--no-renames", "--name-only", "-z", "HEAD",
+    )
+    if listing is None or modified is None:
+        return {}
+
+    blobs = parse_ls_tree(listing)
+    for path in modified.decode("utf-8", errors="surrogateescape").split("\0"):
+        blobs.pop(path, None)
+    return blobs
@@ -0,0 +1,228 @@
+"""Key/value secret detection for .env, .properties, .ini and YAML files.
+
+Each format has one line parser, compiled at import and run over the
+whole file with a single ``finditer``. .env keys are classified by one
+regex alternation of every secret-key indicator rather than a substring
+test per indicator. Keys in the other formats are ordinary config keys
+(``author``, ``keywords``), so there an indicator must match whole key
+segments, and a lone ``key`` or ``auth`` does not count: manifests use
+them structurally (``secretKeyRef: {key: db-password}``,
+``primary_key: id``, ``auth: basic``). Values that only qualify through their entropy are scored
+together in one `high_entropy_flags` batch per file.
+
+.env files are redacted with these matches alone (see
+`Redactor.redact_env_file`). Matches in the other formats are added to
+the named-pattern and entropy matches for the file; a named pattern
+still labels any secret it also covers (see `merging`).
+"""
+
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Pattern, Tuple
+
+from agents.agent_0_sanitizer.entropy import high_entropy_flags
+from agents.agent_0_sanitizer.merging import CONFIG_PATTERN_NAME, ENV_PATTERN_NAME
+from agents.agent_0_sanitizer.patterns import SecretMatch
+
+# Key substrings that mark a value as secret (case-insensitive)
+SECRET_KEY_INDICATORS = (
+    "password", "passwd", "pwd", "secret", "token", "key",
+    "api_key", "apikey", "auth", "credential", "private",
+    "access_key", "secret_key", "db_pass", "database_password",
+)
+
+# Config formats by file suffix (.env files are matched by name)
+CONFIG_SUFFIXES = {
+    ".properties": "properties",
+    ".ini": "ini",
+    ".cfg": "ini",
+    ".yaml": "yaml",
+    ".yml": "yaml",
+}
+
+SECRET_URL_PREFIXES = ("postgresql://", "mysql://", "mongodb://")
+
+_KEY_INDICATOR = re.compile("|".join(map(re.escape, SECRET_KEY_INDICATORS)), re.IGNORECASE)
+
+# Words of a key, split at "_", ".", "-" and camelCase boundaries
+_KEY_SEGMENT = re.compile(r'[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+')
+# Indicators that are ordinary words on their own outside .env files;
+# compounds such as api_key, access_key or authToken still match
+STRUCTURAL_INDICATORS = ("key", "auth")
+_INDICATOR_SEGMENTS = tuple(
+    tuple(i.split("_")) for i in SECRET_KEY_INDICATORS if i not in STRUCTURAL_INDICATORS
+)
+_ENTROPY_VALUE = re.compile(r'[A-Za-z0-9+/=\-_]+')
+
+# Whitespace and "#" starting a YAML comment after a value
+_YAML_COMMENT = re.compile(r'[^\S\n]+#')
+
+# Whitespace within a line
+_H = r'[^\S\n]*'
+
+_PARSERS: Dict[str, Pattern[str]] = {
+    # KEY=VALUE
+    "env": re.compile(rf'^{_H}(?P<key>[A-Za-z_][A-Za-z0-9_]*)=(?P<value>.*?){_H}$', re.MULTILINE),
+    # key=value or key: value
+    "properties": re.compile(
+        rf'^{_H}(?P<key>[A-Za-z_][\w.\-]*){_H}[=:]{_H}(?P<value>.*?){_H}$', re.MULTILINE,
+    ),
+    "ini": re.compile(
+        rf'^{_H}(?P<key>[A-Za-z_][\w.\-]*){_H}[=:]{_H}(?P<value>.*?){_H}$', re.MULTILINE,
+    ),
+    # key: value, optionally as a list item, or a compose-style "- KEY=value"
+    "yaml": re.compile(
+        rf'^{_H}(?:-{_H})?'
+        rf'(?:["\']?(?P<key>[A-Za-z_][\w.\-]*)["\']?{_H}:[^\S\n]+'
+        rf'|(?P<list_key>[A-Za-z_][A-Za-z0-9_]*)=)'
+        rf'(?P<value>.*?){_H}$',
+        re.MULTILINE,
+    ),
+}
+
+# Values that are not literals: references, booleans and, in YAML, block
+# scalars, aliases, flow collections and comments. Anything else (quoted
+# text, anchored or tagged values) is treated as a possible secret.
+_KEYWORD = r'(?i:~|null|true|false|yes|no|on|off)$'
+_NOT_A_LITERAL: Dict[str, Pattern[str]] = {
+    "properties": re.compile(rf'\$\{{|{_KEYWORD}'),
+    "ini": re.compile(rf'\$\{{|%\(|{_KEYWORD}'),
+    "yaml": re.compile(rf'[|>*\[{{#]|\$\{{|\$\(|{_KEYWORD}'),
+}
+
+
+def config_format(file_path: Path) -> Optional[str]:
+    """Config format a file is parsed as for key/value secrets, if any.
+
+    Returns:
+        "env", "properties", "ini" or "yaml", or None for other files
+    """
+    if file_path.name.startswith('.env') or file_path.suffix == '.env':
+        return "env"
+    return CONFIG_SUFFIXES.get(file_path.suffix.lower())
+
+
+@lru_cache(maxsize=4096)
+def is_secret_key(key: str) -> bool:
+    """Check if a key name suggests its value is a secret (memoized: the
+    same variable names recur across a repository's config files)."""
+    return _KEY_INDICATOR.search(key) is not None
+
+
+@lru_cache(maxsize=4096)
+def is_secret_key_segments(key: str) -> bool:
+    """Check if whole segments of a key name form a secret-key indicator,
+    so ``authToken`` and ``db.password`` qualify but ``author`` and a
+    lone ``key`` do not."""
+    words = tuple(word.lower() for word in _KEY_SEGMENT.findall(key))
+    return any(
+        words[i:i + len(indicator)] == indicator
+        for indicator in _INDICATOR_SEGMENTS
+        for i in range(len(words) - len(indicator) + 1)
+    )
+
+
+def _strip_yaml_comment(value: str) -> str:
+    """A YAML value without its trailing comment, if any."""
+    search_from = 0
+    if value[:1] in ('"', "'"):
+        closing = value.find(value[0], 1)
+        if closing != -1:
+            search_from = closing + 1
+    comment = _YAML_COMMENT.search(value, search_from)
+    return value[:comment.start()] if comment else value
+
+
+def _value_verdict(value: str) -> Optional[bool]:
+    """Classify a value on its own: secret, not secret, or None if only
+    its entropy can tell."""
+    value = value.strip("\"'")
+
+    # Empty or placeholder values are not secrets
+    if not value or value.startswith("<") or value == "xxx":
+        return False
+
+    if value.startswith(SECRET_URL_PREFIXES):
+        return True
+
+    if len(value) > 20 and _ENTROPY_VALUE.fullmatch(value):
+        return None
+    return False
+
+
+def _placeholder(value: str) -> str:
+    """Redaction placeholder, keeping any quotes around the value."""
+    if value.startswith('"') and value.endswith('"'):
+        return '"<REDACTED>"'
+    if value.startswith("'") and value.endswith("'"):
+        return "'<REDACTED>'"
+    return "<REDACTED>"
+
+
+def find_config_secrets(content: str, file_format: str) -> List[SecretMatch]:
+    """Find secret values in config file content.
+
+    A value is secret if its key contains a `SECRET_KEY_INDICATORS`
+    entry (as whole key segments, not a lone ``key``/``auth``, outside
+    .env files), or if it is a
+    database URL or a long high-entropy token.
+
+    Args:
+        content: Decoded file content
+        file_format: Format from `config_format`
+
+    Returns:
+        One match per secret value, spanning the value (with any quotes),
+        sorted by position
+    """
+    parser = _PARSERS[file_format]
+    not_a_literal = _NOT_A_LITERAL.get(file_format)
+    pattern_name = ENV_PATTERN_NAME if file_format == "env" else CONFIG_PATTERN_NAME
+    secret_key = is_secret_key if file_format == "env" else is_secret_key_segments
+
+    matches: List[SecretMatch] = []
+    # (index into matches, value) of values that hinge on their entropy
+    undecided: List[Tuple[int, str]] = []
+    line_number = 1
+    position = 0
+
+    for match in parser.finditer(content):
+        key, value = match.group("key", "value")
+        if file_format == "yaml":
+            value = _strip_yaml_comment(value)
+        if not_a_literal is not None and (not value or not_a_literal.match(value)):
+            continue
+
+        if key is None:
+            key = match.group("list_key")  # YAML "- KEY=value"
+        if secret_key(key):
+            verdict: Optional[bool] = True
+        else:
+            verdict = _value_verdict(value)
+            if verdict is False:
+                continue
+
+        start = match.start("value")
+        line_number += content.count("\n", position, start)
+        position = start
+
+        if verdict is None:
+            undecided.append((len(matches), value.strip("\"'")))
+        matches.append(SecretMatch(
+            pattern_name=pattern_name,
+            match=value,
+            start=start,
+            end=start + len(value),
+            line_number=line_number,
+            placeholder=_placeholder(value),
+            severity="high",
+        ))
+
+    if not undecided:
+        return matches
+
+    # Score every entropy-only candidate at once and drop the low ones
+    flags = high_entropy_flags([value for _, value in undecided])
+    rejected = {index for (index, _), flagged in zip(undecided, flags) if not flagged}
+    return [m for i, m in enumerate(matches) if i not in rejected]
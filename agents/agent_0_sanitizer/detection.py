@@ -0,0 +1,45 @@
+"""Secret detection shared by the whole-file and streaming sanitizers."""
+
+from typing import List, Optional
+
+from agents.agent_0_sanitizer.config_files import find_config_secrets
+from agents.agent_0_sanitizer.lines import LineIndex
+from agents.agent_0_sanitizer.merging import resolve_overlaps
+from agents.agent_0_sanitizer.patterns import PatternMatcher, SecretMatch
+
+
+def detect_secrets(
+    content: str,
+    rel_path: str,
+    include_entropy: bool,
+    pattern_matcher: PatternMatcher,
+    file_format: Optional[str] = None,
+) -> List[SecretMatch]:
+    """Find all secrets to redact in a piece of content.
+
+    Args:
+        content: Decoded content
+        rel_path: Relative path for pattern context
+        include_entropy: Whether to include entropy detection
+        pattern_matcher: Matcher used to find secrets
+        file_format: Config format (see `config_format`) whose key/value
+            secrets are detected too, or None
+
+    Returns:
+        Disjoint matches sorted by start (see `resolve_overlaps`)
+    """
+    # One line index serves every detector
+    lines = LineIndex(content)
+
+    # Pattern-based detection
+    matches = pattern_matcher.find_secrets(content, rel_path, lines)
+
+    # Add entropy-based detection if enabled
+    if include_entropy:
+        matches.extend(pattern_matcher.find_high_entropy_strings(content, lines=lines))
+
+    # Values of secret-looking keys in config files
+    if file_format is not None:
+        matches.extend(find_config_secrets(content, file_format))
+
+    return resolve_overlaps(content, matches)
@@ -0,0 +1,105 @@
+"""Precompiled ``fnmatch`` pattern sets for scan and skip path rules.
+
+Each set of patterns is compiled once: literal patterns into a set,
+``*<literal>`` patterns (e.g. ``*.py``) into a suffix tuple for
+``str.endswith``, and everything else into one combined regex. Matching
+is identical to calling ``fnmatch.fnmatch`` with each pattern in turn.
+"""
+
+import os
+import re
+from fnmatch import fnmatchcase, translate
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+_MAGIC = re.compile(r"[*?\[]")
+
+
+def _has_magic(pattern: str) -> bool:
+    """Check if a pattern contains fnmatch wildcards."""
+    return _MAGIC.search(pattern) is not None
+
+
+class GlobSet:
+    """A set of fnmatch patterns matched as one."""
+
+    def __init__(self, patterns: Iterable[str]):
+        """Compile patterns.
+
+        Args:
+            patterns: fnmatch patterns (``*`` also matches ``/``)
+        """
+        self.patterns: List[str] = [os.path.normcase(p) for p in patterns]
+
+        literals = set()
+        suffixes = []
+        others = []
+        for pattern in self.patterns:
+            if not _has_magic(pattern):
+                literals.add(pattern)
+            elif pattern.startswith("*") and not _has_magic(pattern[1:]):
+                suffixes.append(pattern[1:])
+            else:
+                others.append(pattern)
+
+        self._literals = frozenset(literals)
+        self._suffixes = tuple(suffixes)
+        self._regex: Optional[re.Pattern] = (
+            re.compile("|".join(translate(p) for p in others)) if others else None
+        )
+
+        # Patterns ending in "*" match everything below a directory that
+        # matches the rest of the pattern followed by "/"
+        self._dir_heads = [p.rstrip("*") for p in self.patterns if p.endswith("*")]
+
+    def __bool__(self) -> bool:
+        return bool(self.patterns)
+
+    def match(self, path: str) -> bool:
+        """Check if a (normcased) path matches any pattern."""
+        return (
+            path in self._literals
+            or path.endswith(self._suffixes)
+            or (self._regex is not None and self._regex.match(path) is not None)
+        )
+
+    def covers_dir(self, rel_dir: str) -> bool:
+        """Check if every path below a directory is certain to match.
+
+        Args:
+            rel_dir: Directory path, relative like the paths being matched
+
+        Returns:
+            True only if no file under the directory can escape the set
+        """
+        prefix = os.path.normcase(rel_dir).rstrip("/") + "/"
+        return any(not head or fnmatchcase(prefix, head) for head in self._dir_heads)
+
+
+class PathFilter:
+    """Scan/skip path rules from a `PatternConfig`."""
+
+    def __init__(self, scan_patterns: Iterable[str], skip_patterns: Iterable[str]):
+        self.scan = GlobSet(scan_patterns)
+        self.skip = GlobSet(skip_patterns)
+
+    def should_scan(self, file_path: str) -> bool:
+        """Check if a file should be scanned.
+
+        Skip patterns are matched against the path; scan patterns against
+        the path or the file name. With no scan patterns, every file that
+        is not skipped is scanned.
+        """
+        path = os.path.normcase(file_path)
+
+        if self.skip.match(path):
+            return False
+
+        if not self.scan:
+            return True
+
+        return self.scan.match(path) or self.scan.match(os.path.normcase(Path(file_path).name))
+
+    def should_prune(self, rel_dir: str) -> bool:
+        """Check if a directory can be skipped without looking at its files."""
+        return self.skip.covers_dir(rel_dir)
@@ -0,0 +1,132 @@
+"""Tree changes between a sanitized snapshot's commit and a checkout.
+
+Incremental sanitization only needs to know which paths differ from the
+commit a snapshot was built from. That comes from
+``git diff --name-status -z -M``, parsed here into a `TreeChanges`.
+Anything that makes the diff untrustworthy (git errors, a base commit
+missing from a shallow clone, tracked symlinks that the sanitizer
+follows) yields None so the caller falls back to a full scan.
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config.git_auth import git_env
+from config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Seconds allowed for each git command
+GIT_TIMEOUT = 60
+
+# git ls-files mode of a tracked symlink
+SYMLINK_MODE = "120000"
+
+
+@dataclass
+class TreeChanges:
+    """Paths that differ between two commits, relative to the repo root."""
+    changed: List[str] = field(default_factory=list)  # Added, modified, copied or renamed-to
+    removed: List[str] = field(default_factory=list)  # Deleted or renamed-from
+    renamed: Dict[str, str] = field(default_factory=dict)  # Unmodified renames, old -> new
+
+
+async def run_git(repo_path: Path, *args: str) -> Optional[bytes]:
+    """Run a git command in ``repo_path``, returning stdout or None on failure."""
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            "git", *args,
+            cwd=str(repo_path),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=git_env(),
+        )
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=GIT_TIMEOUT)
+    except (OSError, asyncio.TimeoutError) as e:
+        logger.warning("git command failed", command=args[0], error=str(e))
+        return None
+
+    if proc.returncode != 0:
+        logger.warning(
+            "git command failed",
+            command=args[0],
+            error=stderr.decode('utf-8', errors='replace')[:500],
+        )
+        return None
+
+    return stdout
+
+
+def parse_name_status(output: bytes) -> TreeChanges:
+    """Parse ``git diff --name-status -z -M`` output.
+
+    Renames with a 100% similarity score keep their content, so they are
+    reported in `TreeChanges.renamed`; other renames are a removal plus a
+    change.
+
+    Args:
+        output: Raw NUL-separated diff output
+
+    Returns:
+        Parsed tree changes
+    """
+    changes = TreeChanges()
+    tokens = output.decode('utf-8', errors='surrogateescape').split("\0")
+    i = 0
+
+    while i < len(tokens) and tokens[i]:
+        status = tokens[i]
+        kind = status[0]
+
+        if kind in ("R", "C"):
+            old_path, new_path = tokens[i + 1], tokens[i + 2]
+            i += 3
+            if kind == "R" and status == "R100":
+                changes.renamed[old_path] = new_path
+                continue
+            if kind == "R":
+                changes.removed.append(old_path)
+            changes.changed.append(new_path)
+            continue
+
+        path = tokens[i + 1]
+        i += 2
+        if kind == "D":
+            changes.removed.append(path)
+        else:
+            # A(dded), M(odified), T(ype changed), U(nmerged)
+            changes.changed.append(path)
+
+    return changes
+
+
+async def diff_tree(repo_path: Path, base_commit: str) -> Optional[TreeChanges]:
+    """List paths changed in the checkout at ``repo_path`` since ``base_commit``.
+
+    Args:
+        repo_path: Git checkout (e.g. a fresh clone)
+        base_commit: Commit the previous snapshot was sanitized from
+
+    Returns:
+        Tree changes, or None if they cannot be determined reliably
+    """
+    if await run_git(repo_path, "cat-file", "-e", f"{base_commit}^{{commit}}") is None:
+        return None
+
+    # The sanitizer follows directory symlinks, so changes behind one would
+    # be invisible to the diff
+    files = await run_git(repo_path, "ls-files", "-s", "-z")
+    if files is None or any(
+        entry.startswith(SYMLINK_MODE.encode()) for entry in files.split(b"\0")
+    ):
+        return None
+
+    output = await run_git(
+        repo_path, "diff", "--name-status", "-z", "-M", base_commit, "HEAD",
+    )
+    if output is None:
+        return None
+
+    return parse_name_status(output)
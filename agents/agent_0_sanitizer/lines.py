@@ -0,0 +1,73 @@
+"""Offset to line number translation for scanned content.
+
+`LineIndex` answers "which line is this offset on" for text or for a
+bytes-like buffer such as an ``mmap``, without copying or decoding the
+whole content. Nothing is computed until the first lookup, so content
+without matches costs nothing. The index is then built in two levels:
+newline counts per fixed-size block (one pass), and exact newline
+offsets for a block only when an offset inside it is looked up.
+"""
+
+import mmap
+import re
+from bisect import bisect_left
+from typing import Dict, List, Optional, Union
+
+# Block size for cumulative newline counts
+BLOCK_SIZE = 64 * 1024
+
+_NEWLINE = re.compile("\n")
+_NEWLINE_BYTES = re.compile(b"\n")
+
+Buffer = Union[str, bytes, mmap.mmap]
+
+
+class LineIndex:
+    """Lazily built newline index over text or a bytes-like buffer."""
+
+    def __init__(self, content: Buffer):
+        """Wrap content; no work is done until `line_number` is called.
+
+        Args:
+            content: Text, or bytes-like content where ``\\n`` ends a line
+        """
+        self.content = content
+        self._newline = _NEWLINE if isinstance(content, str) else _NEWLINE_BYTES
+        self._counts: Optional[List[int]] = None
+        self._blocks: Dict[int, List[int]] = {}
+
+    def _build_counts(self) -> List[int]:
+        """Newlines before the start of each block."""
+        content = self.content
+        newline = "\n" if isinstance(content, str) else b"\n"
+        mapped = isinstance(content, mmap.mmap)  # mmap has no count()
+
+        counts = [0]
+        for start in range(0, len(content), BLOCK_SIZE):
+            end = start + BLOCK_SIZE
+            if mapped:
+                found = content[start:end].count(newline)
+            else:
+                found = content.count(newline, start, end)
+            counts.append(counts[-1] + found)
+        return counts
+
+    def _block(self, block: int) -> List[int]:
+        """Newline offsets within one block."""
+        offsets = self._blocks.get(block)
+        if offsets is None:
+            start = block * BLOCK_SIZE
+            offsets = [
+                m.start() for m in self._newline.finditer(self.content, start, start + BLOCK_SIZE)
+            ]
+            self._blocks[block] = offsets
+        return offsets
+
+    def line_number(self, offset: int) -> int:
+        """1-based line number of the character or byte at ``offset``."""
+        if self._counts is None:
+            self._counts = self._build_counts()
+        block = offset // BLOCK_SIZE
+        if block >= len(self._counts) - 1:
+            block = max(0, len(self._counts) - 2)
+        return self._counts[block] + bisect_left(self._block(block), offset) + 1
@@ -0,0 +1,75 @@
+"""Zero-copy secret detection over memory-mapped files.
+
+Files of at least ``SANITIZER_MMAP_THRESHOLD_MB`` are mapped rather than
+read, and scanned with bytes-compiled patterns. For ASCII content
+without carriage returns or the control characters ``re`` treats as
+Unicode whitespace, bytes and text matching agree offset for offset, so
+the result is exactly what scanning the decoded text would give. Line
+numbers come from a `LineIndex` that is only built once something
+matches.
+
+A mapped file without secrets is never decoded; one with secrets is
+decoded once, for redaction, reusing the matches found here. Any other
+content is decoded and scanned as usual.
+"""
+
+import mmap
+import re
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from agents.agent_0_sanitizer.lines import Buffer, LineIndex
+from agents.agent_0_sanitizer.merging import resolve_overlaps
+from agents.agent_0_sanitizer.patterns import PatternMatcher, SecretMatch
+
+# Bytes that decode or match differently from their text counterpart
+_NON_PORTABLE = re.compile(rb'[\r\x1c-\x1f\x80-\xff]')
+
+
+def is_portable(buffer: Buffer) -> bool:
+    """Check if bytes-mode matching of ``buffer`` equals text-mode matching."""
+    return _NON_PORTABLE.search(buffer) is None
+
+
+@contextmanager
+def map_file(file_path: Path) -> Iterator[Buffer]:
+    """Map a file read-only (empty files cannot be mapped and yield ``b""``)."""
+    with open(file_path, 'rb') as f:
+        if f.seek(0, 2) == 0:
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield buffer
+
+
+def detect_secrets_in_buffer(
+    buffer: Buffer,
+    rel_path: str,
+    include_entropy: bool,
+    pattern_matcher: PatternMatcher,
+) -> Optional[List[SecretMatch]]:
+    """Find all secrets to redact in a mapped file, without decoding it.
+
+    Args:
+        buffer: File content, e.g. an mmap
+        rel_path: Relative path for pattern context
+        include_entropy: Whether to include entropy detection
+        pattern_matcher: Matcher used to find secrets
+
+    Returns:
+        The same matches `detect_secrets` returns for the decoded text, or
+        None if the content has to be decoded to be scanned exactly
+    """
+    if not is_portable(buffer):
+        return None
+
+    lines = LineIndex(buffer)
+    matches = pattern_matcher.find_secrets_in_buffer(buffer, lines)
+    if matches is None:
+        return None
+
+    if include_entropy:
+        matches.extend(pattern_matcher.find_high_entropy_strings(buffer, lines=lines))
+
+    return resolve_overlaps(buffer, matches)
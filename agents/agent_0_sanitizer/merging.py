@@ -0,0 +1,105 @@
+"""Overlap resolution for secret matches from different detectors.
+
+Pattern, entropy and config-file detections can overlap: an AWS key
+inside an ``api_key = ...`` assignment, or a high-entropy run that
+starts with a token prefix. Matches are sorted by position once and swept left to
+right; every cluster of overlapping, nested or adjacent matches becomes a
+single match covering their union, labelled by its highest-priority
+member. Redacting the result never replaces the same text twice.
+"""
+
+import dataclasses
+from typing import List, Sequence
+
+from agents.agent_0_sanitizer.lines import Buffer
+from agents.agent_0_sanitizer.patterns import SecretMatch
+
+SEVERITY_RANK = {"critical": 3, "high": 2, "medium": 1, "low": 0}
+
+# Detector precedence: .env values, then named patterns, then values of
+# secret-looking keys in other config files, then entropy
+ENV_PATTERN_NAME = "env_file_value"
+CONFIG_PATTERN_NAME = "config_file_value"
+ENTROPY_PATTERN_NAME = "high_entropy"
+
+
+def _source_rank(match: SecretMatch) -> int:
+    """Rank the detector that produced a match (higher wins)."""
+    if match.pattern_name == ENV_PATTERN_NAME:
+        return 3
+    if match.pattern_name == CONFIG_PATTERN_NAME:
+        return 1
+    if match.pattern_name == ENTROPY_PATTERN_NAME:
+        return 0
+    return 2
+
+
+def _select_winner(cluster: List[SecretMatch]) -> SecretMatch:
+    """Pick the match that labels a cluster.
+
+    Ordered by detector, severity, span length, then earliest start;
+    remaining ties keep the first match in input order.
+    """
+    return max(
+        cluster,
+        key=lambda m: (
+            _source_rank(m),
+            SEVERITY_RANK.get(m.severity, 0),
+            m.end - m.start,
+            -m.start,
+        ),
+    )
+
+
+def _merge_cluster(content: Buffer, cluster: List[SecretMatch]) -> SecretMatch:
+    """Collapse a cluster of matches sorted by start into one match."""
+    if len(cluster) == 1:
+        return cluster[0]
+
+    start = cluster[0].start
+    end = max(m.end for m in cluster)
+    text = content[start:end]
+    if isinstance(text, bytes):
+        text = text.decode('ascii')  # ASCII buffer (see `mapped`)
+    return dataclasses.replace(
+        _select_winner(cluster),
+        match=text,
+        start=start,
+        end=end,
+        line_number=cluster[0].line_number,
+    )
+
+
+def resolve_overlaps(content: Buffer, matches: Sequence[SecretMatch]) -> List[SecretMatch]:
+    """Merge overlapping, nested and adjacent matches.
+
+    Runs in O(n log n) for n matches: one sort, then a linear sweep.
+
+    Args:
+        content: Content the match offsets refer to
+        matches: Matches from any detectors, in any order
+
+    Returns:
+        Disjoint, non-adjacent matches sorted by start
+    """
+    if len(matches) < 2:
+        return list(matches)
+
+    # Stable sort keeps input order as the final tie-breaker
+    ordered = sorted(matches, key=lambda m: m.start)
+
+    resolved: List[SecretMatch] = []
+    cluster = [ordered[0]]
+    cluster_end = ordered[0].end
+
+    for match in ordered[1:]:
+        if match.start <= cluster_end:
+            cluster.append(match)
+            cluster_end = max(cluster_end, match.end)
+        else:
+            resolved.append(_merge_cluster(content, cluster))
+            cluster = [match]
+            cluster_end = match.end
+
+    resolved.append(_merge_cluster(content, cluster))
+    return resolved
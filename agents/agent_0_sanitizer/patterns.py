@@ -1,13 +1,22 @@
 """Secret detection patterns for the Sanitizer agent."""
 
-import math
+import hashlib
 import re
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Pattern
+from typing import Any, Dict, List, Optional, Pattern, Union
 
 import yaml
 
+from agents.agent_0_sanitizer.backends import create_backend
+from agents.agent_0_sanitizer.entropy import (  # noqa: F401 - re-exports
+    calculate_shannon_entropy,
+    high_entropy_flags,
+    is_high_entropy,
+)
+from agents.agent_0_sanitizer.globs import PathFilter
+from agents.agent_0_sanitizer.lines import Buffer, LineIndex
+from agents.agent_0_sanitizer.scanner import MultiPatternScanner
 from config.settings import get_settings
 
 
@@ -50,53 +59,9 @@ class PatternConfig:
     severity_actions: Dict[str, Dict[str, Any]] = field(default_factory=dict)
 
 
-def calculate_shannon_entropy(s: str) -> float:
-    """Calculate Shannon entropy of a string.
-    
-    Higher entropy indicates more randomness, which is characteristic
-    of secrets like API keys and passwords.
-    
-    Args:
-        s: String to analyze
-        
-    Returns:
-        Entropy value (higher = more random)
-    """
-    if not s:
-        return 0.0
-    
-    # Count character frequencies
-    freq: Dict[str, int] = {}
-    for c in s:
-        freq[c] = freq.get(c, 0) + 1
-    
-    # Calculate entropy
-    length = len(s)
-    entropy = 0.0
-    for count in freq.values():
-        probability = count / length
-        if probability > 0:
-            entropy -= probability * math.log2(probability)
-    
-    return entropy
-
-
-def is_high_entropy(s: str, threshold: float = 4.5, min_length: int = 16) -> bool:
-    """Check if a string has high entropy (likely a secret).
-    
-    Args:
-        s: String to check
-        threshold: Entropy threshold (default 4.5)
-        min_length: Minimum string length to check
-        
-    Returns:
-        True if string has high entropy
-    """
-    if len(s) < min_length:
-        return False
-    
-    entropy = calculate_shannon_entropy(s)
-    return entropy >= threshold
+# Candidates for entropy scoring: alphanumeric strings with special chars
+ENTROPY_CANDIDATE = re.compile(r'[A-Za-z0-9+/=\-_]{20,}')
+ENTROPY_CANDIDATE_BYTES = re.compile(ENTROPY_CANDIDATE.pattern.encode())
 
 
 # Default patterns compiled at module load
@@ -225,11 +190,12 @@ DEFAULT_PATTERNS: List[SecretPattern] = [
 class PatternMatcher:
     """Matches secrets using compiled patterns."""
     
-    def __init__(self, config: Optional[PatternConfig] = None):
+    def __init__(self, config: Optional[PatternConfig] = None, backend: Optional[str] = None):
         """Initialize with optional config.
         
         Args:
             config: Pattern configuration (loads from file if not provided)
+            backend: Regex backend name (defaults to SANITIZER_REGEX_BACKEND)
         """
         if config:
             self.config = config
@@ -238,6 +204,27 @@ class PatternMatcher:
         
         # Combine default patterns with config patterns
         self.patterns = DEFAULT_PATTERNS + self.config.patterns
+        self.scanner = create_backend(
+            backend or get_settings().SANITIZER_REGEX_BACKEND, self.patterns,
+        )
+        self.path_filter = PathFilter(self.config.scan_patterns, self.config.skip_patterns)
+        # Bytes-mode scanner, built on first use (False if unsupported)
+        self._buffer_scanner: Optional[Union[MultiPatternScanner, bool]] = None
+        self.ruleset_version = self._compute_ruleset_version()
+    
+    def _compute_ruleset_version(self) -> str:
+        """Fingerprint the rules that determine sanitization output.
+        
+        Results cached under one version are only valid for matchers
+        with the same patterns and entropy settings.
+        """
+        spec = [
+            (p.name, p.pattern.pattern, p.pattern.flags, p.placeholder,
+             p.severity, p.capture_group, p.confidence)
+            for p in self.patterns
+        ]
+        spec.append((self.config.entropy_threshold, self.config.min_entropy_length))
+        return hashlib.sha256(repr(spec).encode()).hexdigest()[:16]
     
     def _load_config(self) -> PatternConfig:
         """Load pattern configuration from YAML file."""
@@ -275,24 +262,97 @@ class PatternMatcher:
         except Exception:
             return PatternConfig()
     
-    def find_secrets(self, content: str, file_path: str = "") -> List[SecretMatch]:
+    def find_secrets(
+        self,
+        content: str,
+        file_path: str = "",
+        lines: Optional[LineIndex] = None,
+    ) -> List[SecretMatch]:
         """Find all secrets in content.
         
+        Uses the configured scanning backend; results are identical to
+        `find_secrets_sequential`.
+        
+        Args:
+            content: Text content to scan
+            file_path: File path for context
+            lines: Line index over ``content``, to share it with other scans
+            
+        Returns:
+            List of secret matches
+        """
+        return self._collect_matches(content, self.scanner.scan(content), lines)
+    
+    def find_secrets_sequential(
+        self,
+        content: str,
+        file_path: str = "",
+        lines: Optional[LineIndex] = None,
+    ) -> List[SecretMatch]:
+        """Find all secrets with one `finditer` pass per pattern.
+        
+        Reference implementation kept for conformance tests and benchmarks.
+        
         Args:
             content: Text content to scan
             file_path: File path for context
+            lines: Line index over ``content``, to share it with other scans
             
         Returns:
             List of secret matches
         """
+        per_pattern = [pattern.find_matches(content) for pattern in self.patterns]
+        return self._collect_matches(content, per_pattern, lines)
+    
+    def find_secrets_in_buffer(self, buffer: Buffer, lines: LineIndex) -> Optional[List[SecretMatch]]:
+        """Find all secrets in ASCII bytes-like content without decoding it.
+        
+        Results equal `find_secrets` on the decoded text, provided the
+        buffer is ASCII without carriage returns (see `mapped`).
+        
+        Args:
+            buffer: Bytes-like content, e.g. an mmap
+            lines: Line index over ``buffer``
+            
+        Returns:
+            List of secret matches, or None if the patterns cannot be
+            matched as bytes
+        """
+        if self._buffer_scanner is None:
+            try:
+                self._buffer_scanner = MultiPatternScanner(self.patterns, binary=True)
+            except ValueError:
+                self._buffer_scanner = False
+        if self._buffer_scanner is False:
+            return None
+        return self._collect_matches(buffer, self._buffer_scanner.scan(buffer), lines)
+    
+    def _collect_matches(
+        self,
+        content: Buffer,
+        per_pattern: List[List[re.Match]],
+        lines: Optional[LineIndex] = None,
+    ) -> List[SecretMatch]:
+        """Convert per-pattern regex matches into secret matches.
+        
+        Args:
+            content: Scanned content
+            per_pattern: Regex matches, aligned with `self.patterns`
+            lines: Line index over ``content`` (built here if not given)
+            
+        Returns:
+            List of secret matches, in pattern order
+        """
+        if lines is None:
+            lines = LineIndex(content)
+        
         matches: List[SecretMatch] = []
-        lines = content.split("\n")
         
         # Track positions to avoid duplicate matches
         seen_positions: set = set()
         
-        for pattern in self.patterns:
-            for match in pattern.find_matches(content):
+        for pattern, pattern_matches in zip(self.patterns, per_pattern):
+            for match in pattern_matches:
                 # Get matched text
                 if pattern.capture_group is not None:
                     try:
@@ -301,6 +361,8 @@ class PatternMatcher:
                         matched_text = match.group(0)
                 else:
                     matched_text = match.group(0)
+                if isinstance(matched_text, bytes):
+                    matched_text = matched_text.decode('ascii')
                 
                 # Skip if already matched at this position
                 pos_key = (match.start(), match.end())
@@ -308,15 +370,12 @@ class PatternMatcher:
                     continue
                 seen_positions.add(pos_key)
                 
-                # Calculate line number
-                line_num = content[:match.start()].count("\n") + 1
-                
                 matches.append(SecretMatch(
                     pattern_name=pattern.name,
                     match=matched_text,
                     start=match.start(),
                     end=match.end(),
-                    line_number=line_num,
+                    line_number=lines.line_number(match.start()),
                     placeholder=pattern.placeholder,
                     severity=pattern.severity,
                     confidence=pattern.confidence,
@@ -326,40 +385,48 @@ class PatternMatcher:
     
     def find_high_entropy_strings(
         self,
-        content: str,
+        content: Buffer,
         threshold: Optional[float] = None,
         min_length: Optional[int] = None,
+        lines: Optional[LineIndex] = None,
     ) -> List[SecretMatch]:
         """Find high-entropy strings that might be secrets.
         
         Args:
-            content: Text content to scan
+            content: Text content to scan, or ASCII bytes-like content
             threshold: Entropy threshold (default from config)
             min_length: Minimum string length (default from config)
+            lines: Line index over ``content`` (built here if not given)
             
         Returns:
             List of potential secret matches
         """
         threshold = threshold or self.config.entropy_threshold
         min_length = min_length or self.config.min_entropy_length
+        if lines is None:
+            lines = LineIndex(content)
         
         matches: List[SecretMatch] = []
         
-        # Pattern to find potential secrets (alphanumeric strings with special chars)
-        potential_secrets = re.compile(r'[A-Za-z0-9+/=\-_]{20,}')
+        binary = not isinstance(content, str)
+        potential_secrets = ENTROPY_CANDIDATE_BYTES if binary else ENTROPY_CANDIDATE
         
-        for match in potential_secrets.finditer(content):
-            text = match.group(0)
-            
-            if is_high_entropy(text, threshold, min_length):
-                line_num = content[:match.start()].count("\n") + 1
-                
+        # Score every candidate in the file in one batch
+        candidates = list(potential_secrets.finditer(content))
+        texts = [
+            match.group(0).decode('ascii') if binary else match.group(0)
+            for match in candidates
+        ]
+        flags = high_entropy_flags(texts, threshold, min_length)
+        
+        for match, text, flagged in zip(candidates, texts, flags):
+            if flagged:
                 matches.append(SecretMatch(
                     pattern_name="high_entropy",
                     match=text,
                     start=match.start(),
                     end=match.end(),
-                    line_number=line_num,
+                    line_number=lines.line_number(match.start()),
                     placeholder="<REDACTED_HIGH_ENTROPY>",
                     severity="medium",
                     confidence=0.7,  # Lower confidence for entropy-based detection
@@ -376,20 +443,15 @@ class PatternMatcher:
         Returns:
             True if file should be scanned
         """
-        from fnmatch import fnmatch
-        
-        # Check skip patterns first
-        for pattern in self.config.skip_patterns:
-            if fnmatch(file_path, pattern):
-                return False
-        
-        # If no scan patterns defined, scan all non-skipped files
-        if not self.config.scan_patterns:
-            return True
-        
-        # Check if file matches any scan pattern
-        for pattern in self.config.scan_patterns:
-            if fnmatch(file_path, pattern) or fnmatch(Path(file_path).name, pattern):
-                return True
+        return self.path_filter.should_scan(file_path)
+    
+    def should_prune_dir(self, rel_dir: str) -> bool:
+        """Check if every file under a directory is skipped by config patterns.
         
-        return False
+        Args:
+            rel_dir: Directory path relative to the repository root
+            
+        Returns:
+            True if the directory does not need to be walked for scanning
+        """
+        return self.path_filter.should_prune(rel_dir)
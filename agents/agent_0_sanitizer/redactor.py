@@ -4,6 +4,8 @@ import re
 from dataclasses import dataclass
 from typing import Dict, List, Optional, Tuple
 
+from agents.agent_0_sanitizer.config_files import find_config_secrets
+from agents.agent_0_sanitizer.merging import resolve_overlaps
 from agents.agent_0_sanitizer.patterns import SecretMatch
 
 
@@ -60,17 +62,19 @@ class Redactor:
                 redactions=[],
             )
         
-        # Sort matches by position (reverse order for replacement)
-        sorted_matches = sorted(matches, key=lambda m: m.start, reverse=True)
+        # Merge overlapping matches so no text is replaced twice
+        resolved = resolve_overlaps(content, matches)
         
-        redacted = content
+        # Matches are disjoint and sorted: build the output in one pass
+        parts: List[str] = []
         entries: List[RedactionEntry] = []
+        cursor = 0
         
-        for match in sorted_matches:
+        for match in resolved:
             replacement = self._get_replacement(match)
-            
-            # Replace in content
-            redacted = redacted[:match.start] + replacement + redacted[match.end:]
+            parts.append(content[cursor:match.start])
+            parts.append(replacement)
+            cursor = match.end
             
             entries.append(RedactionEntry(
                 original_text=match.match,
@@ -82,12 +86,11 @@ class Redactor:
                 severity=match.severity,
             ))
         
-        # Reverse entries to match original order
-        entries.reverse()
+        parts.append(content[cursor:])
         
         return RedactionResult(
             original_content=content,
-            redacted_content=redacted,
+            redacted_content="".join(parts),
             redactions=entries,
         )
     
@@ -161,6 +164,17 @@ class Redactor:
         # Fallback
         return "<REDACTED_DATABASE_URL>"
     
+    def find_env_secrets(self, content: str) -> List[SecretMatch]:
+        """Find secret values in .env file content.
+        
+        Args:
+            content: .env file content
+            
+        Returns:
+            One match per secret value, spanning the value (with any quotes)
+        """
+        return find_config_secrets(content, "env")
+    
     def redact_env_file(self, content: str) -> Tuple[str, List[RedactionEntry]]:
         """Redact an entire .env file content.
         
@@ -172,82 +186,8 @@ class Redactor:
         Returns:
             Tuple of (redacted content, list of redaction entries)
         """
-        lines = content.split("\n")
-        redacted_lines = []
-        entries: List[RedactionEntry] = []
-        
-        for i, line in enumerate(lines):
-            # Skip comments and empty lines
-            stripped = line.strip()
-            if not stripped or stripped.startswith("#"):
-                redacted_lines.append(line)
-                continue
-            
-            # Parse KEY=VALUE or KEY="VALUE"
-            env_pattern = re.compile(r'^([A-Za-z_][A-Za-z0-9_]*)=(.*)$')
-            match = env_pattern.match(stripped)
-            
-            if not match:
-                redacted_lines.append(line)
-                continue
-            
-            key, value = match.groups()
-            
-            # Check if value looks like a secret
-            if self._is_likely_secret_key(key) or self._is_likely_secret_value(value):
-                # Preserve quotes if present
-                if value.startswith('"') and value.endswith('"'):
-                    redacted_value = '"<REDACTED>"'
-                elif value.startswith("'") and value.endswith("'"):
-                    redacted_value = "'<REDACTED>'"
-                else:
-                    redacted_value = "<REDACTED>"
-                
-                redacted_lines.append(f"{key}={redacted_value}")
-                
-                entries.append(RedactionEntry(
-                    original_text=value,
-                    replacement=redacted_value,
-                    start=0,  # Position not relevant for line-based
-                    end=len(value),
-                    line_number=i + 1,
-                    pattern_name="env_file_value",
-                    severity="high",
-                ))
-            else:
-                redacted_lines.append(line)
-        
-        return "\n".join(redacted_lines), entries
-    
-    def _is_likely_secret_key(self, key: str) -> bool:
-        """Check if an env var key name suggests it's a secret."""
-        secret_indicators = [
-            "password", "passwd", "pwd", "secret", "token", "key",
-            "api_key", "apikey", "auth", "credential", "private",
-            "access_key", "secret_key", "db_pass", "database_password",
-        ]
-        key_lower = key.lower()
-        return any(indicator in key_lower for indicator in secret_indicators)
-    
-    def _is_likely_secret_value(self, value: str) -> bool:
-        """Check if a value looks like a secret."""
-        # Remove quotes
-        value = value.strip("\"'")
-        
-        # Empty or placeholder values are not secrets
-        if not value or value.startswith("<") or value == "xxx":
-            return False
-        
-        # Database URLs
-        if any(value.startswith(prefix) for prefix in ["postgresql://", "mysql://", "mongodb://"]):
-            return True
-        
-        # Long alphanumeric strings
-        if len(value) > 20 and re.match(r'^[A-Za-z0-9+/=\-_]+$', value):
-            from agents.agent_0_sanitizer.patterns import is_high_entropy
-            return is_high_entropy(value)
-        
-        return False
+        result = self.redact(content, self.find_env_secrets(content))
+        return result.redacted_content, result.redactions
     
     def clear_cache(self) -> None:
         """Clear the redaction cache."""
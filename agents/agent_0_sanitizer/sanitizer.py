@@ -1,16 +1,29 @@
 """Sanitizer agent - Security gatekeeper for NeverDown."""
 
+import asyncio
 import os
 import shutil
 import tempfile
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from uuid import UUID
 
 from agents.base_agent import AgentResult, BaseAgent
+from agents.agent_0_sanitizer.cache import open_cache
+from agents.agent_0_sanitizer.classify import has_binary_extension, is_binary_file
+from agents.agent_0_sanitizer.clean_index import open_clean_index, tracked_blobs
+from agents.agent_0_sanitizer.config_files import config_format
+from agents.agent_0_sanitizer.incremental import TreeChanges, diff_tree
 from agents.agent_0_sanitizer.patterns import PatternMatcher, SecretMatch
 from agents.agent_0_sanitizer.redactor import Redactor, RedactionEntry
+from agents.agent_0_sanitizer.shadow import link_file
+from agents.agent_0_sanitizer.snapshots import Snapshot
+from agents.agent_0_sanitizer.worker import (
+    get_process_pool,
+    sanitize_batch,
+    sanitize_file,
+)
 from config.logging_config import audit_logger, get_logger
 from config.settings import get_settings
 from core.exceptions import SanitizationFailedError, TooManySecretsError
@@ -25,6 +38,9 @@ class SanitizeInput:
     repo_path: str  # Path to cloned repository
     incident_id: UUID
     include_entropy_detection: bool = True
+    
+    # Previous snapshot of the same repository, for incremental sanitization
+    base_snapshot: Optional[Snapshot] = None
 
 
 @dataclass
@@ -57,6 +73,15 @@ class SanitizerAgent(BaseAgent[SanitizeInput, SanitizeOutput]):
         self.settings = get_settings()
         self.pattern_matcher = PatternMatcher()
         self.redactor = Redactor()
+        self.cache = open_cache(
+            self.settings.SANITIZER_CACHE_DIR,
+            self.settings.SANITIZER_CACHE_MAX_MB * 1024 * 1024,
+            self.pattern_matcher.ruleset_version,
+        )
+        self.clean_index = open_clean_index(
+            self.settings.SANITIZER_CLEAN_INDEX_DIR,
+            self.pattern_matcher.ruleset_version,
+        )
     
     async def execute(
         self,
@@ -81,25 +106,42 @@ class SanitizerAgent(BaseAgent[SanitizeInput, SanitizeOutput]):
                 metadata={"repo_path": str(repo_path)},
             )
         
-        # Create sanitized copy directory
+        # Create sanitized shadow directory
         sanitized_path = Path(self.settings.SANITIZED_REPO_DIR) / f"sanitized-{incident_id}"
         
         try:
-            # Copy repository to sanitized location
-            self.logger.info("Copying repository for sanitization", 
+            # Build the shadow repository: redacted files are written,
+            # everything else is linked to the clone
+            self.logger.info("Building sanitized shadow repository", 
                            source=str(repo_path), dest=str(sanitized_path))
             
             if sanitized_path.exists():
                 shutil.rmtree(sanitized_path)
+            sanitized_path.mkdir(parents=True)
             
-            shutil.copytree(repo_path, sanitized_path, ignore=shutil.ignore_patterns('.git'))
+            # Re-sanitize only what changed since a previous snapshot
+            report = None
+            if input_data.base_snapshot is not None:
+                report = await self._sanitize_incremental(
+                    repo_path,
+                    sanitized_path,
+                    incident_id,
+                    input_data.include_entropy_detection,
+                    input_data.base_snapshot,
+                )
+                if report is None:
+                    self.logger.info("Incremental sanitization unavailable, scanning full tree")
+                    shutil.rmtree(sanitized_path)
+                    sanitized_path.mkdir(parents=True)
             
             # Scan and sanitize files
-            report = await self._sanitize_directory(
-                sanitized_path,
-                incident_id,
-                input_data.include_entropy_detection,
-            )
+            if report is None:
+                report = await self._sanitize_directory(
+                    sanitized_path,
+                    incident_id,
+                    input_data.include_entropy_detection,
+                    source=repo_path,
+                )
             
             # Check if we should halt due to too many secrets
             max_secrets = self.settings.SANITIZER_MAX_SECRETS
@@ -162,72 +204,571 @@ class SanitizerAgent(BaseAgent[SanitizeInput, SanitizeOutput]):
         directory: Path,
         incident_id: UUID,
         include_entropy: bool,
+        source: Optional[Path] = None,
     ) -> SanitizationReport:
         """Recursively sanitize all files in directory.
         
+        Files are sanitized in a worker thread by default, or spread
+        across a process pool when `SANITIZER_WORKERS` is greater than zero.
+        Files whose content was sanitized before are served from the cache,
+        and tracked files whose blob is in the known-clean index are not
+        read at all.
+        
         Args:
-            directory: Directory to sanitize (in place)
+            directory: Directory to sanitize in place, or the shadow
+                directory to build when `source` is given
             incident_id: Incident ID for report
             include_entropy: Whether to include high-entropy detection
+            source: Repository to read from, left untouched
             
         Returns:
             Sanitization report
         """
-        all_entries: List[SanitizationEntry] = []
-        files_scanned = 0
-        by_severity: Dict[str, int] = {}
-        by_type: Dict[str, int] = {}
-        entropy_detections = 0
-        pattern_matches = 0
+        hits_before = self.cache.hits if self.cache else 0
+        misses_before = self.cache.misses if self.cache else 0
+        
+        if source is not None:
+            root, shadow = source, directory
+        else:
+            root, shadow = directory, None
+        
+        blobs = await tracked_blobs(root) if self.clean_index is not None else {}
+        per_file = await self._sanitize_files(
+            self._iter_scannable_files(root, shadow), include_entropy, blobs,
+        )
+        
+        report = self._build_report(directory, incident_id, per_file)
+        self._finish_cache_stats(report, hits_before, misses_before)
+        return report
+    
+    async def _sanitize_incremental(
+        self,
+        source: Path,
+        shadow: Path,
+        incident_id: UUID,
+        include_entropy: bool,
+        base: Snapshot,
+    ) -> Optional[SanitizationReport]:
+        """Build the shadow repository from a previous snapshot.
+        
+        Unchanged files are linked from the snapshot; added and modified
+        files are sanitized from the clone, deleted files are left out and
+        unmodified renames are moved. The snapshot report's entries for
+        untouched files are carried over.
+        
+        Args:
+            source: Clone to read changed files from
+            shadow: Empty shadow directory to build
+            incident_id: Incident ID for report
+            include_entropy: Whether to include high-entropy detection
+            base: Snapshot sanitized from an earlier commit of the same repo
+            
+        Returns:
+            Sanitization report, or None if the changes since the snapshot's
+            commit cannot be determined (a full scan is needed)
+        """
+        changes = await diff_tree(source, base.commit)
+        if changes is None:
+            return None
+        
+        hits_before = self.cache.hits if self.cache else 0
+        misses_before = self.cache.misses if self.cache else 0
+        
+        carried, rescan, moved = await asyncio.to_thread(
+            self._link_from_snapshot, base, shadow, changes,
+        )
+        
+        # Entries of files that are no longer in the tree or are rescanned,
+        # including the old paths of renames that are rescanned
+        stale = set(changes.removed) | set(rescan) | set(moved)
+        kept = [
+            entry.model_copy(update={"file_path": changes.renamed[entry.file_path]})
+            if entry.file_path in changes.renamed else entry
+            for entry in base.report.entries
+            if entry.file_path not in stale
+        ]
+        stale_scanned = sum(
+            1 for rel_path in stale
+            if (base.tree_path / rel_path).is_file()
+            and self._should_scan(base.tree_path / rel_path, rel_path)
+            and not is_binary_file(base.tree_path / rel_path)
+        )
         
-        # Walk directory
-        for root, dirs, files in os.walk(directory):
-            # Skip hidden directories
-            dirs[:] = [d for d in dirs if not d.startswith('.')]
+        blobs = await tracked_blobs(source) if self.clean_index is not None else {}
+        per_file = await self._sanitize_files(
+            self._iter_changed_files(source, shadow, rescan), include_entropy, blobs,
+        )
+        
+        report = self._build_report(shadow, incident_id, [kept] + per_file)
+        report.total_files_scanned = base.report.total_files_scanned - stale_scanned + len(per_file)
+        report.base_commit = base.commit
+        self._finish_cache_stats(report, hits_before, misses_before)
+        
+        self.logger.info(
+            "Incremental sanitization",
+            base_commit=base.commit,
+            files_carried=carried,
+            files_rescanned=len(per_file),
+            files_removed=len(changes.removed),
+            files_renamed=len(changes.renamed),
+        )
+        return report
+    
+    def _link_from_snapshot(
+        self,
+        base: Snapshot,
+        shadow: Path,
+        changes: TreeChanges,
+    ) -> Tuple[int, List[str], List[str]]:
+        """Link unchanged snapshot files into the shadow repository.
+        
+        Args:
+            base: Snapshot to link from
+            shadow: Shadow directory to populate
+            changes: Changes since the snapshot's commit
             
+        Returns:
+            Number of files linked, the paths that must be sanitized again
+            (changed files plus snapshot files modified since saving), and
+            the old paths of renamed files among them
+        """
+        link_mode = self.settings.SANITIZER_SHADOW_LINK_MODE
+        skip = set(changes.changed) | set(changes.removed) | set(changes.renamed)
+        rescan = list(changes.changed)
+        moved = []
+        linked = 0
+        
+        for root, _, files in os.walk(base.tree_path):
+            rel_root = Path(root).relative_to(base.tree_path)
             for filename in files:
-                file_path = Path(root) / filename
-                rel_path = file_path.relative_to(directory)
-                
-                # Check if we should scan this file
-                if not self.pattern_matcher.should_scan_file(str(rel_path)):
+                rel_path = (rel_root / filename).as_posix()
+                if rel_path in skip:
                     continue
                 
-                # Skip binary files
-                if self._is_binary_file(file_path):
+                snapshot_file = Path(root) / filename
+                if not base.is_intact(rel_path, snapshot_file.stat()):
+                    rescan.append(rel_path)
                     continue
                 
+                dest_path = shadow / rel_path
+                dest_path.parent.mkdir(parents=True, exist_ok=True)
+                link_file(snapshot_file, dest_path, link_mode)
+                linked += 1
+        
+        for old_path, new_path in changes.renamed.items():
+            snapshot_file = base.tree_path / old_path
+            # Moves that change how the file is treated are sanitized again
+            if (
+                not snapshot_file.is_file()
+                or not base.is_intact(old_path, snapshot_file.stat())
+                or config_format(Path(old_path)) != config_format(Path(new_path))
+                or self._should_scan(snapshot_file, old_path)
+                != self._should_scan(snapshot_file, new_path)
+            ):
+                rescan.append(new_path)
+                moved.append(old_path)
+                continue
+            
+            dest_path = shadow / new_path
+            dest_path.parent.mkdir(parents=True, exist_ok=True)
+            link_file(snapshot_file, dest_path, link_mode)
+            linked += 1
+        
+        return linked, rescan, moved
+    
+    def _iter_changed_files(
+        self,
+        source: Path,
+        shadow: Path,
+        rel_paths: List[str],
+    ) -> Iterator[Tuple[Path, str, Optional[Path]]]:
+        """Yield changed files to scan, linking the ones that are not scanned.
+        
+        Args:
+            source: Clone to read from
+            shadow: Shadow directory being built
+            rel_paths: Changed paths, relative to the repository root
+            
+        Yields:
+            (absolute path, relative path, shadow path) per file to scan
+        """
+        link_mode = self.settings.SANITIZER_SHADOW_LINK_MODE
+        
+        for rel_path in rel_paths:
+            file_path = source / rel_path
+            # Submodules and paths that vanished from the checkout
+            if not file_path.is_file():
+                continue
+            
+            dest_path = shadow / rel_path
+            dest_path.parent.mkdir(parents=True, exist_ok=True)
+            
+            if not self._should_scan(file_path, rel_path):
+                link_file(file_path, dest_path, link_mode)
+                continue
+            
+            yield file_path, rel_path, dest_path
+    
+    async def _sanitize_files(
+        self,
+        files: Iterable[Tuple[Path, str, Optional[Path]]],
+        include_entropy: bool,
+        blobs: Optional[Dict[str, Tuple[str, int]]] = None,
+    ) -> List[List[SanitizationEntry]]:
+        """Sanitize files in a worker thread or across the process pool.
+        
+        Files whose blob is in the known-clean index are linked without
+        being read; tracked files found clean are added to the index.
+        
+        Args:
+            files: (absolute path, relative path, shadow path) per file
+            include_entropy: Whether to include high-entropy detection
+            blobs: (blob SHA, size) per unmodified tracked file, from
+                `tracked_blobs`
+            
+        Returns:
+            Per-file sanitization entries for files sanitized successfully,
+            including an empty list per known-clean file
+        """
+        # Blob SHA of each scanned file that may be recorded as clean
+        candidates: Dict[str, str] = {}
+        skipped: List[str] = []
+        if self.clean_index is not None and blobs:
+            files = self._skip_known_clean(files, blobs, candidates, skipped)
+        
+        if self.settings.SANITIZER_WORKERS > 0:
+            results = await self._sanitize_files_parallel(files, include_entropy)
+        else:
+            results = await self._sanitize_files_serial(files, include_entropy)
+        
+        if self.clean_index is not None and (skipped or candidates):
+            # Only a scan with every detector on proves a blob clean
+            if include_entropy:
+                for rel_path, entries in results:
+                    if not entries and rel_path in candidates:
+                        self.clean_index.add(candidates[rel_path])
+            try:
+                await asyncio.to_thread(self.clean_index.flush)
+            except OSError as e:
+                self.logger.warning("Failed to save known-clean index", error=str(e))
+            self.logger.info(
+                "Known-clean files skipped",
+                skipped=len(skipped),
+                index_size=len(self.clean_index),
+            )
+        
+        return [entries for _, entries in results] + [[] for _ in skipped]
+    
+    def _skip_known_clean(
+        self,
+        files: Iterable[Tuple[Path, str, Optional[Path]]],
+        blobs: Dict[str, Tuple[str, int]],
+        candidates: Dict[str, str],
+        skipped: List[str],
+    ) -> Iterator[Tuple[Path, str, Optional[Path]]]:
+        """Link known-clean files unread and pass the rest through.
+        
+        Only plain files (not config files, which the key/value engine
+        redacts regardless of content) whose checkout has the size of
+        their blob are eligible: a different size means the working tree
+        does not hold the blob's bytes (LFS pointers, clean/smudge
+        filters, line ending conversion).
+        
+        Args:
+            files: (absolute path, relative path, shadow path) per file
+            blobs: (blob SHA, size) per unmodified tracked file
+            candidates: Filled with the blob SHA of each eligible file
+                passed through
+            skipped: Filled with the relative path of each file linked
+            
+        Yields:
+            Files that must be scanned
+        """
+        link_mode = self.settings.SANITIZER_SHADOW_LINK_MODE
+        
+        for file_path, rel_path, dest_path in files:
+            blob = blobs.get(Path(rel_path).as_posix())
+            if blob is None or config_format(file_path) is not None:
+                yield file_path, rel_path, dest_path
+                continue
+            
+            blob_sha, blob_size = blob
+            try:
+                size_matches = file_path.stat().st_size == blob_size
+            except OSError:
+                size_matches = False
+            if not size_matches:
+                yield file_path, rel_path, dest_path
+                continue
+            
+            if blob_sha in self.clean_index:
                 try:
-                    entries = await self._sanitize_file(
-                        file_path,
-                        str(rel_path),
-                        include_entropy,
-                    )
-                    
-                    files_scanned += 1
-                    all_entries.extend(entries)
-                    
-                    # Update counts
-                    for entry in entries:
-                        by_severity[entry.severity] = by_severity.get(entry.severity, 0) + 1
-                        by_type[entry.secret_type] = by_type.get(entry.secret_type, 0) + 1
-                        
-                        if entry.secret_type == "high_entropy":
-                            entropy_detections += 1
-                        else:
-                            pattern_matches += 1
+                    if dest_path is not None:
+                        link_file(file_path, dest_path, link_mode)
+                except OSError:
+                    pass  # Scanned instead, which writes the shadow file
+                else:
+                    skipped.append(rel_path)
+                    continue
+            
+            candidates[rel_path] = blob_sha
+            yield file_path, rel_path, dest_path
+    
+    async def _sanitize_files_serial(
+        self,
+        files: Iterable[Tuple[Path, str, Optional[Path]]],
+        include_entropy: bool,
+    ) -> List[Tuple[str, List[SanitizationEntry]]]:
+        """Sanitize files one by one in a worker thread.
+        
+        The file iterator (typically a directory walk) is drained in the
+        thread too, so the event loop stays responsive for the whole scan.
+        
+        Args:
+            files: (absolute path, relative path, shadow path) per file
+            include_entropy: Whether to include high-entropy detection
+            
+        Returns:
+            (relative path, entries) per file sanitized successfully
+        """
+        return await asyncio.to_thread(self._sanitize_files_blocking, files, include_entropy)
+    
+    def _sanitize_files_blocking(
+        self,
+        files: Iterable[Tuple[Path, str, Optional[Path]]],
+        include_entropy: bool,
+    ) -> List[Tuple[str, List[SanitizationEntry]]]:
+        """Sanitize files one by one on the calling thread."""
+        results = []
+        for file_path, rel_path, dest_path in files:
+            try:
+                entries = self._sanitize_file(
+                    file_path, rel_path, include_entropy, dest_path,
+                )
+            except Exception as e:
+                self.logger.warning(
+                    "Failed to sanitize file",
+                    file=rel_path,
+                    error=str(e),
+                )
+                continue
+            if entries is not None:
+                results.append((rel_path, entries))
+        return results
+    
+    def _finish_cache_stats(
+        self,
+        report: SanitizationReport,
+        hits_before: int,
+        misses_before: int,
+    ) -> None:
+        """Record this run's cache hits and misses, then trim the cache."""
+        if self.cache is None:
+            return
+        
+        report.cache_hits = self.cache.hits - hits_before
+        report.cache_misses = self.cache.misses - misses_before
+        try:
+            self.cache.evict()
+        except Exception as e:
+            self.logger.warning("Sanitization cache eviction failed", error=str(e))
+    
+    def _iter_scannable_files(
+        self,
+        directory: Path,
+        shadow: Optional[Path] = None,
+    ) -> Iterator[Tuple[Path, str, Optional[Path]]]:
+        """Yield (absolute path, relative path, shadow path) for every file to scan.
+        
+        With a shadow directory, the tree is mirrored there as it is walked
+        (excluding `.git`): directories are created and files that are not
+        scanned, including everything under hidden directories, are linked
+        to the source. Without one, hidden directories and directories
+        covered by skip patterns are not walked at all.
+        
+        Args:
+            directory: Directory to walk
+            shadow: Shadow directory to mirror into, or None for in place
+            
+        Yields:
+            Files that pass the scan patterns and lack a binary extension;
+            their content is classified when they are read for scanning
+        """
+        link_mode = self.settings.SANITIZER_SHADOW_LINK_MODE
+        visited: Set[Tuple[int, int]] = set()
+        # Directories whose files are never scanned: hidden ones and those
+        # covered by skip patterns (mirrored without per-file checks)
+        unscanned: Set[str] = set()
+        
+        # Follow directory symlinks when mirroring, as a full copy would
+        for root, dirs, files in os.walk(directory, followlinks=shadow is not None):
+            root_path = Path(root)
+            rel_root = root_path.relative_to(directory)
+            skip_root = root in unscanned
+            
+            pruned = [
+                d for d in dirs
+                if skip_root
+                or d.startswith('.')
+                or self.pattern_matcher.should_prune_dir(str(rel_root / d))
+            ]
+            
+            if shadow is not None:
+                stat = root_path.stat()
+                if (stat.st_dev, stat.st_ino) in visited:
+                    dirs[:] = []  # Symlink cycle
+                    continue
+                visited.add((stat.st_dev, stat.st_ino))
+                
+                (shadow / rel_root).mkdir(parents=True, exist_ok=True)
+                dirs[:] = [d for d in dirs if d != '.git']
+                files = [f for f in files if f != '.git']
+                unscanned.update(os.path.join(root, d) for d in pruned)
+            else:
+                # Nothing to mirror: don't descend into unscanned directories
+                dirs[:] = [d for d in dirs if d not in pruned]
+            
+            for filename in files:
+                file_path = root_path / filename
+                rel_path = str(file_path.relative_to(directory))
+                dest_path = shadow / rel_path if shadow is not None else None
                 
-                except Exception as e:
+                # Check if we should scan this file, skipping binary files
+                if skip_root or not self._should_scan(file_path, rel_path):
+                    if dest_path is not None:
+                        try:
+                            link_file(file_path, dest_path, link_mode)
+                        except OSError as e:
+                            self.logger.warning(
+                                "Failed to link file into shadow repository",
+                                file=rel_path,
+                                error=str(e),
+                            )
+                    continue
+                
+                yield file_path, rel_path, dest_path
+    
+    def _should_scan(self, file_path: Path, rel_path: str) -> bool:
+        """Check if a file is outside hidden directories, matches the scan
+        patterns and does not have a binary extension (without reading it)."""
+        if any(part.startswith('.') for part in Path(rel_path).parent.parts):
+            return False
+        return (
+            self.pattern_matcher.should_scan_file(rel_path)
+            and not has_binary_extension(file_path)
+        )
+    
+    async def _sanitize_files_parallel(
+        self,
+        files: Iterable[Tuple[Path, str, Optional[Path]]],
+        include_entropy: bool,
+    ) -> List[Tuple[str, List[SanitizationEntry]]]:
+        """Sanitize files across the shared process pool.
+        
+        The file iterator (typically a directory walk) is drained in a
+        thread and each batch is awaited as a future, so the event loop
+        stays responsive for the whole scan.
+        
+        Args:
+            files: (absolute path, relative path, shadow path) per file
+            include_entropy: Whether to include high-entropy detection
+            
+        Returns:
+            (relative path, entries) per file sanitized successfully, in
+            iteration order
+        """
+        files = await asyncio.to_thread(
+            lambda: [
+                (str(path), rel, str(dest) if dest else None)
+                for path, rel, dest in files
+            ]
+        )
+        if not files:
+            return []
+        
+        workers = self.settings.SANITIZER_WORKERS
+        pool = get_process_pool(
+            workers,
+            self.pattern_matcher.config,
+            self.settings.SANITIZER_CACHE_DIR,
+            self.settings.SANITIZER_CACHE_MAX_MB * 1024 * 1024,
+        )
+        
+        # Several batches per worker keep the pool balanced when file sizes vary
+        batch_size = max(1, min(self.settings.SANITIZER_BATCH_SIZE, len(files) // (workers * 4)))
+        
+        loop = asyncio.get_running_loop()
+        batches = await asyncio.gather(*(
+            loop.run_in_executor(
+                pool,
+                sanitize_batch,
+                files[i:i + batch_size],
+                include_entropy,
+                self.settings.SANITIZER_SHADOW_LINK_MODE,
+                self.settings.SANITIZER_STREAM_THRESHOLD_MB * 1024 * 1024,
+                self.settings.SANITIZER_MMAP_THRESHOLD_MB * 1024 * 1024,
+            )
+            for i in range(0, len(files), batch_size)
+        ))
+        
+        per_file: List[Tuple[str, List[SanitizationEntry]]] = []
+        for results, cache_hits, cache_misses in batches:
+            if self.cache is not None:
+                self.cache.hits += cache_hits
+                self.cache.misses += cache_misses
+            
+            for rel_path, entries, error in results:
+                if error is not None:
                     self.logger.warning(
                         "Failed to sanitize file",
-                        file=str(rel_path),
-                        error=str(e),
+                        file=rel_path,
+                        error=error,
                     )
+                    continue
+                if entries is not None:
+                    per_file.append((rel_path, entries))
+        
+        return per_file
+    
+    def _build_report(
+        self,
+        directory: Path,
+        incident_id: UUID,
+        per_file: List[List[SanitizationEntry]],
+    ) -> SanitizationReport:
+        """Merge per-file entries into a sanitization report.
+        
+        Args:
+            directory: Sanitized directory
+            incident_id: Incident ID for report
+            per_file: Entries for each successfully scanned file
+            
+        Returns:
+            Sanitization report
+        """
+        all_entries: List[SanitizationEntry] = []
+        by_severity: Dict[str, int] = {}
+        by_type: Dict[str, int] = {}
+        entropy_detections = 0
+        pattern_matches = 0
+        
+        for entries in per_file:
+            all_entries.extend(entries)
+            
+            # Update counts
+            for entry in entries:
+                by_severity[entry.severity] = by_severity.get(entry.severity, 0) + 1
+                by_type[entry.secret_type] = by_type.get(entry.secret_type, 0) + 1
+                
+                if entry.secret_type == "high_entropy":
+                    entropy_detections += 1
+                else:
+                    pattern_matches += 1
         
         return SanitizationReport(
             incident_id=incident_id,
             sanitized_repo_path=str(directory),
-            total_files_scanned=files_scanned,
+            total_files_scanned=len(per_file),
             total_secrets_found=len(all_entries),
             entries=all_entries,
             high_entropy_detections=entropy_detections,
@@ -237,103 +778,34 @@ class SanitizerAgent(BaseAgent[SanitizeInput, SanitizeOutput]):
             halted=False,
         )
     
-    async def _sanitize_file(
+    def _sanitize_file(
         self,
         file_path: Path,
         rel_path: str,
         include_entropy: bool,
-    ) -> List[SanitizationEntry]:
+        dest_path: Optional[Path] = None,
+    ) -> Optional[List[SanitizationEntry]]:
         """Sanitize a single file.
         
         Args:
             file_path: Absolute path to file
             rel_path: Relative path for reporting
             include_entropy: Whether to include entropy detection
+            dest_path: Shadow path to write, or None to sanitize in place
             
         Returns:
-            List of sanitization entries for this file
+            List of sanitization entries for this file, or None if it was
+            not scanned (binary or unreadable)
         """
-        entries: List[SanitizationEntry] = []
-        
-        try:
-            content = file_path.read_text(encoding='utf-8', errors='replace')
-        except Exception:
-            return entries
-        
-        # Special handling for .env files
-        if file_path.name.startswith('.env') or file_path.suffix == '.env':
-            redacted_content, env_entries = self.redactor.redact_env_file(content)
-            
-            if env_entries:
-                file_path.write_text(redacted_content, encoding='utf-8')
-                
-                for entry in env_entries:
-                    entries.append(SanitizationEntry(
-                        file_path=rel_path,
-                        line_number=entry.line_number,
-                        secret_type="env_file_value",
-                        placeholder=entry.replacement,
-                        severity=entry.severity,
-                    ))
-            
-            return entries
-        
-        # Pattern-based detection
-        matches = self.pattern_matcher.find_secrets(content, rel_path)
-        
-        # Add entropy-based detection if enabled
-        if include_entropy:
-            entropy_matches = self.pattern_matcher.find_high_entropy_strings(content)
-            # Filter out entropy matches that overlap with pattern matches
-            existing_ranges = {(m.start, m.end) for m in matches}
-            for em in entropy_matches:
-                if not any(self._ranges_overlap((em.start, em.end), r) for r in existing_ranges):
-                    matches.append(em)
-        
-        if not matches:
-            return entries
-        
-        # Redact all matches
-        result = self.redactor.redact(content, matches)
-        
-        # Write redacted content
-        file_path.write_text(result.redacted_content, encoding='utf-8')
-        
-        # Create entries
-        for redaction in result.redactions:
-            entries.append(SanitizationEntry(
-                file_path=rel_path,
-                line_number=redaction.line_number,
-                secret_type=redaction.pattern_name,
-                placeholder=redaction.replacement,
-                severity=redaction.severity,
-            ))
-        
-        return entries
-    
-    def _is_binary_file(self, file_path: Path) -> bool:
-        """Check if a file is binary."""
-        binary_extensions = {
-            '.png', '.jpg', '.jpeg', '.gif', '.ico', '.bmp', '.webp',
-            '.pdf', '.doc', '.docx', '.xls', '.xlsx',
-            '.zip', '.tar', '.gz', '.rar', '.7z',
-            '.exe', '.dll', '.so', '.dylib',
-            '.pyc', '.pyo', '.class',
-            '.woff', '.woff2', '.ttf', '.eot',
-            '.mp3', '.mp4', '.wav', '.avi', '.mov',
-        }
-        
-        if file_path.suffix.lower() in binary_extensions:
-            return True
-        
-        # Check file content for binary data
-        try:
-            with open(file_path, 'rb') as f:
-                chunk = f.read(1024)
-                return b'\x00' in chunk
-        except Exception:
-            return True
-    
-    def _ranges_overlap(self, r1: tuple, r2: tuple) -> bool:
-        """Check if two ranges overlap."""
-        return r1[0] < r2[1] and r2[0] < r1[1]
+        return sanitize_file(
+            file_path,
+            rel_path,
+            include_entropy,
+            self.pattern_matcher,
+            self.redactor,
+            self.cache,
+            dest_path,
+            self.settings.SANITIZER_SHADOW_LINK_MODE,
+            self.settings.SANITIZER_STREAM_THRESHOLD_MB * 1024 * 1024,
+            self.settings.SANITIZER_MMAP_THRESHOLD_MB * 1024 * 1024,
+        )
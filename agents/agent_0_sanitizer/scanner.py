@@ -0,0 +1,314 @@
+"""Single-pass multi-pattern scanning engine for the Sanitizer agent.
+
+Every secret pattern we ship starts with a short literal (``AKIA``,
+``ghp_``, ``xox``, ``-----BEGIN``, ``eyJ``, ...). Instead of running each
+pattern's ``finditer`` over the whole file, the scanner derives those
+literal prefixes from the compiled regexes, finds every position where
+any of them occurs in a single pass, and only runs the full pattern at
+those candidate positions. Patterns without a usable literal prefix fall
+back to a full ``finditer``.
+
+A scanner built with ``binary=True`` runs bytes-compiled versions of the
+same patterns over bytes-like content (e.g. an ``mmap``). On ASCII
+content its matches have the same offsets as the text scanner's.
+"""
+
+import re
+import re._parser as sre_parse  # type: ignore[import-not-found]
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, List, Optional, Pattern, Set, Tuple
+
+if TYPE_CHECKING:
+    from agents.agent_0_sanitizer.patterns import SecretPattern
+
+_LITERAL = sre_parse.LITERAL
+_IN = sre_parse.IN
+_RANGE = sre_parse.RANGE
+_BRANCH = sre_parse.BRANCH
+_SUBPATTERN = sre_parse.SUBPATTERN
+
+# Limits for prefix expansion: literal prefixes longer than this add no
+# selectivity, and character classes quickly explode the prefix set.
+MAX_PREFIX_LENGTH = 8
+MAX_PREFIX_VARIANTS = 64
+MIN_PREFIX_LENGTH = 2
+
+
+def _expand_sequence(items: list, flags: int) -> Tuple[Set[str], bool]:
+    """Expand a parsed regex sequence into its possible literal prefixes.
+
+    Args:
+        items: Parsed sequence from ``re._parser``
+        flags: Active regex flags
+
+    Returns:
+        Tuple of (prefix set, whether the whole sequence was consumed)
+    """
+    prefixes: Set[str] = {""}
+
+    for op, av in items:
+        if op is _LITERAL:
+            options: Optional[Set[str]] = {chr(av)}
+            complete = True
+        elif op is _IN:
+            options = _expand_class(av)
+            complete = True
+        elif op is _SUBPATTERN:
+            _group, add_flags, del_flags, sub = av
+            if add_flags or del_flags:
+                options = None
+            else:
+                options, complete = _expand_sequence(list(sub), flags)
+        elif op is _BRANCH:
+            options = set()
+            complete = True
+            for branch in av[1]:
+                sub_options, sub_complete = _expand_sequence(list(branch), flags)
+                options |= sub_options
+                complete = complete and sub_complete
+        else:
+            options = None
+
+        if options is None:
+            return prefixes, False
+
+        expanded = {p + o for p in prefixes for o in options}
+        if len(expanded) > MAX_PREFIX_VARIANTS:
+            return prefixes, False
+        prefixes = {p[:MAX_PREFIX_LENGTH] for p in expanded}
+
+        if not complete or all(len(p) >= MAX_PREFIX_LENGTH for p in prefixes):
+            return prefixes, False
+
+    return prefixes, True
+
+
+def _expand_class(items: list) -> Optional[Set[str]]:
+    """Expand a small character class into its literal characters."""
+    chars: Set[str] = set()
+    for op, av in items:
+        if op is _LITERAL:
+            chars.add(chr(av))
+        elif op is _RANGE and av[1] - av[0] < 16:
+            chars.update(chr(c) for c in range(av[0], av[1] + 1))
+        else:
+            return None
+    return chars
+
+
+def literal_prefixes(pattern: Pattern[str]) -> Optional[FrozenSet[str]]:
+    """Derive the literal prefixes every match of ``pattern`` must start with.
+
+    Args:
+        pattern: Compiled regex
+
+    Returns:
+        Set of prefixes (lowercased for case-insensitive patterns), or
+        None if the pattern has no usable literal prefix
+    """
+    try:
+        parsed = sre_parse.parse(pattern.pattern, pattern.flags)
+    except Exception:
+        return None
+
+    prefixes, _ = _expand_sequence(list(parsed), pattern.flags)
+    if not prefixes or any(len(p) < MIN_PREFIX_LENGTH for p in prefixes):
+        return None
+
+    if pattern.flags & re.IGNORECASE:
+        prefixes = {p.lower() for p in prefixes}
+    return frozenset(prefixes)
+
+
+@lru_cache(maxsize=1)
+def _non_ascii_case_variants() -> Dict[str, str]:
+    """Non-ASCII characters that case-insensitively match an ASCII letter.
+
+    Python's ``re`` treats e.g. KELVIN SIGN as ``k`` and LONG S as ``s``
+    under IGNORECASE, so the prefilter must include them to stay exact.
+    """
+    everything = "".join(map(chr, range(0x80, 0x110000)))
+    variants: Dict[str, str] = {}
+    for char in set(re.findall(r"(?i)[a-z]", everything)):
+        for letter in "abcdefghijklmnopqrstuvwxyz":
+            if re.fullmatch(f"(?i){letter}", char):
+                variants[letter] = variants.get(letter, "") + char
+    return variants
+
+
+def _first_chars(prefix: str, ignore_case: bool, binary: bool = False) -> Set[str]:
+    """Characters a prefix may start with in the scanned content."""
+    first = prefix[0]
+    if not ignore_case or first.lower() == first.upper():
+        return {first}
+    chars = {first.lower(), first.upper()}
+    if first.isascii() and not binary:
+        chars.update(_non_ascii_case_variants().get(first.lower(), ""))
+    return chars
+
+
+def to_bytes_pattern(pattern: Pattern[str]) -> Pattern[bytes]:
+    """Compile a text pattern for bytes content.
+
+    Raises:
+        ValueError: If the pattern is not ASCII or has no bytes equivalent
+    """
+    try:
+        return re.compile(pattern.pattern.encode("ascii"), pattern.flags & ~re.UNICODE)
+    except (UnicodeEncodeError, re.error) as e:
+        raise ValueError(f"Pattern has no bytes equivalent: {pattern.pattern!r}") from e
+
+
+def _build_prefilter(prefixes: List[Tuple[str, bool]], binary: bool = False) -> Pattern:
+    """Compile a literal-prefix prefilter dispatched on the first character.
+
+    Every top-level branch starts with a plain literal, which lets ``re``
+    skip ahead with its first-character check instead of attempting the
+    whole alternation at every position.
+
+    Args:
+        prefixes: ``(prefix, ignore_case)`` pairs
+        binary: Compile for bytes content
+
+    Returns:
+        Compiled prefilter regex
+    """
+    tails: Dict[str, Set[str]] = {}
+    for prefix, ignore_case in prefixes:
+        tail = re.escape(prefix[1:])
+        if ignore_case and tail:
+            tail = f"(?i:{tail})"
+        for char in _first_chars(prefix, ignore_case, binary):
+            tails.setdefault(char, set()).add(tail)
+
+    branches = [
+        f"{re.escape(char)}(?:{'|'.join(sorted(options))})"
+        for char, options in sorted(tails.items())
+    ]
+    source = "|".join(branches)
+    return re.compile(source.encode("ascii") if binary else source)
+
+
+class MultiPatternScanner:
+    """Finds the matches of many patterns with one pass over the content.
+
+    Results are identical to running ``pattern.finditer(content)`` for
+    each pattern: a match can only start where one of its literal
+    prefixes occurs, so trying the full pattern at each candidate
+    position (skipping positions inside the previous match) reproduces
+    ``finditer``'s leftmost, non-overlapping semantics.
+    """
+
+    def __init__(self, patterns: List["SecretPattern"], binary: bool = False):
+        """Build the prefilter for a list of patterns.
+
+        Args:
+            patterns: Secret patterns in priority order
+            binary: Scan bytes-like content instead of text
+
+        Raises:
+            ValueError: If ``binary`` and a pattern cannot be compiled for bytes
+        """
+        self.patterns = patterns
+        self.binary = binary
+        self._compiled: List[Pattern] = [
+            to_bytes_pattern(p.pattern) if binary else p.pattern for p in patterns
+        ]
+
+        # Case-sensitive prefixes: prefix -> pattern indices, grouped by length
+        self._exact: Dict[int, Dict[Any, List[int]]] = {}
+        # Case-insensitive patterns are confirmed with their own prefix regex
+        self._folded: List[Tuple[int, Pattern]] = []
+        self._fallback: List[int] = []
+
+        alternatives: List[Tuple[str, bool]] = []
+        for index, secret_pattern in enumerate(patterns):
+            prefixes = literal_prefixes(secret_pattern.pattern)
+            if prefixes is None or (binary and not all(p.isascii() for p in prefixes)):
+                self._fallback.append(index)
+                continue
+
+            ignore_case = bool(secret_pattern.pattern.flags & re.IGNORECASE)
+            alternatives.extend((prefix, ignore_case) for prefix in prefixes)
+            if ignore_case:
+                escaped = "|".join(re.escape(p) for p in sorted(prefixes))
+                source = f"(?i:{escaped})"
+                self._folded.append((index, re.compile(source.encode() if binary else source)))
+            else:
+                for prefix in prefixes:
+                    by_prefix = self._exact.setdefault(len(prefix), {})
+                    key = prefix.encode() if binary else prefix
+                    by_prefix.setdefault(key, []).append(index)
+
+        self._prefilter: Optional[Pattern] = (
+            _build_prefilter(alternatives, binary) if alternatives else None
+        )
+
+    @property
+    def prefiltered_count(self) -> int:
+        """Number of patterns served by the literal prefilter."""
+        return len(self.patterns) - len(self._fallback)
+
+    def candidates(self, content: Any) -> Dict[int, List[int]]:
+        """Find candidate start positions for each prefiltered pattern.
+
+        Args:
+            content: Text to scan (bytes-like if `binary`)
+
+        Returns:
+            Mapping of pattern index to ascending candidate positions
+        """
+        found: Dict[int, List[int]] = {}
+        if self._prefilter is None:
+            return found
+
+        search = self._prefilter.search
+        exact = self._exact
+        folded = self._folded
+
+        hit = search(content)
+        while hit is not None:
+            pos = hit.start()
+
+            for length, by_prefix in exact.items():
+                indices = by_prefix.get(content[pos:pos + length])
+                if indices:
+                    for index in indices:
+                        found.setdefault(index, []).append(pos)
+
+            for index, prefix_re in folded:
+                if prefix_re.match(content, pos):
+                    found.setdefault(index, []).append(pos)
+
+            # Literal occurrences may overlap, so resume one character later
+            hit = search(content, pos + 1)
+
+        return found
+
+    def scan(self, content: Any) -> List[List[re.Match]]:
+        """Run every pattern over the content.
+
+        Args:
+            content: Text to scan (bytes-like if `binary`)
+
+        Returns:
+            Per-pattern match lists, in the same order as ``self.patterns``
+        """
+        results: List[List[re.Match]] = [[] for _ in self.patterns]
+
+        for index, positions in self.candidates(content).items():
+            match_at = self._compiled[index].match
+            matches = results[index]
+            last_end = 0
+            for pos in positions:
+                if pos < last_end:
+                    continue
+                match = match_at(content, pos)
+                if match is not None:
+                    matches.append(match)
+                    last_end = max(match.end(), pos + 1)
+
+        for index in self._fallback:
+            results[index] = list(self._compiled[index].finditer(content))
+
+        return results
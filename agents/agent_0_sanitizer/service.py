@@ -0,0 +1,154 @@
+"""Long-lived sanitizer shared by every incident in the process.
+
+Building a `SanitizerAgent` loads the redaction rules, compiles every
+pattern and opens the content cache. `get_sanitizer_service` does that
+once per process and hands the same warm agent to each incident, so
+per-incident startup is a dictionary lookup. Together with the shared
+worker pool (see `worker.get_process_pool`), which keeps patterns
+compiled in each worker, a sanitize job only pays for the files it
+scans.
+
+The service is rebuilt when the rules file or the settings baked into
+the agent change, so edited rules apply to the next incident without a
+restart. The replaced service is closed once its running jobs finish,
+and every service draws on the same job slots, so jobs on the old and
+new service together stay within ``SANITIZER_SERVICE_CONCURRENCY``.
+"""
+
+import asyncio
+import os
+import threading
+from typing import Any, Optional, Tuple
+
+from agents.agent_0_sanitizer.sanitizer import SanitizeInput, SanitizeOutput, SanitizerAgent
+from agents.base_agent import AgentResult
+from config.logging_config import get_logger
+from config.settings import get_settings
+
+logger = get_logger(__name__)
+
+_job_slots: Optional[asyncio.Semaphore] = None
+_job_slots_key: Optional[Tuple[asyncio.AbstractEventLoop, int]] = None
+
+
+def _get_job_slots(limit: int) -> asyncio.Semaphore:
+    """Semaphore shared by every service on the running event loop."""
+    global _job_slots, _job_slots_key
+    key = (asyncio.get_running_loop(), max(1, limit))
+    if _job_slots is None or _job_slots_key != key:
+        _job_slots = asyncio.Semaphore(key[1])
+        _job_slots_key = key
+    return _job_slots
+
+
+class SanitizerService:
+    """A warm `SanitizerAgent` that runs sanitize jobs for many incidents."""
+
+    def __init__(self, max_concurrent: int = 1):
+        """Build the agent: load rules, compile patterns, open the cache.
+
+        Args:
+            max_concurrent: Jobs allowed to run at once across all
+                services; the rest wait. Concurrent jobs share the
+                cache's hit counters, so per-report cache statistics are
+                approximate above 1.
+        """
+        self.agent = SanitizerAgent()
+        self.max_concurrent = max_concurrent
+        self.jobs_completed = 0
+        self._active = 0
+        self._retired = False
+        self._closed = False
+
+    async def sanitize(self, input_data: SanitizeInput) -> AgentResult[SanitizeOutput]:
+        """Sanitize a repository with the warm agent.
+
+        Args:
+            input_data: Sanitization input with repo path
+
+        Returns:
+            AgentResult with sanitized repo path and report
+        """
+        self._active += 1
+        try:
+            async with _get_job_slots(self.max_concurrent):
+                try:
+                    return await self.agent.run(input_data, incident_id=input_data.incident_id)
+                finally:
+                    # The redactor remembers secret values: don't keep them between incidents
+                    self.agent.redactor.clear_cache()
+                    self.jobs_completed += 1
+        finally:
+            self._active -= 1
+            if self._retired and self._active == 0:
+                self.close()
+
+    def retire(self) -> None:
+        """Close the service once the jobs already started on it finish."""
+        self._retired = True
+        if self._active == 0:
+            self.close()
+
+    def close(self) -> None:
+        """Flush and close the content cache."""
+        if self._closed:
+            return
+        self._closed = True
+        if self.agent.cache is not None:
+            self.agent.cache.close()
+
+
+_service: Optional[SanitizerService] = None
+_service_key: Optional[Tuple[Any, ...]] = None
+_service_lock = threading.Lock()
+
+
+def _current_key() -> Tuple[Any, ...]:
+    """Settings and rules-file state the service was built from."""
+    settings = get_settings()
+    try:
+        rules_mtime: Optional[int] = os.stat(settings.REDACTION_PATTERNS_FILE).st_mtime_ns
+    except OSError:
+        rules_mtime = None
+    return (
+        settings.REDACTION_PATTERNS_FILE,
+        rules_mtime,
+        settings.SANITIZER_REGEX_BACKEND,
+        settings.SANITIZER_CACHE_DIR,
+        settings.SANITIZER_CACHE_MAX_MB,
+        settings.SANITIZER_CLEAN_INDEX_DIR,
+        settings.SANITIZER_SERVICE_CONCURRENCY,
+    )
+
+
+def get_sanitizer_service() -> SanitizerService:
+    """Get the shared sanitizer service, creating it if needed.
+
+    Returns:
+        Sanitizer service
+    """
+    global _service, _service_key
+    key = _current_key()
+
+    with _service_lock:
+        if _service is not None and _service_key == key:
+            return _service
+
+        if _service is not None:
+            logger.info("Sanitizer rules or settings changed, rebuilding service")
+            # Jobs still running keep the previous agent until they finish
+            _service.retire()
+
+        _service = SanitizerService(get_settings().SANITIZER_SERVICE_CONCURRENCY)
+        _service_key = key
+        return _service
+
+
+def shutdown_sanitizer_service() -> None:
+    """Drop the shared sanitizer service, closing its cache."""
+    global _service, _service_key
+    with _service_lock:
+        if _service is not None:
+            _service.close()
+        _service = None
+        _service_key = None
@@ -0,0 +1,92 @@
+"""Copy-free file materialisation for the sanitized shadow repository.
+
+Files that need no redaction are linked into the shadow tree instead of
+copied. A reflink (copy-on-write clone) is preferred because the shadow
+file can later diverge without touching the source; hardlinks share the
+inode, so the shadow tree must be treated as read-only (downstream agents
+copy it before applying patches). Plain copies are the last resort, e.g.
+across filesystems.
+"""
+
+import errno
+import fcntl
+import os
+import shutil
+from pathlib import Path
+from typing import Set
+
+# ioctl request for FICLONE (Btrfs, XFS, and other copy-on-write filesystems)
+FICLONE = 0x40049409
+
+LINK_MODES = ("auto", "reflink", "hardlink", "copy")
+
+# Devices where reflinks or hardlinks already failed in this process
+_no_reflink_devices: Set[int] = set()
+_no_hardlink_devices: Set[int] = set()
+
+
+def _reflink(source: Path, dest: Path) -> None:
+    """Clone ``source`` to ``dest`` sharing data blocks copy-on-write."""
+    with open(source, "rb") as src, open(dest, "wb") as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError:
+            dst.close()
+            dest.unlink()
+            raise
+    shutil.copymode(source, dest)
+
+
+def link_file(source: Path, dest: Path, mode: str = "auto") -> str:
+    """Materialise ``source`` at ``dest`` as cheaply as the filesystem allows.
+
+    Args:
+        source: Existing file (symlinks are followed)
+        dest: Path to create; must not exist
+        mode: One of `LINK_MODES`
+
+    Returns:
+        The method used: "reflink", "hardlink" or "copy"
+    """
+    device = source.stat().st_dev
+
+    if mode in ("auto", "reflink") and device not in _no_reflink_devices:
+        try:
+            _reflink(source, dest)
+            return "reflink"
+        except OSError as e:
+            if e.errno in (errno.EOPNOTSUPP, errno.ENOTTY, errno.EXDEV, errno.EINVAL, errno.ENOSYS):
+                _no_reflink_devices.add(device)
+
+    if mode in ("auto", "hardlink") and device not in _no_hardlink_devices:
+        try:
+            os.link(source, dest)
+            return "hardlink"
+        except OSError as e:
+            if e.errno in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+                _no_hardlink_devices.add(device)
+
+    shutil.copy2(source, dest)
+    return "copy"
+
+
+def write_output(source: Path, dest: Path, content: str) -> None:
+    """Write redacted content for ``source`` to ``dest``.
+
+    When ``dest`` is a separate shadow path, any existing (possibly
+    linked) file is replaced rather than written through, and the source
+    file's permissions are kept.
+
+    Args:
+        source: File the content was read from
+        dest: File to write (may be ``source`` for in-place sanitization)
+        content: Redacted content
+    """
+    if dest == source:
+        dest.write_text(content, encoding='utf-8')
+        return
+
+    if dest.exists() or dest.is_symlink():
+        dest.unlink()
+    dest.write_text(content, encoding='utf-8')
+    shutil.copymode(source, dest)
@@ -0,0 +1,198 @@
+"""Persistent sanitized snapshots of repositories, keyed by commit.
+
+After a successful run the shadow repository is kept as the snapshot for
+the commit it was built from, together with its report. The next
+incident on the same repository builds its shadow from that snapshot and
+re-sanitizes only what changed since (see `incremental`).
+
+Snapshot files are hardlinked (or reflinked) rather than copied, so a
+file that was linked from a clone shares its inode with it. Files changed
+in place afterwards, e.g. when a fix is applied to the clone, no longer
+match the manifest recorded at save time and are re-sanitized instead
+of reused.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from agents.agent_0_sanitizer.cache import CACHE_FORMAT_VERSION
+from agents.agent_0_sanitizer.shadow import link_file
+from config.logging_config import get_logger
+from models.analysis import SanitizationReport
+
+logger = get_logger(__name__)
+
+METADATA_FILE = "snapshot.json"
+TREE_DIR = "tree"
+
+
+@dataclass
+class Snapshot:
+    """A sanitized repository tree at a known commit."""
+    commit: str
+    tree_path: Path
+    report: SanitizationReport
+    manifest: Dict[str, Tuple[int, int]]  # Relative path -> (size, mtime_ns)
+
+    def is_intact(self, rel_path: str, stat: os.stat_result) -> bool:
+        """Check that a snapshot file is unchanged since the snapshot was saved."""
+        return self.manifest.get(rel_path) == (stat.st_size, stat.st_mtime_ns)
+
+
+class SnapshotStore:
+    """Directory of sanitized snapshots, a few per repository."""
+
+    def __init__(self, root: str, keep_per_repo: int):
+        """Open (or create) the store.
+
+        Args:
+            root: Directory holding the snapshots
+            keep_per_repo: Snapshots retained per repository
+        """
+        self.root = Path(root)
+        self.keep_per_repo = max(1, keep_per_repo)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _repo_dir(self, repo_url: str) -> Path:
+        """Directory for one repository's snapshots (URLs may embed tokens)."""
+        return self.root / hashlib.sha256(repo_url.encode()).hexdigest()[:16]
+
+    def _load(self, snapshot_dir: Path) -> Optional[dict]:
+        """Read a snapshot's metadata, or None if it is missing or corrupt."""
+        try:
+            return json.loads((snapshot_dir / METADATA_FILE).read_text())
+        except (OSError, ValueError):
+            return None
+
+    def latest(
+        self,
+        repo_url: str,
+        ruleset_version: str,
+        include_entropy: bool,
+    ) -> Optional[Snapshot]:
+        """Find the newest snapshot usable for a run with the given rules.
+
+        Args:
+            repo_url: Repository URL
+            ruleset_version: Current `PatternMatcher.ruleset_version`
+            include_entropy: Whether entropy detection is enabled
+
+        Returns:
+            The most recently saved matching snapshot, if any
+        """
+        repo_dir = self._repo_dir(repo_url)
+        if not repo_dir.is_dir():
+            return None
+
+        best: Optional[dict] = None
+        best_dir: Optional[Path] = None
+        for snapshot_dir in repo_dir.iterdir():
+            meta = self._load(snapshot_dir)
+            if (
+                meta is None
+                or meta.get("format_version") != CACHE_FORMAT_VERSION
+                or meta.get("ruleset_version") != ruleset_version
+                or meta.get("include_entropy") != include_entropy
+            ):
+                continue
+            if best is None or meta["saved_at"] > best["saved_at"]:
+                best, best_dir = meta, snapshot_dir
+
+        if best is None or best_dir is None:
+            return None
+
+        try:
+            return Snapshot(
+                commit=best["commit"],
+                tree_path=best_dir / TREE_DIR,
+                report=SanitizationReport.model_validate(best["report"]),
+                manifest={path: tuple(stat) for path, stat in best["manifest"].items()},
+            )
+        except (KeyError, ValueError):
+            return None
+
+    def save(
+        self,
+        repo_url: str,
+        commit: str,
+        tree: Path,
+        report: SanitizationReport,
+        ruleset_version: str,
+        include_entropy: bool,
+    ) -> None:
+        """Keep a sanitized shadow repository as the snapshot for ``commit``.
+
+        Args:
+            repo_url: Repository URL
+            commit: Commit the shadow was built from
+            tree: Shadow repository to keep (left in place)
+            report: Report of the run that built it
+            ruleset_version: `PatternMatcher.ruleset_version` used
+            include_entropy: Whether entropy detection was enabled
+        """
+        repo_dir = self._repo_dir(repo_url)
+        repo_dir.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=".saving-", dir=repo_dir))
+
+        try:
+            manifest: Dict[str, List[int]] = {}
+            for root, _, files in os.walk(tree):
+                rel_root = Path(root).relative_to(tree)
+                (staging / TREE_DIR / rel_root).mkdir(parents=True, exist_ok=True)
+                for filename in files:
+                    rel_path = (rel_root / filename).as_posix()
+                    dest = staging / TREE_DIR / rel_path
+                    link_file(Path(root) / filename, dest)
+                    stat = dest.stat()
+                    manifest[rel_path] = [stat.st_size, stat.st_mtime_ns]
+
+            (staging / METADATA_FILE).write_text(json.dumps({
+                "commit": commit,
+                "format_version": CACHE_FORMAT_VERSION,
+                "ruleset_version": ruleset_version,
+                "include_entropy": include_entropy,
+                "saved_at": time.time(),
+                "report": report.model_dump(mode="json"),
+                "manifest": manifest,
+            }))
+
+            final = repo_dir / f"{commit}-{int(include_entropy)}"
+            if final.exists():
+                shutil.rmtree(final)
+            os.replace(staging, final)
+        finally:
+            if staging.exists():
+                shutil.rmtree(staging, ignore_errors=True)
+
+        self._prune(repo_dir)
+
+    def _prune(self, repo_dir: Path) -> None:
+        """Delete all but the newest snapshots of a repository."""
+        snapshots = []
+        for snapshot_dir in repo_dir.iterdir():
+            if snapshot_dir.name.startswith(".saving-"):
+                continue
+            meta = self._load(snapshot_dir)
+            snapshots.append((meta["saved_at"] if meta else 0.0, snapshot_dir))
+
+        snapshots.sort(reverse=True)
+        for _, snapshot_dir in snapshots[self.keep_per_repo:]:
+            shutil.rmtree(snapshot_dir, ignore_errors=True)
+
+
+def open_snapshot_store(root: Optional[str], keep_per_repo: int) -> Optional[SnapshotStore]:
+    """Open the snapshot store, or return None if it is disabled or unusable."""
+    if not root:
+        return None
+    try:
+        return SnapshotStore(os.path.expanduser(root), keep_per_repo)
+    except OSError as e:
+        logger.warning("Sanitizer snapshot store unavailable", error=str(e))
+        return None
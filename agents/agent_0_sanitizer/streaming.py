@@ -0,0 +1,202 @@
+"""Bounded-memory sanitization for files too large to load whole.
+
+The file is read in chunks of `CHUNK_CHARS`. Each buffer (carry-over plus
+the new chunk) is scanned in full, but only the part ending
+`MAX_MATCH_CHARS` before the buffer end is committed: redacted and
+written out. The uncommitted tail is carried into the next buffer, so a
+secret straddling a chunk boundary is always seen whole. The commit
+boundary is pulled back to a line start that no match crosses, so
+redactions never split.
+
+Memory use is bounded by a few chunks regardless of file size. Secrets
+are found and redacted exactly as in whole-file sanitization, provided
+no match is longer than `MAX_MATCH_CHARS` and no line is longer than
+`MAX_BUFFER_CHUNKS` chunks.
+"""
+
+import io
+import os
+import shutil
+from pathlib import Path
+from typing import List, Optional, TextIO
+
+from agents.agent_0_sanitizer.classify import SNIFF_BYTES, is_binary
+from agents.agent_0_sanitizer.detection import detect_secrets
+from agents.agent_0_sanitizer.patterns import PatternMatcher, SecretMatch
+from agents.agent_0_sanitizer.redactor import Redactor
+from agents.agent_0_sanitizer.shadow import link_file
+from models.analysis import SanitizationEntry
+
+# Characters read per chunk
+CHUNK_CHARS = 1024 * 1024
+
+# Longest match the overlap window guarantees to see whole. Every default
+# pattern is far shorter except unbounded runs (e.g. high-entropy tokens).
+MAX_MATCH_CHARS = 64 * 1024
+
+# A buffer may grow to this many chunks while waiting for a match to end
+MAX_BUFFER_CHUNKS = 4
+
+
+def _commit_boundary(matches: List[SecretMatch], safe_end: int) -> int:
+    """Find the latest offset at or before ``safe_end`` that splits no match."""
+    cut = safe_end
+    # Descending starts: moving the cut back can only expose earlier matches
+    for match in sorted(matches, key=lambda m: m.start, reverse=True):
+        if match.start < cut < match.end:
+            cut = match.start
+    return cut
+
+
+def _line_commit_boundary(buffer: str, matches: List[SecretMatch], safe_end: int) -> int:
+    """Find the latest line start at or before ``safe_end`` that splits no match.
+
+    Cutting at a line start leaves no token half-scanned, and a newline
+    gives the next buffer the same left context as the start of a string.
+    """
+    cut = safe_end
+    while True:
+        cut = buffer.rfind("\n", 0, cut) + 1
+        adjusted = _commit_boundary(matches, cut)
+        if adjusted == cut:
+            return cut
+        cut = adjusted
+
+
+def sanitize_stream(
+    source: TextIO,
+    output: TextIO,
+    rel_path: str,
+    include_entropy: bool,
+    pattern_matcher: PatternMatcher,
+    redactor: Redactor,
+    chunk_chars: int = CHUNK_CHARS,
+    overlap_chars: int = MAX_MATCH_CHARS,
+) -> List[SanitizationEntry]:
+    """Sanitize text from ``source`` into ``output`` chunk by chunk.
+
+    Args:
+        source: Text stream to read
+        output: Text stream receiving the (possibly redacted) content
+        rel_path: Relative path for reporting
+        include_entropy: Whether to include entropy detection
+        pattern_matcher: Matcher used to find secrets
+        redactor: Redactor used to rewrite content
+        chunk_chars: Characters read per chunk
+        overlap_chars: Tail of each buffer held back for the next one
+
+    Returns:
+        List of sanitization entries, with file-wide line numbers
+    """
+    entries: List[SanitizationEntry] = []
+    max_buffer = chunk_chars * MAX_BUFFER_CHUNKS + overlap_chars
+    buffer = ""
+    line_offset = 0
+
+    while True:
+        chunk = source.read(chunk_chars)
+        eof = not chunk
+        buffer += chunk
+
+        if not eof and len(buffer) <= overlap_chars:
+            continue
+
+        matches = detect_secrets(buffer, rel_path, include_entropy, pattern_matcher)
+
+        if eof:
+            cut = len(buffer)
+        else:
+            safe_end = len(buffer) - overlap_chars
+            cut = _line_commit_boundary(buffer, matches, safe_end)
+            if cut == 0:
+                if len(buffer) < max_buffer:
+                    # No line ends in the committable region yet; read on
+                    continue
+                # Overlong line: cut mid-line, or after an oversized match
+                cut = _commit_boundary(matches, safe_end)
+                if cut == 0:
+                    cut = max([safe_end] + [m.end for m in matches if m.start < safe_end])
+
+        committed = [m for m in matches if m.end <= cut]
+        region = buffer[:cut]
+
+        if committed:
+            for match in committed:
+                match.line_number += line_offset
+            result = redactor.redact(region, committed)
+            output.write(result.redacted_content)
+
+            for redaction in result.redactions:
+                entries.append(SanitizationEntry(
+                    file_path=rel_path,
+                    line_number=redaction.line_number,
+                    secret_type=redaction.pattern_name,
+                    placeholder=redaction.replacement,
+                    severity=redaction.severity,
+                ))
+        else:
+            output.write(region)
+
+        line_offset += region.count("\n")
+        buffer = buffer[cut:]
+
+        if eof:
+            return entries
+
+
+def sanitize_large_file(
+    file_path: Path,
+    rel_path: str,
+    include_entropy: bool,
+    pattern_matcher: PatternMatcher,
+    redactor: Redactor,
+    dest_path: Optional[Path] = None,
+    link_mode: str = "auto",
+) -> Optional[List[SanitizationEntry]]:
+    """Sanitize a large file with bounded memory.
+
+    Output goes to a temporary file beside the destination, which replaces
+    it only if something was redacted; a shadow file is never written
+    through a link. Files without secrets are linked like any other.
+
+    Args:
+        file_path: Absolute path to file
+        rel_path: Relative path for reporting
+        include_entropy: Whether to include entropy detection
+        pattern_matcher: Matcher used to find secrets
+        redactor: Redactor used to rewrite content
+        dest_path: Shadow path to materialise, or None to sanitize in place
+        link_mode: How an unchanged file is materialised (see `link_file`)
+
+    Returns:
+        List of sanitization entries for this file, or None if it is
+        binary and was not scanned
+    """
+    dest = dest_path or file_path
+    tmp_path = dest.with_name(f".{dest.name}.sanitizing")
+
+    with open(file_path, 'rb', buffering=max(SNIFF_BYTES, io.DEFAULT_BUFFER_SIZE)) as raw:
+        # Classify from the read buffer without consuming it
+        if is_binary(raw.peek(SNIFF_BYTES)):
+            if dest_path is not None:
+                link_file(file_path, dest_path, link_mode)
+            return None
+
+        try:
+            with io.TextIOWrapper(raw, encoding='utf-8', errors='replace') as source, \
+                    open(tmp_path, 'w', encoding='utf-8') as output:
+                entries = sanitize_stream(
+                    source, output, rel_path, include_entropy, pattern_matcher, redactor,
+                )
+
+            if entries:
+                shutil.copymode(file_path, tmp_path)
+                os.replace(tmp_path, dest)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+    if not entries and dest_path is not None:
+        link_file(file_path, dest_path, link_mode)
+
+    return entries
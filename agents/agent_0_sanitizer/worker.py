@@ -0,0 +1,348 @@
+"""Per-file sanitization work and the process pool that runs it.
+
+The functions here are synchronous and free of agent state so they can
+run either on the calling thread or inside a `ProcessPoolExecutor`
+worker. Workers build their `PatternMatcher` once, in the pool
+initializer, and reuse it for every batch they receive.
+"""
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+from agents.agent_0_sanitizer.cache import SanitizationCache, git_blob_sha, open_cache
+from agents.agent_0_sanitizer.classify import SNIFF_BYTES, is_binary
+from agents.agent_0_sanitizer.config_files import config_format
+from agents.agent_0_sanitizer.detection import detect_secrets
+from agents.agent_0_sanitizer.lines import Buffer
+from agents.agent_0_sanitizer.mapped import detect_secrets_in_buffer, map_file
+from agents.agent_0_sanitizer.patterns import PatternConfig, PatternMatcher, SecretMatch
+from agents.agent_0_sanitizer.redactor import Redactor
+from agents.agent_0_sanitizer.shadow import link_file, write_output
+from agents.agent_0_sanitizer.streaming import sanitize_large_file
+from models.analysis import SanitizationEntry
+
+# (source path, relative path, shadow path or None for in place) per file
+FileBatch = List[Tuple[str, str, Optional[str]]]
+# (relative path, entries or None if binary or failed, error message or None) per file
+FileResults = List[Tuple[str, Optional[List[SanitizationEntry]], Optional[str]]]
+# Per-file results plus the batch's (cache hits, cache misses)
+BatchResult = Tuple[FileResults, int, int]
+
+
+def decode_text(data: bytes) -> str:
+    """Decode file bytes the way `Path.read_text` would.
+
+    Uses UTF-8 with replacement characters and universal newlines.
+    """
+    text = data.decode('utf-8', errors='replace')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+def sanitize_content(
+    content: str,
+    rel_path: str,
+    file_format: Optional[str],
+    include_entropy: bool,
+    pattern_matcher: PatternMatcher,
+    redactor: Redactor,
+    matches: Optional[List[SecretMatch]] = None,
+) -> Tuple[Optional[str], List[SanitizationEntry]]:
+    """Find and redact secrets in a file's content.
+
+    Args:
+        content: Decoded file content
+        rel_path: Relative path for reporting
+        file_format: Config format from `config_format` (.env files get
+            key/value redaction only), or None
+        include_entropy: Whether to include entropy detection
+        pattern_matcher: Matcher used to find secrets
+        redactor: Redactor used to rewrite content
+        matches: Secrets already found in ``content``, to skip detection
+
+    Returns:
+        Tuple of (redacted content or None if unchanged, entries)
+    """
+    entries: List[SanitizationEntry] = []
+
+    # Special handling for .env files
+    if file_format == "env":
+        redacted_content, env_entries = redactor.redact_env_file(content)
+
+        if not env_entries:
+            return None, entries
+
+        for entry in env_entries:
+            entries.append(SanitizationEntry(
+                file_path=rel_path,
+                line_number=entry.line_number,
+                secret_type="env_file_value",
+                placeholder=entry.replacement,
+                severity=entry.severity,
+            ))
+
+        return redacted_content, entries
+
+    if matches is None:
+        matches = detect_secrets(content, rel_path, include_entropy, pattern_matcher, file_format)
+    if not matches:
+        return None, entries
+
+    # Redact all matches
+    result = redactor.redact(content, matches)
+
+    # Create entries
+    for redaction in result.redactions:
+        entries.append(SanitizationEntry(
+            file_path=rel_path,
+            line_number=redaction.line_number,
+            secret_type=redaction.pattern_name,
+            placeholder=redaction.replacement,
+            severity=redaction.severity,
+        ))
+
+    return result.redacted_content, entries
+
+
+def sanitize_file(
+    file_path: Path,
+    rel_path: str,
+    include_entropy: bool,
+    pattern_matcher: PatternMatcher,
+    redactor: Redactor,
+    cache: Optional[SanitizationCache] = None,
+    dest_path: Optional[Path] = None,
+    link_mode: str = "auto",
+    stream_threshold: int = 0,
+    mmap_threshold: int = 0,
+) -> Optional[List[SanitizationEntry]]:
+    """Sanitize a single file, in place or into a shadow tree.
+
+    The file is read once: the same bytes are classified as text or
+    binary, hashed for the cache and decoded for scanning. With
+    ``dest_path``, the redacted file is written there; files that need
+    no redaction, and binary files, are linked to the source instead of
+    copied. Files of at least ``mmap_threshold`` bytes (other than config
+    files, see `config_format`) are memory-mapped and scanned without decoding; only those
+    with secrets are decoded (see `detect_secrets_in_buffer`). Files of
+    at least ``stream_threshold`` bytes with secrets are streamed in
+    chunks and bypass the cache.
+
+    Args:
+        file_path: Absolute path to file
+        rel_path: Relative path for reporting
+        include_entropy: Whether to include entropy detection
+        pattern_matcher: Matcher used to find secrets
+        redactor: Redactor used to rewrite content
+        cache: Optional content-addressed result cache
+        dest_path: Shadow path to materialise, or None to sanitize in place
+        link_mode: How unchanged files are materialised (see `link_file`)
+        stream_threshold: Size in bytes from which files are streamed (0 = never)
+        mmap_threshold: Size in bytes from which files are mapped (0 = never)
+
+    Returns:
+        List of sanitization entries for this file, or None if it is
+        binary or unreadable and was not scanned
+    """
+    dest = dest_path or file_path
+    file_format = config_format(file_path)
+    plain = file_format is None
+
+    with ExitStack() as stack:
+        try:
+            size = file_path.stat().st_size
+            streamed = stream_threshold > 0 and plain and size >= stream_threshold
+            mapped = mmap_threshold > 0 and plain and size >= mmap_threshold
+            if mapped:
+                data: Buffer = stack.enter_context(map_file(file_path))
+            else:
+                data = b"" if streamed else file_path.read_bytes()
+        except Exception:
+            # Unreadable files are still materialised, as a full copy would have
+            if dest_path is not None:
+                link_file(file_path, dest_path, link_mode)
+            return None
+
+        if streamed and not mapped:
+            return sanitize_large_file(
+                file_path, rel_path, include_entropy, pattern_matcher, redactor,
+                dest_path, link_mode,
+            )
+
+        if is_binary(data[:SNIFF_BYTES]):
+            if dest_path is not None:
+                link_file(file_path, dest_path, link_mode)
+            return None
+
+        key = None
+        if cache is not None:
+            key = cache.make_key(git_blob_sha(data), include_entropy, file_format)
+            cached = cache.get(key)
+            if cached is not None:
+                if cached.redacted_content is not None:
+                    write_output(file_path, dest, cached.redacted_content)
+                elif dest_path is not None:
+                    link_file(file_path, dest_path, link_mode)
+                return cached.to_entries(rel_path)
+
+        matches = None
+        if mapped:
+            matches = detect_secrets_in_buffer(data, rel_path, include_entropy, pattern_matcher)
+            if streamed and matches != []:
+                return sanitize_large_file(
+                    file_path, rel_path, include_entropy, pattern_matcher, redactor,
+                    dest_path, link_mode,
+                )
+
+        if matches == []:
+            # Clean mapped file: never decoded
+            redacted_content, entries = None, []
+        else:
+            redacted_content, entries = sanitize_content(
+                decode_text(data[:]),
+                rel_path,
+                file_format,
+                include_entropy,
+                pattern_matcher,
+                redactor,
+                matches,
+            )
+
+        # Write redacted content
+        if redacted_content is not None:
+            write_output(file_path, dest, redacted_content)
+        elif dest_path is not None:
+            link_file(file_path, dest_path, link_mode)
+
+        if cache is not None and key is not None:
+            cache.put(key, redacted_content, entries)
+
+        return entries
+
+
+# Worker-process state, populated once by `_init_worker`
+_worker_matcher: Optional[PatternMatcher] = None
+_worker_redactor: Optional[Redactor] = None
+_worker_cache: Optional[SanitizationCache] = None
+
+
+def _init_worker(config: PatternConfig, cache_dir: Optional[str], cache_max_bytes: int) -> None:
+    """Pool initializer: compile patterns and open the cache once per worker."""
+    global _worker_matcher, _worker_redactor, _worker_cache
+    _worker_matcher = PatternMatcher(config)
+    _worker_redactor = Redactor()
+    _worker_cache = open_cache(cache_dir, cache_max_bytes, _worker_matcher.ruleset_version)
+
+
+def sanitize_batch(
+    batch: FileBatch,
+    include_entropy: bool,
+    link_mode: str = "auto",
+    stream_threshold: int = 0,
+    mmap_threshold: int = 0,
+) -> BatchResult:
+    """Sanitize a batch of files inside a pool worker.
+
+    Errors are reported per file so one unreadable file does not
+    discard the rest of the batch.
+
+    Args:
+        batch: Files to sanitize
+        include_entropy: Whether to include entropy detection
+        link_mode: How unchanged files are materialised in a shadow tree
+        stream_threshold: Size in bytes from which files are streamed (0 = never)
+        mmap_threshold: Size in bytes from which files are mapped (0 = never)
+
+    Returns:
+        Per-file results in batch order, with the batch's cache hits and misses
+    """
+    assert _worker_matcher is not None and _worker_redactor is not None
+
+    if _worker_cache is not None:
+        hits_before, misses_before = _worker_cache.hits, _worker_cache.misses
+
+    results: FileResults = []
+    for abs_path, rel_path, dest_path in batch:
+        try:
+            entries = sanitize_file(
+                Path(abs_path),
+                rel_path,
+                include_entropy,
+                _worker_matcher,
+                _worker_redactor,
+                _worker_cache,
+                Path(dest_path) if dest_path else None,
+                link_mode,
+                stream_threshold,
+                mmap_threshold,
+            )
+            results.append((rel_path, entries, None))
+        except Exception as e:
+            results.append((rel_path, None, str(e)))
+
+    if _worker_cache is None:
+        return results, 0, 0
+
+    _worker_cache.flush()
+    return results, _worker_cache.hits - hits_before, _worker_cache.misses - misses_before
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_key: Optional[Tuple[Any, ...]] = None
+_pool_lock = threading.Lock()
+
+
+def get_process_pool(
+    workers: int,
+    config: PatternConfig,
+    cache_dir: Optional[str] = None,
+    cache_max_bytes: int = 0,
+) -> ProcessPoolExecutor:
+    """Get the shared sanitizer process pool, creating it if needed.
+
+    The pool is recreated if the worker count, pattern configuration or
+    cache location changes. Workers are spawned rather than forked so they
+    never inherit locks held by the API's threads.
+
+    Args:
+        workers: Number of worker processes
+        config: Pattern configuration compiled in each worker
+        cache_dir: Sanitization cache directory, or None to disable
+        cache_max_bytes: Sanitization cache size budget
+
+    Returns:
+        Process pool executor
+    """
+    global _pool, _pool_key
+    key = (workers, repr(config), cache_dir, cache_max_bytes)
+
+    with _pool_lock:
+        if _pool is not None and _pool_key == key:
+            return _pool
+
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+
+        _pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(config, cache_dir, cache_max_bytes),
+        )
+        _pool_key = key
+        return _pool
+
+
+def shutdown_process_pool() -> None:
+    """Shut down the shared sanitizer process pool, if running."""
+    global _pool, _pool_key
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+        _pool_key = None
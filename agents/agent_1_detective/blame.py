@@ -0,0 +1,252 @@
+"""Whole-file blame with a cache shared across incidents.
+
+A porcelain ``git blame -L n,n`` per question makes git walk history
+again for every line, and Detective asks about several lines of the same
+file across errors and refinements. `BlameEngine` blames each file once
+at HEAD with ``git blame --incremental``, streamed through `GitRunner`,
+into a `FileBlame`: the distinct commits plus one commit index per line
+in an `array`, so a line lookup is an index operation.
+
+Blames are kept in a process-wide LRU cache (see `get_blame_cache`)
+keyed by repository, HEAD commit and path. Blaming HEAD rather than the
+working tree makes a result depend on nothing else, so incidents on the
+same repository and HEAD share it.
+"""
+
+import asyncio
+import re
+import threading
+from array import array
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from agents.agent_1_detective.diff_analyzer import CommitInfo
+from agents.agent_1_detective.git_runner import GitCommandError, GitRunner
+from config.logging_config import get_logger
+from config.settings import get_settings
+
+logger = get_logger(__name__)
+
+# "<sha> <source line> <result line> <line count>" opening each entry
+_ENTRY_HEADER = re.compile(rb'^([0-9a-f]{40}|[0-9a-f]{64}) \d+ (\d+) (\d+)$')
+
+BlameKey = Tuple[str, str, str]
+
+
+class FileBlame:
+    """The commit that last changed each line of a file."""
+
+    def __init__(self, commits: List[CommitInfo], line_commits: array):
+        """Initialize from parsed blame.
+
+        Args:
+            commits: Distinct commits that wrote the file's lines
+            line_commits: Index into ``commits`` for each line, first line first
+        """
+        self.commits = commits
+        self.line_commits = line_commits
+
+    def __len__(self) -> int:
+        return len(self.line_commits)
+
+    def commit_for_line(self, line_number: int) -> Optional[CommitInfo]:
+        """Commit that last changed a line (1-based), or None if out of range."""
+        if not 1 <= line_number <= len(self.line_commits):
+            return None
+        return self.commits[self.line_commits[line_number - 1]]
+
+
+class _IncrementalBlameParser:
+    """Incremental parser for ``git blame --incremental`` output.
+
+    Each entry is a header naming a commit and a range of result lines,
+    the commit's metadata the first time it appears, and a ``filename``
+    line. Entries arrive in no particular order.
+    """
+
+    def __init__(self):
+        self._metadata: Dict[bytes, Dict[bytes, bytes]] = {}
+        self._ranges: List[Tuple[int, int, bytes]] = []
+        self._current: Optional[bytes] = None
+        self._pending = b''
+
+    def feed(self, chunk: bytes) -> None:
+        """Parse a chunk of output."""
+        *lines, self._pending = (self._pending + chunk).split(b'\n')
+        for line in lines:
+            self._line(line)
+
+    def _line(self, line: bytes) -> None:
+        if self._current is None:
+            match = _ENTRY_HEADER.match(line)
+            if match:
+                sha = match.group(1)
+                self._current = sha
+                self._ranges.append((int(match.group(2)), int(match.group(3)), sha))
+                self._metadata.setdefault(sha, {})
+            return
+
+        key, _, value = line.partition(b' ')
+        if key == b'filename':
+            self._current = None
+        else:
+            self._metadata[self._current].setdefault(key, value)
+
+    def finish(self) -> FileBlame:
+        """Build the file's blame once the output has ended."""
+        if self._pending:
+            self._line(self._pending)
+            self._pending = b''
+
+        commits: List[CommitInfo] = []
+        index: Dict[bytes, int] = {}
+        for sha, data in self._metadata.items():
+            index[sha] = len(commits)
+            commits.append(CommitInfo(
+                sha=sha.decode(),
+                author=data.get(b'author', b'Unknown').decode('utf-8', errors='replace'),
+                email=data.get(b'author-mail', b'').decode('utf-8', errors='replace').strip('<>'),
+                timestamp=datetime.fromtimestamp(int(data.get(b'author-time', b'0'))),
+                message=data.get(b'summary', b'').decode('utf-8', errors='replace'),
+            ))
+
+        line_count = max((start + count - 1 for start, count, _ in self._ranges), default=0)
+        line_commits = array('H' if len(commits) <= 0xFFFF else 'I', [0]) * line_count
+        for start, count, sha in self._ranges:
+            commit_index = index[sha]
+            for line_number in range(start - 1, start - 1 + count):
+                line_commits[line_number] = commit_index
+
+        return FileBlame(commits, line_commits)
+
+
+class BlameCache:
+    """Least-recently-used cache of file blames, safe to share between threads."""
+
+    def __init__(self, max_files: int):
+        self.max_files = max(1, max_files)
+        self.hits = 0
+        self.misses = 0
+        self._blames: OrderedDict[BlameKey, FileBlame] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._blames)
+
+    def get(self, key: BlameKey) -> Optional[FileBlame]:
+        """Cached blame for (repository, commit, path), or None."""
+        with self._lock:
+            blame = self._blames.get(key)
+            if blame is None:
+                self.misses += 1
+                return None
+            self._blames.move_to_end(key)
+            self.hits += 1
+            return blame
+
+    def put(self, key: BlameKey, blame: FileBlame) -> None:
+        """Cache a blame, evicting the least recently used beyond `max_files`."""
+        with self._lock:
+            self._blames[key] = blame
+            self._blames.move_to_end(key)
+            while len(self._blames) > self.max_files:
+                self._blames.popitem(last=False)
+
+
+_cache: Optional[BlameCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_blame_cache() -> BlameCache:
+    """Process-wide blame cache, sized by ``DETECTIVE_BLAME_CACHE_FILES``."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = BlameCache(get_settings().DETECTIVE_BLAME_CACHE_FILES)
+        return _cache
+
+
+class BlameEngine:
+    """Answers line blame questions for one repository from whole-file blames."""
+
+    def __init__(self, git: GitRunner, repository: str, cache: Optional[BlameCache] = None):
+        """Initialize the engine.
+
+        Args:
+            git: Runner for the repository's git commands
+            repository: Identity of the repository in cache keys, e.g. its URL
+            cache: Blame cache (default: the process-wide cache)
+        """
+        self.git = git
+        self.repository = repository
+        self.cache = cache if cache is not None else get_blame_cache()
+        self._head: Optional[str] = None
+        self._head_lock = asyncio.Lock()
+        self._inflight: Dict[str, asyncio.Future[Optional[FileBlame]]] = {}
+
+    async def head(self) -> Optional[str]:
+        """SHA of the HEAD commit, resolved once."""
+        async with self._head_lock:
+            if self._head is None:
+                output = await self.git.run('rev-parse', '--verify', 'HEAD^{commit}')
+                if output is not None:
+                    self._head = output.decode().strip()
+            return self._head
+
+    async def file_blame(self, path: str) -> Optional[FileBlame]:
+        """Blame of a file at HEAD, from the cache or a single git blame.
+
+        Concurrent requests for the same file share one git command.
+
+        Args:
+            path: Path relative to the repository root
+
+        Returns:
+            The file's blame, or None if it is not in HEAD or git failed
+        """
+        head = await self.head()
+        if head is None:
+            return None
+
+        key = (self.repository, head, path)
+        blame = self.cache.get(key)
+        if blame is not None:
+            return blame
+
+        inflight = self._inflight.get(path)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._blame(head, path))
+            self._inflight[path] = inflight
+            inflight.add_done_callback(lambda _: self._inflight.pop(path, None))
+
+        blame = await asyncio.shield(inflight)
+        if blame is not None:
+            self.cache.put(key, blame)
+        return blame
+
+    async def _blame(self, head: str, path: str) -> Optional[FileBlame]:
+        """Run ``git blame --incremental`` on a file at ``head``."""
+        parser = _IncrementalBlameParser()
+        try:
+            async for chunk in self.git.stream('blame', '--incremental', head, '--', path):
+                parser.feed(chunk)
+        except GitCommandError as e:
+            logger.debug("git blame failed", path=path, error=str(e))
+            return None
+        return parser.finish()
+
+    async def blame_line(self, path: str, line_number: int) -> Optional[CommitInfo]:
+        """Commit that last changed a line of a file at HEAD.
+
+        Args:
+            path: Path relative to the repository root
+            line_number: 1-based line number
+
+        Returns:
+            The commit, or None if the file or line is not in HEAD
+        """
+        blame = await self.file_blame(path)
+        if blame is None:
+            return None
+        return blame.commit_for_line(line_number)
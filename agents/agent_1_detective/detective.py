@@ -1,14 +1,21 @@
 """Detective agent - Failure analyzer for NeverDown."""
 
+import asyncio
+from contextlib import aclosing
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional
+from typing import AsyncIterable, Dict, List, Optional, Tuple
 from uuid import UUID
 
 from agents.base_agent import AgentResult, BaseAgent
-from agents.agent_1_detective.diff_analyzer import DiffAnalyzer
+from agents.agent_1_detective.blame import BlameEngine
+from agents.agent_1_detective.diff_analyzer import CommitInfo, DiffAnalyzer
+from agents.agent_1_detective.fingerprint import ErrorIndex
+from agents.agent_1_detective.git_runner import GitRunner
+from agents.agent_1_detective.history_index import HistoryIndex, open_history_index
 from agents.agent_1_detective.log_parser import LogParser
 from config.logging_config import get_logger
+from config.settings import get_settings
 from models.analysis import (
     DetectiveReport,
     ErrorInfo,
@@ -20,6 +27,12 @@ from models.analysis import (
 
 logger = get_logger(__name__)
 
+# Distinct errors kept from a streamed log; the first ones are the most relevant
+MAX_STREAMED_ERRORS = 500
+
+# Failing lines blamed per suspected file
+MAX_BLAMED_LINES = 3
+
 
 @dataclass
 class DetectiveInput:
@@ -29,6 +42,16 @@ class DetectiveInput:
     logs: Optional[str] = None
     stack_trace: Optional[str] = None
     ci_output: Optional[str] = None
+    
+    # Log too large to hold in memory (e.g. a full CI run), parsed as it arrives
+    log_stream: Optional[AsyncIterable[str]] = None
+    
+    # Repository URL; incidents on the same repository share git analysis caches
+    repository: Optional[str] = None
+    
+    # Git checkout to read history and blame from (default: sanitized_repo_path).
+    # The sanitized copy has no .git, so the pipeline passes the original clone.
+    git_repo_path: Optional[str] = None
 
 
 @dataclass
@@ -52,6 +75,7 @@ class DetectiveAgent(BaseAgent[DetectiveInput, DetectiveOutput]):
     
     def __init__(self):
         super().__init__()
+        self.settings = get_settings()
         self.log_parser = LogParser()
     
     async def execute(
@@ -76,17 +100,30 @@ class DetectiveAgent(BaseAgent[DetectiveInput, DetectiveOutput]):
                 f"Repository path does not exist: {repo_path}",
             )
         
-        # Parse errors from all available sources
-        errors: List[ErrorInfo] = []
+        # Parse errors from all available sources, counting repeats of the
+        # same error (retries, parametrized tests, logs passed twice) once
+        error_index = ErrorIndex()
         
         if input_data.logs:
-            errors.extend(self.log_parser.parse(input_data.logs))
+            error_index.extend(self.log_parser.parse(input_data.logs))
         
         if input_data.stack_trace:
-            errors.extend(self.log_parser.parse(input_data.stack_trace))
+            error_index.extend(self.log_parser.parse(input_data.stack_trace))
         
         if input_data.ci_output:
-            errors.extend(self.log_parser.parse(input_data.ci_output))
+            error_index.extend(self.log_parser.parse(input_data.ci_output))
+        
+        if input_data.log_stream is not None:
+            streamed = 0
+            async with aclosing(self.log_parser.aparse_stream(input_data.log_stream)) as stream:
+                async for error in stream:
+                    if error_index.add(error):
+                        streamed += 1
+                    if streamed >= MAX_STREAMED_ERRORS:
+                        self.logger.info("Streamed log error limit reached", limit=MAX_STREAMED_ERRORS)
+                        break
+        
+        errors = error_index.errors()
         
         if not errors:
             self.logger.warning("No errors found in provided logs")
@@ -108,38 +145,48 @@ class DetectiveAgent(BaseAgent[DetectiveInput, DetectiveOutput]):
         primary_error = errors[0]
         failure_category = self._determine_failure_category(primary_error)
         
-        # Analyze git history
-        diff_analyzer = DiffAnalyzer(str(repo_path))
-        recent_commits = diff_analyzer.get_recent_commits(count=10)
+        git_path = Path(input_data.git_repo_path or repo_path)
+        git = GitRunner(
+            git_path,
+            max_concurrency=self.settings.DETECTIVE_GIT_CONCURRENCY,
+            timeout=self.settings.DETECTIVE_GIT_TIMEOUT_SECONDS,
+        )
+        diff_analyzer = DiffAnalyzer(str(git_path), git)
+        repository = input_data.repository or str(git_path.resolve())
+        blame = BlameEngine(git, repository)
+        has_history = await self._is_checkout_root(git, git_path)
+        if not has_history:
+            self.logger.warning("Not a git checkout, skipping history analysis", path=str(git_path))
         
         # Build list of suspected files
-        suspected_files: List[SuspectedFile] = []
+        suspected_by_path: Dict[str, SuspectedFile] = {}
         suspected_functions: List[SuspectedFunction] = []
         
         for error in errors:
             if error.file_path:
+                evidence = f"{error.error_type}: {error.message}"
+                if error.occurrences > 1:
+                    evidence += f" (x{error.occurrences})"
+                
                 # Find or update suspected file entry
-                existing = next(
-                    (f for f in suspected_files if f.path == error.file_path),
-                    None,
-                )
+                existing = suspected_by_path.get(error.file_path)
                 
                 if existing:
-                    # Increase confidence for multiple errors in same file
+                    # Increase confidence for multiple distinct errors in same file
                     existing.confidence = min(1.0, existing.confidence + 0.2)
                     if error.line_number and error.line_number not in existing.line_numbers:
                         existing.line_numbers.append(error.line_number)
-                    existing.evidence.append(f"{error.error_type}: {error.message}")
+                    existing.evidence.append(evidence)
                 else:
                     # Calculate confidence based on error type
                     confidence = self._calculate_file_confidence(error)
                     
-                    suspected_files.append(SuspectedFile(
+                    suspected_by_path[error.file_path] = SuspectedFile(
                         path=error.file_path,
                         confidence=confidence,
                         line_numbers=[error.line_number] if error.line_number else [],
-                        evidence=[f"{error.error_type}: {error.message}"],
-                    ))
+                        evidence=[evidence],
+                    )
                 
                 # Try to extract function name from stack trace
                 if error.stack_trace:
@@ -147,23 +194,60 @@ class DetectiveAgent(BaseAgent[DetectiveInput, DetectiveOutput]):
                     if func_info:
                         suspected_functions.append(func_info)
         
-        # Enhance with git history analysis
-        relevant_changes: List[RecentChange] = []
-        for sf in suspected_files:
-            changes = diff_analyzer.find_relevant_changes(
-                sf.path,
-                sf.line_numbers[0] if sf.line_numbers else None,
-                recent_commits,
+        suspected_files = list(suspected_by_path.values())
+        
+        # Read git history and blame the failing lines concurrently
+        blame_targets = [
+            (sf, line)
+            for sf in suspected_files
+            if has_history and self._is_repo_file(git_path, sf.path)
+            for line in sf.line_numbers[:MAX_BLAMED_LINES]
+        ]
+        history_read = asyncio.ensure_future(
+            self._read_history(git, diff_analyzer, repository, has_history),
+        )
+        try:
+            blames = await asyncio.gather(
+                *(blame.blame_line(sf.path, line) for sf, line in blame_targets),
             )
-            
-            # Boost confidence if file was recently changed
-            if changes:
-                sf.confidence = min(1.0, sf.confidence + 0.2)
+        except BaseException:
+            # Stop the history read and close any index it already opened
+            history_read.cancel()
+            await asyncio.wait([history_read])
+            self._discard_history(history_read)
+            raise
+        history, recent_commits = await history_read
+        
+        for (sf, line), commit in zip(blame_targets, blames):
+            if commit:
                 sf.evidence.append(
-                    f"Recently changed in commit: {changes[0].message[:50]}"
+                    f"Line {line} last changed in {commit.sha[:8]} by {commit.author}: "
+                    f"{commit.message[:50]}"
                 )
-            
-            relevant_changes.extend(changes)
+        
+        # Enhance with git history analysis
+        relevant_changes: List[RecentChange] = []
+        try:
+            for sf in suspected_files:
+                changes = diff_analyzer.find_relevant_changes(
+                    sf.path,
+                    sf.line_numbers[0] if sf.line_numbers else None,
+                    recent_commits,
+                    index=history,
+                    depth=self.settings.DETECTIVE_HISTORY_COMMITS,
+                )
+                
+                # Boost confidence if file was recently changed
+                if changes:
+                    sf.confidence = min(1.0, sf.confidence + 0.2)
+                    sf.evidence.append(
+                        f"Recently changed in commit: {changes[0].message[:50]}"
+                    )
+                
+                relevant_changes.extend(changes)
+        finally:
+            if history is not None:
+                history.close()
         
         # Deduplicate and sort changes
         seen_shas = set()
@@ -181,8 +265,9 @@ class DetectiveAgent(BaseAgent[DetectiveInput, DetectiveOutput]):
         overall_confidence = suspected_files[0].confidence if suspected_files else 0.0
         
         # Build evidence list
+        occurrences = sum(error.occurrences for error in errors)
         evidence = [
-            f"Found {len(errors)} error(s) in logs",
+            f"Found {len(errors)} distinct error(s) in logs ({occurrences} occurrence(s))",
             f"Primary error: {primary_error.error_type}: {primary_error.message}",
         ]
         if suspected_files:
@@ -211,6 +296,73 @@ class DetectiveAgent(BaseAgent[DetectiveInput, DetectiveOutput]):
             },
         )
     
+    async def _read_history(
+        self,
+        git: GitRunner,
+        diff_analyzer: DiffAnalyzer,
+        repository: str,
+        has_history: bool = True,
+    ) -> Tuple[Optional[HistoryIndex], List[CommitInfo]]:
+        """Bring the repository's history index up to HEAD.
+        
+        Falls back to reading the recent commits with git when the index
+        is disabled or cannot be updated.
+        
+        Returns:
+            The up-to-date index, or None and the recent commits (none
+            without a checkout)
+        """
+        if not has_history:
+            return None, []
+        
+        history = open_history_index(
+            self.settings.DETECTIVE_HISTORY_INDEX_DIR,
+            repository,
+            self.settings.DETECTIVE_HISTORY_INDEX_COMMITS,
+        )
+        if history is not None:
+            try:
+                updated = await history.update(git)
+            except BaseException:
+                history.close()
+                raise
+            if updated:
+                return history, []
+            history.close()
+        
+        return None, await diff_analyzer.aget_recent_commits(
+            count=self.settings.DETECTIVE_HISTORY_COMMITS,
+        )
+    
+    @staticmethod
+    def _discard_history(
+        history_read: "asyncio.Future[Tuple[Optional[HistoryIndex], List[CommitInfo]]]",
+    ) -> None:
+        """Close the index of a finished history read whose result is not needed."""
+        if history_read.cancelled() or history_read.exception():
+            return
+        history, _ = history_read.result()
+        if history is not None:
+            history.close()
+    
+    @staticmethod
+    async def _is_checkout_root(git: GitRunner, path: Path) -> bool:
+        """Whether a directory is the top level of a git checkout.
+        
+        Git searches parent directories, so without this a directory that
+        has no .git of its own would be analyzed, and cached under the
+        incident's repository, as whichever repository contains it.
+        """
+        output = await git.run('rev-parse', '--show-toplevel')
+        if output is None:
+            return False
+        return Path(output.decode().strip()).resolve() == path.resolve()
+    
+    @staticmethod
+    def _is_repo_file(repo_path: Path, file_path: str) -> bool:
+        """Whether an error's file path names a file in the repository."""
+        return not Path(file_path).is_absolute() and (repo_path / file_path).is_file()
+    
     def _determine_failure_category(self, error: ErrorInfo) -> str:
         """Determine the failure category from the primary error."""
         return self.log_parser.categorize_error(error)
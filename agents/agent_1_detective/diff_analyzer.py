@@ -2,14 +2,19 @@
 
 import re
 import subprocess
+from contextlib import aclosing
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
+from agents.agent_1_detective.git_runner import GitCommandError, GitRunner
 from config.logging_config import get_logger
 from models.analysis import RecentChange
 
+if TYPE_CHECKING:
+    from agents.agent_1_detective.history_index import HistoryIndex
+
 logger = get_logger(__name__)
 
 
@@ -48,6 +53,63 @@ class CommitInfo:
     files_changed: List[str] = field(default_factory=list)
 
 
+class _CommitLogParser:
+    """Incremental parser for ``git log -z --name-only`` output.
+    
+    Each commit written with `DiffAnalyzer.LOG_FORMAT` starts with an
+    empty field (paths are never empty), followed by its five header
+    fields and the paths it changed, the first prefixed with a newline.
+    """
+    
+    def __init__(self):
+        self._header: Optional[List[bytes]] = None
+        self._files: List[str] = []
+        self._pending = b''
+    
+    def feed(self, chunk: bytes) -> List[CommitInfo]:
+        """Parse a chunk of output, returning the commits it completed."""
+        *tokens, self._pending = (self._pending + chunk).split(b'\0')
+        commits: List[CommitInfo] = []
+        
+        for token in tokens:
+            if not token:
+                if self._header is not None:
+                    commits.append(self._commit())
+                self._header, self._files = [], []
+            elif self._header is None:
+                continue
+            elif len(self._header) < 5:
+                self._header.append(token)
+            else:
+                if not self._files and token.startswith(b'\n'):
+                    token = token[1:]
+                self._files.append(token.decode('utf-8', errors='surrogateescape'))
+        
+        return commits
+    
+    def finish(self) -> List[CommitInfo]:
+        """Return the last commit once the output has ended."""
+        if self._header is not None and len(self._header) == 5:
+            commit = self._commit()
+            self._header = None
+            return [commit]
+        return []
+    
+    def _commit(self) -> CommitInfo:
+        """Build the current commit from its header fields and paths."""
+        sha, author, email, timestamp, message = (
+            value.decode('utf-8', errors='replace') for value in self._header
+        )
+        return CommitInfo(
+            sha=sha,
+            author=author,
+            email=email,
+            timestamp=datetime.fromtimestamp(int(timestamp)),
+            message=message,
+            files_changed=self._files,
+        )
+
+
 class DiffAnalyzer:
     """Analyzes git diffs to find changes related to failures."""
     
@@ -56,13 +118,20 @@ class DiffAnalyzer:
     HUNK_HEADER = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
     FILE_STATUS = re.compile(r'^(new file mode|deleted file mode|rename from|rename to|Binary files)')
     
-    def __init__(self, repo_path: str):
+    # NUL-separated commit header for get_recent_commits; the leading
+    # empty field marks the start of each commit
+    LOG_FORMAT = '%x00%H%x00%an%x00%ae%x00%at%x00%s'
+    LOG_CHUNK_SIZE = 64 * 1024
+    
+    def __init__(self, repo_path: str, git: Optional[GitRunner] = None):
         """Initialize with repository path.
         
         Args:
             repo_path: Path to git repository
+            git: Runner for the async methods (default: one with default limits)
         """
         self.repo_path = Path(repo_path)
+        self.git = git or GitRunner(self.repo_path)
     
     def get_recent_commits(
         self,
@@ -71,6 +140,9 @@ class DiffAnalyzer:
     ) -> List[CommitInfo]:
         """Get recent commits from the repository.
         
+        Commits and the files they changed come from a single streamed
+        ``git log``, so hundreds of commits cost one process.
+        
         Args:
             count: Number of commits to retrieve
             branch: Branch to check (default: current branch)
@@ -78,65 +150,61 @@ class DiffAnalyzer:
         Returns:
             List of commit information
         """
-        try:
-            cmd = [
-                'git', 'log',
-                f'-n{count}',
-                '--format=%H|%an|%ae|%at|%s',
-            ]
-            if branch:
-                cmd.append(branch)
-            
-            result = subprocess.run(
-                cmd,
-                cwd=self.repo_path,
-                capture_output=True,
-                text=True,
-                check=True,
-            )
-            
-            commits = []
-            for line in result.stdout.strip().split('\n'):
-                if not line:
-                    continue
-                
-                parts = line.split('|', 4)
-                if len(parts) < 5:
-                    continue
-                
-                sha, author, email, timestamp, message = parts
-                
-                # Get files changed in this commit
-                files = self._get_commit_files(sha)
-                
-                commits.append(CommitInfo(
-                    sha=sha,
-                    author=author,
-                    email=email,
-                    timestamp=datetime.fromtimestamp(int(timestamp)),
-                    message=message,
-                    files_changed=files,
-                ))
-            
-            return commits
-            
-        except subprocess.CalledProcessError as e:
-            logger.warning("Failed to get git log", error=str(e))
+        process = subprocess.Popen(
+            ['git', *self._log_args(count, branch)],
+            cwd=self.repo_path,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        with process:
+            chunks = iter(lambda: process.stdout.read(self.LOG_CHUNK_SIZE), b'')
+            commits = list(self._parse_log_stream(chunks))
+        
+        if process.returncode != 0:
+            logger.warning("Failed to get git log", returncode=process.returncode)
             return []
+        
+        return commits
     
-    def _get_commit_files(self, sha: str) -> List[str]:
-        """Get list of files changed in a commit."""
+    async def aget_recent_commits(
+        self,
+        count: int = 10,
+        branch: Optional[str] = None,
+    ) -> List[CommitInfo]:
+        """Async `get_recent_commits`, streaming ``git log`` through `git`."""
+        parser = _CommitLogParser()
+        commits: List[CommitInfo] = []
         try:
-            result = subprocess.run(
-                ['git', 'diff-tree', '--no-commit-id', '--name-only', '-r', sha],
-                cwd=self.repo_path,
-                capture_output=True,
-                text=True,
-                check=True,
-            )
-            return [f for f in result.stdout.strip().split('\n') if f]
-        except subprocess.CalledProcessError:
+            async with aclosing(self.git.stream(*self._log_args(count, branch))) as chunks:
+                async for chunk in chunks:
+                    commits.extend(parser.feed(chunk))
+        except GitCommandError as e:
+            logger.warning("Failed to get git log", error=str(e))
             return []
+        
+        commits.extend(parser.finish())
+        return commits
+    
+    def _log_args(self, count: int, branch: Optional[str]) -> List[str]:
+        """``git log`` arguments listing commits with the files they changed."""
+        args = [
+            'log',
+            f'-n{count}',
+            '-z',
+            '--name-only',
+            '--no-renames',
+            f'--format={self.LOG_FORMAT}',
+        ]
+        if branch:
+            args.append(branch)
+        return args
+    
+    def _parse_log_stream(self, chunks: Iterable[bytes]) -> Iterator[CommitInfo]:
+        """Parse ``git log -z --name-only`` output written with `LOG_FORMAT`."""
+        parser = _CommitLogParser()
+        for chunk in chunks:
+            yield from parser.feed(chunk)
+        yield from parser.finish()
     
     def get_diff(
         self,
@@ -153,15 +221,6 @@ class DiffAnalyzer:
             List of file diffs
         """
         try:
-            result = subprocess.run(
-                ['git', 'diff', '--stat', from_ref, to_ref],
-                cwd=self.repo_path,
-                capture_output=True,
-                text=True,
-                check=True,
-            )
-            
-            # Get detailed diff
             result = subprocess.run(
                 ['git', 'diff', from_ref, to_ref],
                 cwd=self.repo_path,
@@ -176,6 +235,33 @@ class DiffAnalyzer:
             logger.warning("Failed to get git diff", error=str(e))
             return []
     
+    async def aget_diff(
+        self,
+        from_ref: str = 'HEAD~5',
+        to_ref: str = 'HEAD',
+        paths: Optional[List[str]] = None,
+    ) -> List[FileDiff]:
+        """Async `get_diff`, optionally limited to some paths.
+        
+        Args:
+            from_ref: Starting reference (default: 5 commits ago)
+            to_ref: Ending reference (default: HEAD)
+            paths: Only diff these paths (default: all)
+            
+        Returns:
+            List of file diffs
+        """
+        args = ['diff', from_ref, to_ref]
+        if paths:
+            args.extend(['--', *paths])
+        
+        output = await self.git.run(*args)
+        if output is None:
+            logger.warning("Failed to get git diff", from_ref=from_ref, to_ref=to_ref)
+            return []
+        
+        return self._parse_diff_output(output.decode('utf-8', errors='replace'))
+    
     def _parse_diff_output(self, diff_output: str) -> List[FileDiff]:
         """Parse git diff output into structured format."""
         diffs: List[FileDiff] = []
@@ -262,17 +348,28 @@ class DiffAnalyzer:
         file_path: str,
         line_number: Optional[int] = None,
         commits: Optional[List[CommitInfo]] = None,
+        index: Optional["HistoryIndex"] = None,
+        depth: int = 10,
     ) -> List[RecentChange]:
         """Find changes to a specific file that might be relevant.
         
+        With a history index the lookup is a query, and a direct change
+        whose hunks are all far from ``line_number`` ranks just below one
+        that touched lines near it.
+        
         Args:
             file_path: Path to file to check
             line_number: Specific line number (optional)
             commits: Pre-fetched commits (optional)
+            index: History index to query instead of ``commits`` (optional)
+            depth: Most recent indexed commits to consider
             
         Returns:
             List of relevant changes with relevance scores
         """
+        if index is not None:
+            return index.relevant_changes(file_path, line_number, depth)
+        
         if commits is None:
             commits = self.get_recent_commits()
         
@@ -365,38 +462,60 @@ class DiffAnalyzer:
         """
         try:
             result = subprocess.run(
-                [
-                    'git', 'blame',
-                    f'-L{line_number},{line_number}',
-                    '--porcelain',
-                    file_path,
-                ],
+                ['git', *self._blame_args(file_path, line_number)],
                 cwd=self.repo_path,
                 capture_output=True,
                 text=True,
                 check=True,
             )
-            
-            lines = result.stdout.strip().split('\n')
-            if not lines:
-                return None
-            
-            sha = lines[0].split()[0]
-            
-            # Parse porcelain output
-            data: Dict[str, str] = {}
-            for line in lines[1:]:
-                if ' ' in line:
-                    key, value = line.split(' ', 1)
-                    data[key] = value
-            
-            return CommitInfo(
-                sha=sha,
-                author=data.get('author', 'Unknown'),
-                email=data.get('author-mail', '').strip('<>'),
-                timestamp=datetime.fromtimestamp(int(data.get('author-time', '0'))),
-                message=data.get('summary', ''),
-            )
-            
         except subprocess.CalledProcessError:
             return None
+        
+        return self._parse_blame_output(result.stdout)
+    
+    async def aget_blame(
+        self,
+        file_path: str,
+        line_number: int,
+    ) -> Optional[CommitInfo]:
+        """Async `get_blame`; several lines can be blamed concurrently."""
+        output = await self.git.run(*self._blame_args(file_path, line_number))
+        if output is None:
+            return None
+        
+        return self._parse_blame_output(output.decode('utf-8', errors='replace'))
+    
+    @staticmethod
+    def _blame_args(file_path: str, line_number: int) -> List[str]:
+        """``git blame`` arguments for one line."""
+        return [
+            'blame',
+            f'-L{line_number},{line_number}',
+            '--porcelain',
+            '--',
+            file_path,
+        ]
+    
+    @staticmethod
+    def _parse_blame_output(output: str) -> Optional[CommitInfo]:
+        """Parse porcelain ``git blame`` output for a single line."""
+        lines = output.strip().split('\n')
+        if not lines or not lines[0]:
+            return None
+        
+        sha = lines[0].split()[0]
+        
+        # Parse porcelain output
+        data: Dict[str, str] = {}
+        for line in lines[1:]:
+            if ' ' in line:
+                key, value = line.split(' ', 1)
+                data[key] = value
+        
+        return CommitInfo(
+            sha=sha,
+            author=data.get('author', 'Unknown'),
+            email=data.get('author-mail', '').strip('<>'),
+            timestamp=datetime.fromtimestamp(int(data.get('author-time', '0'))),
+            message=data.get('summary', ''),
+        )
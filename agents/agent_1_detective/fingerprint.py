@@ -0,0 +1,100 @@
+"""Error fingerprints, for counting repeated errors once.
+
+A failing parametrized test or a retry loop prints the same exception
+many times, with only ids, addresses or counters changing. The
+fingerprint hashes the error type, the message with those variable
+parts masked, and the innermost frames, so repeats collapse into one
+`ErrorInfo` with an occurrence count (see `ErrorIndex`) and Detective's
+work follows the number of distinct errors rather than log lines.
+"""
+
+import hashlib
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from models.analysis import ErrorInfo
+
+# Innermost frames that identify where an error was raised
+SIGNATURE_FRAMES = 5
+
+_VARIABLE_PARTS = [
+    (re.compile(r'\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b'), '<uuid>'),
+    (re.compile(r'\b0x[0-9a-fA-F]+\b'), '<addr>'),
+    # Hashes and ids: long hex runs with at least one digit
+    (re.compile(r'\b(?=[0-9a-fA-F]*\d)[0-9a-fA-F]{12,}\b'), '<hex>'),
+    (re.compile(r'\d+(?:\.\d+)?'), '<n>'),
+]
+
+
+def normalize_message(message: str) -> str:
+    """Mask the parts of an error message that vary between repeats.
+
+    UUIDs, memory addresses, long hex ids and numbers are replaced by
+    placeholders: "Timeout after 30s (id 0x7f3a)" and "Timeout after 31s
+    (id 0x91bc)" normalize to the same text.
+    """
+    for pattern, placeholder in _VARIABLE_PARTS:
+        message = pattern.sub(placeholder, message)
+    return message.strip()
+
+
+def error_fingerprint(
+    error_type: str,
+    message: str,
+    frames: Sequence[Tuple[Optional[str], Optional[int]]] = (),
+) -> str:
+    """Stable fingerprint of an error.
+
+    Args:
+        error_type: Exception or error type name
+        message: Error message, normalized here
+        frames: (path, line) innermost first; only the first
+            `SIGNATURE_FRAMES` are used
+
+    Returns:
+        16 hex digits
+    """
+    signature = "|".join(f"{path}:{line}" for path, line in frames[:SIGNATURE_FRAMES])
+    key = f"{error_type}\0{normalize_message(message)}\0{signature}"
+    return hashlib.sha1(key.encode("utf-8", errors="surrogatepass")).hexdigest()[:16]
+
+
+def fingerprint_error(error: ErrorInfo) -> str:
+    """Fingerprint an error by its type, message and location."""
+    frames = [(error.file_path, error.line_number)] if error.file_path else []
+    return error_fingerprint(error.error_type, error.message, frames)
+
+
+class ErrorIndex:
+    """Distinct errors by fingerprint, with occurrence counts."""
+
+    def __init__(self):
+        self._errors: Dict[str, ErrorInfo] = {}
+
+    def __len__(self) -> int:
+        return len(self._errors)
+
+    def add(self, error: ErrorInfo) -> bool:
+        """Count an error, keeping the first occurrence of each fingerprint.
+
+        Returns:
+            True if the error was not seen before
+        """
+        if error.fingerprint is None:
+            error.fingerprint = fingerprint_error(error)
+
+        seen = self._errors.get(error.fingerprint)
+        if seen is not None:
+            seen.occurrences += error.occurrences
+            return False
+        self._errors[error.fingerprint] = error
+        return True
+
+    def extend(self, errors: Iterable[ErrorInfo]) -> None:
+        """Count several errors."""
+        for error in errors:
+            self.add(error)
+
+    def errors(self) -> List[ErrorInfo]:
+        """Distinct errors in the order they were first seen."""
+        return list(self._errors.values())
@@ -0,0 +1,162 @@
+"""Non-blocking git commands for the Detective agent.
+
+`DetectiveAgent.execute` runs on the API's event loop, so git must not
+be run with blocking `subprocess` calls there: webhooks would wait for
+every ``git log`` and ``git blame``. `GitRunner` runs git through
+`asyncio.create_subprocess_exec`, bounds how many git processes one
+analysis runs at once, kills commands that exceed their timeout, and
+can stream stdout so large outputs are parsed as they arrive.
+"""
+
+import asyncio
+import os
+import signal
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Optional, Tuple
+
+from config.git_auth import git_env
+from config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Defaults for a runner created without settings
+DEFAULT_CONCURRENCY = 4
+DEFAULT_TIMEOUT = 60.0
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class GitCommandError(Exception):
+    """A streamed git command failed or timed out."""
+
+
+class GitRunner:
+    """Runs git commands in one repository without blocking the event loop."""
+
+    def __init__(
+        self,
+        repo_path: Path,
+        max_concurrency: int = DEFAULT_CONCURRENCY,
+        timeout: float = DEFAULT_TIMEOUT,
+    ):
+        """Initialize the runner.
+
+        Args:
+            repo_path: Repository the commands run in
+            max_concurrency: Git processes allowed at once; others wait
+            timeout: Seconds allowed per command, including streaming
+        """
+        self.repo_path = Path(repo_path)
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    @staticmethod
+    def _env() -> dict:
+        """Environment for git: never prompt, but pass configured credentials
+        (blame and log fetch missing blobs in partial clones)."""
+        return git_env()
+
+    @asynccontextmanager
+    async def _process(
+        self,
+        args: Tuple[str, ...],
+        stderr: int,
+    ) -> AsyncIterator[asyncio.subprocess.Process]:
+        """Start git once a slot is free, killing it if still running on exit.
+
+        Git runs in its own process group so that helpers it started
+        (hooks, credential helpers, ssh) are killed too; otherwise they
+        would keep the output pipe open.
+        """
+        async with self._semaphore:
+            proc = await asyncio.create_subprocess_exec(
+                "git", *args,
+                cwd=str(self.repo_path),
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=stderr,
+                env=self._env(),
+                start_new_session=True,
+            )
+            try:
+                yield proc
+            finally:
+                if proc.returncode is None:
+                    try:
+                        os.killpg(proc.pid, signal.SIGKILL)
+                    except ProcessLookupError:
+                        pass
+                    await proc.wait()
+
+    async def run(self, *args: str) -> Optional[bytes]:
+        """Run a git command to completion.
+
+        Args:
+            *args: Arguments after ``git``
+
+        Returns:
+            stdout, or None if git failed, timed out or could not start
+        """
+        try:
+            async with self._process(args, asyncio.subprocess.PIPE) as proc:
+                stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            logger.warning("git command timed out", command=args[0], timeout=self.timeout)
+            return None
+        except OSError as e:
+            logger.warning("git command failed", command=args[0], error=str(e))
+            return None
+
+        if proc.returncode != 0:
+            logger.debug(
+                "git command failed",
+                command=args[0],
+                error=stderr.decode('utf-8', errors='replace')[:500],
+            )
+            return None
+
+        return stdout
+
+    async def stream(self, *args: str, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        """Run a git command, yielding stdout as it is produced.
+
+        The timeout covers the whole command, including time spent by the
+        consumer between chunks. Closing the iterator early kills git.
+
+        Args:
+            *args: Arguments after ``git``
+            chunk_size: Maximum bytes per chunk
+
+        Yields:
+            Chunks of stdout
+
+        Raises:
+            GitCommandError: If git failed, timed out or could not start;
+                raised after the output it produced has been yielded
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+
+        try:
+            async with self._process(args, asyncio.subprocess.DEVNULL) as proc:
+                while True:
+                    chunk = await asyncio.wait_for(
+                        proc.stdout.read(chunk_size),
+                        timeout=max(0.0, deadline - loop.time()),
+                    )
+                    if not chunk:
+                        break
+                    yield chunk
+
+                returncode = await asyncio.wait_for(
+                    proc.wait(),
+                    timeout=max(0.0, deadline - loop.time()),
+                )
+        except asyncio.TimeoutError as e:
+            raise GitCommandError(f"git {args[0]} timed out after {self.timeout}s") from e
+        except OSError as e:
+            raise GitCommandError(f"git {args[0]} could not start: {e}") from e
+
+        if returncode != 0:
+            raise GitCommandError(f"git {args[0]} exited with status {returncode}")
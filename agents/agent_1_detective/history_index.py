@@ -0,0 +1,434 @@
+"""Persistent per-repository index of which commits changed which lines.
+
+Detective asks, for every suspected file, which recent commits touched
+it or its neighbours. Answering that from a list of commits means
+comparing every changed path of every commit with the suspect, and
+re-reading history with git for each incident. `HistoryIndex` keeps the
+answer in an SQLite database per monitored repository: commits (SHA,
+author, time, subject) and, per commit, the paths it changed with the
+line ranges of each hunk, indexed by path, directory and parent
+directory.
+
+`HistoryIndex.update` brings the index up to HEAD with a single
+``git log -p -U0`` over the commits it has not seen (the whole recent
+history the first time), so an incident pays for new commits only.
+Commit ids increase with recency, so "the last N commits" is a range;
+the index only ever holds commits reachable from the indexed HEAD, and
+is rebuilt when HEAD stops descending from it (force-push, new branch).
+"""
+
+import hashlib
+import os
+import sqlite3
+from collections import defaultdict
+from contextlib import aclosing, contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path, PurePosixPath
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from agents.agent_1_detective.diff_analyzer import DiffAnalyzer
+from agents.agent_1_detective.git_runner import GitCommandError, GitRunner
+from config.logging_config import get_logger
+from models.analysis import RecentChange
+
+logger = get_logger(__name__)
+
+# Commits kept in an index; older ones are pruned
+MAX_INDEXED_COMMITS = 5000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS commits (
+    id INTEGER PRIMARY KEY,
+    sha TEXT NOT NULL UNIQUE,
+    author TEXT NOT NULL,
+    email TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    message TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS changes (
+    commit_id INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    dir TEXT NOT NULL,
+    grandparent TEXT NOT NULL,
+    stem TEXT NOT NULL,
+    suffix TEXT NOT NULL,
+    start_line INTEGER,
+    end_line INTEGER
+);
+CREATE INDEX IF NOT EXISTS changes_path ON changes (path, commit_id);
+CREATE INDEX IF NOT EXISTS changes_dir ON changes (dir, commit_id);
+CREATE INDEX IF NOT EXISTS changes_grandparent ON changes (grandparent, commit_id);
+CREATE INDEX IF NOT EXISTS changes_commit ON changes (commit_id);
+"""
+
+# Score of one changed file's relation to the target file, as computed by
+# DiffAnalyzer._calculate_relatedness (same additions in the same order)
+RELATEDNESS_SQL = """
+    (CASE WHEN dir = :dir THEN 0.6 WHEN grandparent = :grandparent THEN 0.4 ELSE 0.0 END)
+    + (CASE WHEN suffix = :suffix THEN 0.2 ELSE 0.0 END)
+    + (CASE
+        WHEN :is_test AND instr(stem, :core) > 0 THEN 0.3
+        WHEN instr(lower(path), 'test') > 0 AND instr(:stem, replace(stem, 'test_', '')) > 0 THEN 0.3
+        ELSE 0.0
+    END)
+"""
+
+# Lines around a change that count as near it
+NEAR_LINES = 10
+
+# NUL-separated commit header; a line starting with NUL is never patch text
+LOG_FORMAT = '%x00%H%x00%an%x00%ae%x00%at%x00%s'
+
+_C_ESCAPES = {
+    ord('a'): 7, ord('b'): 8, ord('t'): 9, ord('n'): 10,
+    ord('v'): 11, ord('f'): 12, ord('r'): 13, ord('"'): 34, ord('\\'): 92,
+}
+
+
+@dataclass
+class _ParsedCommit:
+    """A commit read from ``git log -p``: header fields and changed lines."""
+    header: List[str]
+    changes: Dict[str, List[Tuple[int, int]]] = field(default_factory=dict)
+
+
+def _touches_line(line_ranges: List[Tuple[int, int]], line_number: Optional[int]) -> bool:
+    """Whether changed line ranges are near a line (True if either is unknown)."""
+    if line_number is None or not line_ranges:
+        return True
+    return any(start - NEAR_LINES <= line_number <= end + NEAR_LINES for start, end in line_ranges)
+
+
+def _unquote_path(raw: bytes) -> bytes:
+    """Undo git's C-style quoting of a path (``"a\\tb"``)."""
+    if not raw.startswith(b'"'):
+        return raw
+    out = bytearray()
+    i = 1
+    while i < len(raw) and raw[i] != ord('"'):
+        if raw[i] == ord('\\') and i + 1 < len(raw):
+            escape = raw[i + 1]
+            if ord('0') <= escape <= ord('7'):
+                out.append(int(raw[i + 1:i + 4], 8))
+                i += 4
+                continue
+            out.append(_C_ESCAPES.get(escape, escape))
+            i += 2
+            continue
+        out.append(raw[i])
+        i += 1
+    return bytes(out)
+
+
+def _diff_header_path(rest: bytes) -> bytes:
+    """Path from ``diff --git a/P b/P`` (renames off, so both sides match)."""
+    if rest.startswith(b'"'):
+        return _unquote_path(rest)[2:]
+    return rest[2:2 + (len(rest) - 5) // 2]
+
+
+class _PatchLogParser:
+    """Incremental parser for ``git log -p -U0`` written with `LOG_FORMAT`."""
+
+    def __init__(self):
+        self.commits: List[_ParsedCommit] = []
+        self._path: Optional[str] = None
+        self._pending = b''
+
+    def feed(self, chunk: bytes) -> None:
+        """Parse a chunk of output."""
+        *lines, self._pending = (self._pending + chunk).split(b'\n')
+        for line in lines:
+            self._line(line)
+
+    def finish(self) -> List[_ParsedCommit]:
+        """Parsed commits, in output order, once the output has ended."""
+        if self._pending:
+            self._line(self._pending)
+            self._pending = b''
+        return self.commits
+
+    def _line(self, line: bytes) -> None:
+        if line.startswith(b'\0'):
+            header = [value.decode('utf-8', errors='replace') for value in line[1:].split(b'\0')]
+            if len(header) == 5:
+                self.commits.append(_ParsedCommit(header))
+            self._path = None
+        elif not self.commits:
+            return
+        elif line.startswith(b'diff --git '):
+            raw = _diff_header_path(line[len(b'diff --git '):])
+            self._path = raw.decode('utf-8', errors='surrogateescape')
+            self.commits[-1].changes.setdefault(self._path, [])
+        elif line.startswith(b'@@ ') and self._path is not None:
+            match = DiffAnalyzer.HUNK_HEADER.match(line.decode('ascii', errors='replace'))
+            if match:
+                start = int(match.group(3))
+                count = int(match.group(4) or 1)
+                # Pure deletions are recorded at the line they followed
+                self.commits[-1].changes[self._path].append((start, start + max(count, 1) - 1))
+
+
+class HistoryIndex:
+    """SQLite index of recent commits and the lines they changed, per repository."""
+
+    def __init__(self, db_path: Path, max_commits: int = MAX_INDEXED_COMMITS):
+        """Open (creating if needed) an index database.
+
+        Args:
+            db_path: SQLite database file
+            max_commits: Commits kept; the oldest are pruned beyond this
+        """
+        self.db_path = db_path
+        self.max_commits = max_commits
+        self.db = sqlite3.connect(str(db_path), timeout=30, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """Close the database."""
+        self.db.close()
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM commits").fetchone()[0]
+
+    @property
+    def head(self) -> Optional[str]:
+        """Commit the index was last brought up to."""
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'head'").fetchone()
+        return row[0] if row else None
+
+    async def update(self, git: GitRunner) -> bool:
+        """Index the commits reachable from HEAD that are not indexed yet.
+
+        When the last indexed commit is an ancestor of HEAD, only the
+        commits after it are read. Otherwise (first run, shallow clone,
+        rewritten history, another branch) the index is rebuilt from the
+        latest `max_commits`, so commits HEAD no longer reaches are not
+        kept among "the last N".
+
+        Args:
+            git: Runner for the repository's git commands
+
+        Returns:
+            True if the index is up to date with HEAD
+        """
+        output = await git.run('rev-parse', '--verify', 'HEAD^{commit}')
+        if output is None:
+            return False
+        head = output.decode().strip()
+
+        last = self.head
+        if last == head:
+            return True
+
+        revisions = [head]
+        rebuild = last is not None
+        if last and await git.run('merge-base', '--is-ancestor', last, head) is not None:
+            revisions.append(f'^{last}')
+            rebuild = False
+
+        parser = _PatchLogParser()
+        args = [
+            '-c', 'core.quotePath=false',
+            'log', '--reverse', f'-n{self.max_commits}',
+            '-p', '-U0', '--no-renames', '--no-color', '--no-ext-diff',
+            f'--format={LOG_FORMAT}',
+            *revisions,
+        ]
+        try:
+            async with aclosing(git.stream(*args)) as chunks:
+                async for chunk in chunks:
+                    parser.feed(chunk)
+        except GitCommandError as e:
+            logger.warning("Failed to index git history", error=str(e))
+            return False
+
+        try:
+            added = self._store(parser.finish(), head, rebuild)
+        except sqlite3.Error as e:
+            logger.warning("Failed to store git history index", error=str(e))
+            return False
+        logger.info("Git history indexed", commits=added, total=len(self))
+        return True
+
+    def _store(self, commits: List[_ParsedCommit], head: str, rebuild: bool = False) -> int:
+        """Insert commits (oldest first) in one transaction, then prune.
+
+        With ``rebuild``, the indexed commits are dropped first.
+        """
+        added = 0
+        with self._transaction():
+            if rebuild:
+                self.db.execute("DELETE FROM changes")
+                self.db.execute("DELETE FROM commits")
+            for parsed in commits:
+                sha, author, email, timestamp, message = parsed.header
+                cursor = self.db.execute(
+                    "INSERT OR IGNORE INTO commits (sha, author, email, timestamp, message) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (sha, author, email, int(timestamp), message),
+                )
+                if not cursor.rowcount:
+                    continue
+                added += 1
+                commit_id = cursor.lastrowid
+                rows = []
+                for path, ranges in parsed.changes.items():
+                    pure = PurePosixPath(path)
+                    location = (
+                        commit_id, path, str(pure.parent), str(pure.parent.parent),
+                        pure.stem, pure.suffix,
+                    )
+                    rows.extend(location + line_range for line_range in ranges or [(None, None)])
+                self.db.executemany("INSERT INTO changes VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('head', ?)", (head,))
+
+            floor = self._window_floor(self.max_commits)
+            if floor:
+                self.db.execute("DELETE FROM changes WHERE commit_id < ?", (floor,))
+                self.db.execute("DELETE FROM commits WHERE id < ?", (floor,))
+        return added
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        """Write transaction taking the database lock up front."""
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        self.db.execute("COMMIT")
+
+    def _window_floor(self, depth: int) -> int:
+        """Smallest commit id among the ``depth`` most recent (0 if fewer)."""
+        row = self.db.execute(
+            "SELECT id FROM commits ORDER BY id DESC LIMIT 1 OFFSET ?",
+            (max(depth, 1) - 1,),
+        ).fetchone()
+        return row[0] if row else 0
+
+    def relevant_changes(
+        self,
+        file_path: str,
+        line_number: Optional[int] = None,
+        depth: int = 10,
+        limit: int = 5,
+    ) -> List[RecentChange]:
+        """Recent commits that changed a file or files related to it.
+
+        Scores match `DiffAnalyzer.find_relevant_changes` over the same
+        commits: a direct change scores 1.0 (0.9 if none of its hunks is
+        within `NEAR_LINES` of ``line_number``), and other commits score
+        the best `RELATEDNESS_SQL` (the SQL form of
+        `DiffAnalyzer._calculate_relatedness`) of their files, if at
+        least 0.3. Only the returned commits are loaded.
+
+        Args:
+            file_path: Path relative to the repository root
+            line_number: Failing line (optional)
+            depth: Number of most recent commits to consider
+            limit: Maximum changes returned
+
+        Returns:
+            Changes by relevance, newest first among equals
+        """
+        floor = self._window_floor(depth)
+
+        direct_ranges: Dict[int, List[Tuple[int, int]]] = defaultdict(list)
+        for commit_id, start, end in self.db.execute(
+            "SELECT commit_id, start_line, end_line FROM changes "
+            "WHERE path = ? AND commit_id >= ?",
+            (file_path, floor),
+        ):
+            if start is not None:
+                direct_ranges[commit_id].append((start, end))
+            else:
+                direct_ranges.setdefault(commit_id, [])
+
+        scores = {
+            commit_id: 1.0 if _touches_line(ranges, line_number) else 0.9
+            for commit_id, ranges in direct_ranges.items()
+        }
+
+        target = PurePosixPath(file_path)
+        for commit_id, score in self.db.execute(
+            f"SELECT commit_id, MIN(1.0, MAX({RELATEDNESS_SQL})) AS score FROM changes "
+            "WHERE commit_id >= :floor GROUP BY commit_id HAVING score >= 0.3",
+            {
+                "floor": floor,
+                "dir": str(target.parent),
+                "grandparent": str(target.parent.parent),
+                "suffix": target.suffix,
+                "stem": target.stem,
+                "is_test": 'test' in file_path.lower(),
+                "core": target.stem.replace('test_', ''),
+            },
+        ):
+            scores.setdefault(commit_id, score)
+
+        ranked = sorted(scores, key=lambda commit_id: (scores[commit_id], commit_id), reverse=True)[:limit]
+        if not ranked:
+            return []
+
+        placeholders = ",".join("?" * len(ranked))
+        files: Dict[int, List[str]] = defaultdict(list)
+        for commit_id, path in self.db.execute(
+            f"SELECT DISTINCT commit_id, path FROM changes WHERE commit_id IN ({placeholders}) "
+            "ORDER BY commit_id, path",
+            ranked,
+        ):
+            files[commit_id].append(path)
+
+        commits = {
+            row[0]: row[1:] for row in self.db.execute(
+                f"SELECT id, sha, author, message, timestamp FROM commits WHERE id IN ({placeholders})",
+                ranked,
+            )
+        }
+        changes = []
+        for commit_id in ranked:
+            sha, author, message, timestamp = commits[commit_id]
+            changes.append(RecentChange(
+                commit_sha=sha,
+                author=author,
+                message=message,
+                timestamp=datetime.fromtimestamp(timestamp),
+                files_changed=files[commit_id],
+                relevance_score=scores[commit_id],
+            ))
+        return changes
+
+
+def open_history_index(
+    index_dir: Optional[str],
+    repository: str,
+    max_commits: int = MAX_INDEXED_COMMITS,
+) -> Optional[HistoryIndex]:
+    """Open the history index of a repository, or return None if disabled.
+
+    An index that cannot be opened disables it for this analysis instead
+    of failing Detective.
+
+    Args:
+        index_dir: Directory holding one database per repository
+        repository: Repository identity, e.g. its URL
+        max_commits: Commits kept in the index
+    """
+    if not index_dir:
+        return None
+    name = hashlib.sha256(repository.encode()).hexdigest()[:32]
+    try:
+        directory = Path(os.path.expanduser(index_dir))
+        directory.mkdir(parents=True, exist_ok=True)
+        return HistoryIndex(directory / f"{name}.sqlite", max_commits)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning("Failed to open git history index", error=str(e))
+        return None
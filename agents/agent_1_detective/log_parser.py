@@ -1,11 +1,10 @@
 """Log parser for the Detective agent."""
 
 import json
-import re
-from dataclasses import dataclass, field
-from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from dataclasses import dataclass
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, List, Optional
 
+from agents.agent_1_detective.log_tokenizer import LogTokenizer
 from models.analysis import ErrorInfo
 
 
@@ -30,44 +29,12 @@ class StackFrame:
 
 
 class LogParser:
-    """Multi-format log parser for error extraction."""
+    """Multi-format log parser for error extraction.
     
-    # Patterns for different log formats
-    PYTHON_TRACEBACK = re.compile(
-        r'Traceback \(most recent call last\):\n(.*?)(?:^(\w+(?:Error|Exception|Warning)): (.+))$',
-        re.MULTILINE | re.DOTALL
-    )
-    
-    PYTHON_FRAME = re.compile(
-        r'^\s*File "([^"]+)", line (\d+), in (\w+)\n\s*(.+)?$',
-        re.MULTILINE
-    )
-    
-    PYTHON_ERROR_LINE = re.compile(
-        r'^(\w+(?:Error|Exception|Warning)): (.+)$',
-        re.MULTILINE
-    )
-    
-    # Node.js/JavaScript patterns
-    JS_STACK_FRAME = re.compile(
-        r'^\s+at (?:(.+?) \()?((?:[A-Za-z]:)?[^:]+):(\d+):\d+\)?$',
-        re.MULTILINE
-    )
-    
-    JS_ERROR = re.compile(
-        r'^((?:\w+)?Error): (.+)$',
-        re.MULTILINE
-    )
-    
-    # Generic error patterns
-    GENERIC_ERROR = re.compile(
-        r'(?:ERROR|Error|error|FATAL|Fatal|fatal)[:\s]+(.+)',
-        re.MULTILINE
-    )
-    
-    HTTP_ERROR = re.compile(
-        r'(?:HTTP[/\s]?\d+\.\d+\s+)?(\d{3})\s+(.+)',
-    )
+    Errors are found in a single pass by `LogTokenizer`, which recognizes
+    Python, Node.js, Java, Go and Rust errors and falls back to generic
+    error lines.
+    """
     
     def parse(self, log_content: str) -> List[ErrorInfo]:
         """Parse log content and extract errors.
@@ -78,156 +45,42 @@ class LogParser:
         Returns:
             List of extracted error information
         """
-        errors: List[ErrorInfo] = []
-        
-        # Try Python traceback parsing first
-        python_errors = self._parse_python_traceback(log_content)
-        
-        # Try JavaScript stack trace
-        js_errors = self._parse_js_stack(log_content)
-        
-        # Prefer the parser that found file paths
-        if python_errors and any(e.file_path for e in python_errors):
-            errors.extend(python_errors)
-        elif js_errors and any(e.file_path for e in js_errors):
-            errors.extend(js_errors)
-        elif python_errors:
-            errors.extend(python_errors)
-        elif js_errors:
-            errors.extend(js_errors)
-        
-        # Try generic error patterns if no structured errors found
-        if not errors:
-            generic_errors = self._parse_generic_errors(log_content)
-            errors.extend(generic_errors)
-        
-        return errors
+        return list(self.parse_stream([log_content]))
     
-    def _parse_python_traceback(self, content: str) -> List[ErrorInfo]:
-        """Parse Python traceback format."""
-        errors: List[ErrorInfo] = []
+    def parse_stream(self, chunks: Iterable[str]) -> Iterator[ErrorInfo]:
+        """Parse a log incrementally, yielding errors as they complete.
         
-        # Find error lines
-        for match in self.PYTHON_ERROR_LINE.finditer(content):
-            error_type = match.group(1)
-            error_message = match.group(2)
-            
-            # Try to find associated stack trace
-            stack_start = content.rfind('Traceback (most recent call last):', 0, match.start())
-            
-            file_path = None
-            line_number = None
-            stack_trace = None
-            
-            if stack_start != -1:
-                stack_trace = content[stack_start:match.end()]
-                
-                # Parse frames to find the last user code frame
-                frames = list(self.PYTHON_FRAME.finditer(stack_trace))
-                
-                # Find the most relevant frame (last non-library frame)
-                for frame in reversed(frames):
-                    frame_path = frame.group(1)
-                    # Skip standard library and site-packages
-                    if not any(skip in frame_path for skip in [
-                        'site-packages', 'lib/python', '/usr/lib/',
-                        'venv/', '.venv/', 'anaconda', 'miniconda'
-                    ]):
-                        file_path = frame_path
-                        line_number = int(frame.group(2))
-                        break
-                
-                # Fallback to last frame if no user code found
-                if file_path is None and frames:
-                    file_path = frames[-1].group(1)
-                    line_number = int(frames[-1].group(2))
-            
-            errors.append(ErrorInfo(
-                error_type=error_type,
-                message=error_message,
-                file_path=file_path,
-                line_number=line_number,
-                stack_trace=stack_trace,
-            ))
-        
-        return errors
-    
-    def _parse_js_stack(self, content: str) -> List[ErrorInfo]:
-        """Parse JavaScript stack trace format."""
-        errors: List[ErrorInfo] = []
+        Memory use is bounded by the longest stack trace (see the
+        ``MAX_*`` limits in `log_tokenizer`), not by the log, and each line
+        is examined once. Generic error lines are only reported, at the
+        end, if the log has no structured errors.
         
-        for match in self.JS_ERROR.finditer(content):
-            error_type = match.group(1)
-            error_message = match.group(2)
-            
-            # Look for stack frames after this error
-            stack_start = match.end()
-            remaining = content[stack_start:]
-            
-            # Collect stack frames
-            frames: List[Tuple[str, str, int]] = []
-            for frame_match in self.JS_STACK_FRAME.finditer(remaining):
-                func_name = frame_match.group(1) or "<anonymous>"
-                file_path = frame_match.group(2)
-                line_num = int(frame_match.group(3))
-                frames.append((func_name, file_path, line_num))
-                
-                # Stop after finding frames (before next error or end)
-                if len(frames) > 20:
-                    break
-            
-            # Find first non-node_modules frame
-            file_path = None
-            line_number = None
-            for func, path, line in frames:
-                if 'node_modules' not in path:
-                    # Normalize path: strip leading slash for relative paths
-                    file_path = path.lstrip('/')
-                    line_number = line
-                    break
-            
-            if file_path is None and frames:
-                _, path, line_number = frames[0]
-                file_path = path.lstrip('/')
+        Args:
+            chunks: Log text in pieces of any size, e.g. an open file
             
-            errors.append(ErrorInfo(
-                error_type=error_type,
-                message=error_message,
-                file_path=file_path,
-                line_number=line_number,
-                stack_trace=remaining[:500] if frames else None,
-            ))
-        
-        return errors
+        Yields:
+            Extracted error information
+        """
+        tokenizer = LogTokenizer()
+        for chunk in chunks:
+            yield from tokenizer.feed(chunk)
+        yield from tokenizer.finish()
     
-    def _parse_generic_errors(self, content: str) -> List[ErrorInfo]:
-        """Parse generic error patterns."""
-        errors: List[ErrorInfo] = []
+    async def aparse_stream(self, chunks: AsyncIterable[str]) -> AsyncIterator[ErrorInfo]:
+        """Parse a log arriving asynchronously; see `parse_stream`.
         
-        for match in self.GENERIC_ERROR.finditer(content):
-            message = match.group(1).strip()
-            
-            # Try to extract file/line from message
-            file_match = re.search(r'([^\s:]+):(\d+)', message)
-            file_path = file_match.group(1) if file_match else None
-            line_number = int(file_match.group(2)) if file_match else None
+        Args:
+            chunks: Log text in pieces of any size, e.g. an HTTP response body
             
-            errors.append(ErrorInfo(
-                error_type="Error",
-                message=message,
-                file_path=file_path,
-                line_number=line_number,
-            ))
-        
-        # Deduplicate by message
-        seen_messages = set()
-        unique_errors = []
-        for error in errors:
-            if error.message not in seen_messages:
-                seen_messages.add(error.message)
-                unique_errors.append(error)
-        
-        return unique_errors
+        Yields:
+            Extracted error information
+        """
+        tokenizer = LogTokenizer()
+        async for chunk in chunks:
+            for error in tokenizer.feed(chunk):
+                yield error
+        for error in tokenizer.finish():
+            yield error
     
     def parse_json_logs(self, content: str) -> List[ErrorInfo]:
         """Parse JSON-formatted logs (e.g., structured logging output).
@@ -0,0 +1,468 @@
+"""Single-pass error extraction from CI and application logs.
+
+`LogTokenizer` reads a log line by line and looks at each line once. A
+line either continues the error being collected (traceback frames,
+``at`` lines, goroutine stacks, compiler annotations) or is matched
+against one alternation of every form an error can start with:
+
+- Python tracebacks, including chained exceptions
+- Node.js errors followed by ``at`` frames
+- Java/Kotlin exceptions with ``at`` frames and ``Caused by:`` causes
+- Go panics, compiler errors and ``go test`` failures
+- Rust panics and compiler errors with their ``-->`` location
+
+An exception chained to a previous one (Python's "During handling of the
+above exception" / "direct cause", Java's "Caused by:") is reported on
+its own, with its own frames, and carries the text of the chain before
+it in its stack trace. Lines matching none of these feed the generic
+``ERROR``/``FATAL`` fallback, reported only for logs without any
+structured error.
+
+The state kept between lines is capped (see the ``MAX_*`` limits), so
+time is linear in the size of the log and memory does not depend on it.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from agents.agent_1_detective.fingerprint import error_fingerprint, fingerprint_error
+from models.analysis import ErrorInfo
+
+TRACEBACK_HEADER = 'Traceback (most recent call last):'
+
+PYTHON_CHAIN_MARKERS = (
+    'During handling of the above exception, another exception occurred:',
+    'The above exception was the direct cause of the following exception:',
+)
+
+# Frame locations outside the application, by language. Java locations
+# are derived from class names and match by prefix; the rest by substring.
+LIBRARY_PATH_MARKERS: Dict[str, Tuple[str, ...]] = {
+    "python": (
+        'site-packages', 'lib/python', '/usr/lib/',
+        'venv/', '.venv/', 'anaconda', 'miniconda',
+    ),
+    "js": ('node_modules', 'node:'),
+    "java": (
+        'java/', 'javax/', 'jdk/', 'sun/', 'com/sun/',
+        'kotlin/', 'kotlinx/', 'scala/', 'org/junit/',
+    ),
+    "go": ('/usr/local/go/', '/pkg/mod/', '<autogenerated>'),
+    "rust": ('/rustc/', '/.cargo/registry/'),
+}
+
+# Limits, so one runaway line or stack cannot pull a whole log into memory
+MAX_LINE_CHARS = 64 * 1024
+MAX_TRACE_LINES = 1000
+MAX_FRAMES = 100
+MAX_GENERIC_ERRORS = 1000
+
+# Timestamp GitHub Actions puts in front of every log line
+_CI_TIMESTAMP = re.compile(r'\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d(?:\.\d+)?Z ')
+
+# Every way an error can start, tried in order on lines outside an error
+_ERROR_START = re.compile(
+    r'(?P<java>(?:Exception in thread "[^"]*" |Caused by: )?'
+    r'(?P<java_type>(?:[a-z_$][\w$]*\.)+[A-Z][\w$]*(?:Exception|Error|Throwable|Failure))'
+    r'(?:: (?P<java_message>.*))?$)'
+    r"|(?P<rust_panic>thread '[^']*' panicked at (?:'(?P<rust_message>.*)', )?"
+    r"(?P<rust_path>[^\s:']+):(?P<rust_line>\d+):\d+:?$)"
+    r'|(?P<rust_error>error(?:\[E\d+\])?: (?P<rust_error_message>.+)$)'
+    r'|(?P<go_panic>panic: (?P<go_message>.+?)(?: \[recovered\])?$)'
+    r'|(?P<go_error>(?P<go_path>[\w.\-/]+\.go):(?P<go_line>\d+)(?::\d+)?: (?P<go_text>.+)$)'
+    r'|(?P<go_test>\s+(?P<test_path>[\w.\-/]+_test\.go):(?P<test_line>\d+): (?P<test_text>.+)$)'
+    r'|(?P<bare_error>(?P<bare_type>\w+(?:Error|Exception|Warning)): (?P<bare_message>.+)$)'
+    r'|(?P<js>(?:Uncaught )?(?P<js_type>(?:\w+)?Error)(?: \[\w+\])?: (?P<js_message>.+)$)'
+)
+
+GENERIC_ERROR = re.compile(r'(?:ERROR|Error|error|FATAL|Fatal|fatal)[:\s]+(.+)')
+_FILE_LINE = re.compile(r'([^\s:]+):(\d+)')
+
+# Python: frames, and the unindented line that ends a traceback
+_PYTHON_FRAME = re.compile(r'\s*File "([^"]+)", line (\d+), in \S+')
+_PYTHON_EXCEPTION = re.compile(r'((?:[A-Za-z_]\w*\.)*([A-Za-z_]\w*))(?:: (.*))?$')
+_PYTHON_BARE_EXCEPTION = re.compile(r'(?:Error|Exception|Warning|Exit|Interrupt|Iteration)$')
+
+# Node.js and Java frames both start with "at"
+_AT_LINE = re.compile(r'\s+at ')
+_JS_FRAME = re.compile(r'\s+at (?:.+? \()?(?:file://)?((?:[A-Za-z]:)?[^:()]+):(\d+):\d+\)?$')
+_JAVA_CONTINUATION = re.compile(r'\s+(?:at |\.\.\. \d+ |Suppressed: |Caused by: )')
+_JAVA_FRAME = re.compile(r'\s+at (?:[\w.$]+/+)?((?:[\w$]+\.)*)[\w$]+\.[\w$<>]+\(([^:()]+):(\d+)\)')
+
+# Go panic: goroutine headers, function lines and "\tfile.go:12 +0x1d" frames
+_GO_FRAME = re.compile(r'\t(\S+\.go):(\d+)(?: \+0x[0-9a-f]+)?$')
+_GO_CONTINUATION = re.compile(
+    r'goroutine \d+ \[|\[signal |created by |\t|panic: '
+    r'|[\w.\-/]+(?:\.\(\*?\w+\))?(?:\.[\w$\-]+)*\(.*\)$'
+)
+
+# Rust: panic notes and backtrace, compiler annotations and location
+_RUST_PANIC_CONTINUATION = re.compile(r'note: |stack backtrace:|\s+\d+: |\s+at ')
+_RUST_ANNOTATION = re.compile(r'\s*(?:\d+\s*)?(?:-->|\||=|\.\.\.)')
+_RUST_LOCATION = re.compile(r'\s*--> ([^\s:]+):(\d+):\d+')
+
+
+@dataclass
+class _OpenError:
+    """An error whose continuation lines are still being read."""
+    language: str
+    kind: str  # python, js, java, go_panic, rust_panic or rust_error
+    error_type: str
+    message: str
+    lines: List[str]
+
+    # Text of the exceptions chained before this one
+    chain: List[str] = field(default_factory=list)
+
+    # (path, line) in printed order; Python prints the innermost frame last
+    frames: List[Tuple[str, int]] = field(default_factory=list)
+
+    # Location given by the error line itself (compilers, Rust panics)
+    location: Optional[Tuple[str, int]] = None
+
+    # False until a traceback's exception line, a compiler error's
+    # location or a bare "Error:" line's first frame is seen; incomplete
+    # errors are not reported
+    complete: bool = True
+
+    def add_line(self, line: str) -> None:
+        """Keep a line for the stack trace, up to `MAX_TRACE_LINES`."""
+        if len(self.lines) < MAX_TRACE_LINES:
+            self.lines.append(line)
+
+    def add_frame(self, path: str, line_number: int) -> None:
+        """Record a frame, keeping the innermost `MAX_FRAMES`."""
+        if len(self.frames) < MAX_FRAMES:
+            self.frames.append((path, line_number))
+        elif self.kind == "python":
+            del self.frames[0]
+            self.frames.append((path, line_number))
+
+    def to_error_info(self) -> ErrorInfo:
+        """Locate the error in the innermost application frame."""
+        innermost_first = list(reversed(self.frames) if self.kind == "python" else self.frames)
+        file_path, line_number = self.location or (None, None)
+        if self.location is None and innermost_first:
+            file_path, line_number = next(
+                (frame for frame in innermost_first if not _is_library(self.language, frame[0])),
+                innermost_first[0],
+            )
+
+        return ErrorInfo(
+            error_type=self.error_type,
+            message=self.message,
+            file_path=file_path,
+            line_number=line_number,
+            stack_trace="\n".join(self.chain + self.lines),
+            fingerprint=error_fingerprint(
+                self.error_type, self.message, innermost_first or [(file_path, line_number)],
+            ),
+        )
+
+
+def _is_library(language: str, path: str) -> bool:
+    """Check if a frame location is outside the application."""
+    markers = LIBRARY_PATH_MARKERS[language]
+    if language == "java":
+        return path.startswith(markers)
+    return any(marker in path for marker in markers)
+
+
+def _java_path(package: str, file_name: str) -> str:
+    """Source path of a Java frame: "com.acme." and "Orders.java" give
+    "com/acme/Orders.java" (relative to the source root)."""
+    return package.replace('.', '/') + file_name
+
+
+class LogTokenizer:
+    """Incremental, single-pass error extractor.
+
+    Feed it log text in chunks of any size; each call returns the errors
+    completed so far. Call `finish` at the end of the log.
+    """
+
+    def __init__(self):
+        # Unterminated last line of the chunks fed so far
+        self.partial = ""
+        self.open: Optional[_OpenError] = None
+
+        # Text of the Python traceback just ended, in case a chain marker
+        # follows, and the chain waiting for the next exception
+        self.chain_source: Optional[List[str]] = None
+        self.chain: List[str] = []
+
+        # Fallback generic errors by message, until a structured error is found
+        self.generic: Dict[str, ErrorInfo] = {}
+        self.structured = False
+
+        self._out: List[ErrorInfo] = []
+        self._continuations = {
+            "python": self._continue_python,
+            "js": self._continue_js,
+            "java": self._continue_java,
+            "go_panic": self._continue_go_panic,
+            "rust_panic": self._continue_rust_panic,
+            "rust_error": self._continue_rust_error,
+        }
+
+    def feed(self, chunk: str) -> List[ErrorInfo]:
+        """Consume a chunk of log text.
+
+        Returns:
+            Errors completed by this chunk
+        """
+        lines = chunk.split("\n")
+        lines[0] = self.partial + lines[0]
+        self.partial = lines.pop()[:MAX_LINE_CHARS]
+
+        for line in lines:
+            self._line(line[:MAX_LINE_CHARS].rstrip("\r"))
+        return self._drain()
+
+    def finish(self) -> List[ErrorInfo]:
+        """Flush the final line and any error still being collected.
+
+        Returns:
+            Remaining errors, or the generic errors if no structured error
+            was found in the whole log
+        """
+        if self.partial:
+            self._line(self.partial.rstrip("\r"))
+            self.partial = ""
+        if self.open is not None:
+            self._close()
+
+        errors = self._drain()
+        if not self.structured:
+            errors.extend(self.generic.values())
+        return errors
+
+    def _drain(self) -> List[ErrorInfo]:
+        errors, self._out = self._out, []
+        return errors
+
+    def _line(self, line: str) -> None:
+        """Advance the state machine by one line."""
+        timestamp = _CI_TIMESTAMP.match(line)
+        if timestamp:
+            line = line[timestamp.end():]
+
+        if self.open is not None:
+            if self._continuations[self.open.kind](self.open, line):
+                return
+            self._close()
+        self._start(line)
+
+    def _start(self, line: str) -> None:
+        """Classify a line outside any error."""
+        if self.chain_source is not None:
+            if not line.strip():
+                return
+            if line in PYTHON_CHAIN_MARKERS:
+                self.chain = self.chain_source + ["", line, ""]
+                self.chain_source = None
+                return
+            self.chain_source = None
+
+        header = line.find(TRACEBACK_HEADER)
+        if header != -1:
+            self._open("python", "python", "", "", line[header:], complete=False)
+            return
+
+        if self.chain and not line.strip():
+            return  # Between a chain marker and the next traceback
+
+        match = _ERROR_START.match(line)
+        if match is None:
+            self.chain = []
+            if not self.structured and len(self.generic) < MAX_GENERIC_ERRORS:
+                self._add_generic(line)
+            return
+
+        if match["java"] is not None:
+            self._open("java", "java", match["java_type"], match["java_message"] or "", line)
+        elif match["rust_panic"] is not None:
+            error = self._open("rust", "rust_panic", "panic", match["rust_message"] or "", line)
+            error.location = (match["rust_path"], int(match["rust_line"]))
+        elif match["rust_error"] is not None:
+            self._open(
+                "rust", "rust_error", "CompileError", match["rust_error_message"], line,
+                complete=False,
+            )
+        elif match["go_panic"] is not None:
+            self._open("go", "go_panic", "panic", match["go_message"], line)
+        elif match["go_error"] is not None:
+            self._emit(ErrorInfo(
+                error_type="CompileError",
+                message=match["go_text"],
+                file_path=match["go_path"],
+                line_number=int(match["go_line"]),
+            ))
+        elif match["go_test"] is not None:
+            self._emit(ErrorInfo(
+                error_type="TestFailure",
+                message=match["test_text"],
+                file_path=match["test_path"],
+                line_number=int(match["test_line"]),
+            ))
+        elif match["bare_error"] is not None:
+            # "TypeError: ..." outside a traceback (a Python exception line
+            # ends one and is handled above) is taken as a Node.js error, so
+            # "at" lines that follow are its frames; without frames it is
+            # reported on its own.
+            self._open("js", "js", match["bare_type"], match["bare_message"], line)
+        else:
+            # A bare "Error: ..." is only a JS error if frames follow; CI
+            # steps print "Error: Process completed with exit code 1."
+            self._open(
+                "js", "js", match["js_type"], match["js_message"], line,
+                complete=match["js_type"] != "Error",
+            )
+
+    def _open(
+        self,
+        language: str,
+        kind: str,
+        error_type: str,
+        message: str,
+        line: str,
+        complete: bool = True,
+    ) -> _OpenError:
+        """Start collecting an error, attaching any pending chain to it."""
+        self.open = _OpenError(
+            language, kind, error_type, message, [line],
+            chain=self.chain[-MAX_TRACE_LINES:],
+            complete=complete,
+        )
+        self.chain = []
+        return self.open
+
+    def _close(self) -> None:
+        """Report the open error, if complete, and stop collecting it."""
+        error, self.open = self.open, None
+        if error.complete:
+            self._emit(error.to_error_info())
+        elif error.kind in ("rust_error", "js"):
+            # "error: ..." without a source location, or "Error: ..." without
+            # frames, is an ordinary error line
+            self._add_generic(error.lines[0])
+
+    def _emit(self, error: ErrorInfo) -> None:
+        if error.fingerprint is None:
+            error.fingerprint = fingerprint_error(error)
+        self._out.append(error)
+        if not self.structured:
+            self.structured = True
+            self.generic.clear()
+
+    def _add_generic(self, line: str) -> None:
+        """Remember a generic error line, keeping the first of each message."""
+        generic = GENERIC_ERROR.search(line)
+        if generic is None:
+            return
+        message = generic.group(1).strip()
+        if message in self.generic:
+            return
+        file_match = _FILE_LINE.search(message)
+        error = ErrorInfo(
+            error_type="Error",
+            message=message,
+            file_path=file_match.group(1) if file_match else None,
+            line_number=int(file_match.group(2)) if file_match else None,
+        )
+        error.fingerprint = fingerprint_error(error)
+        self.generic[message] = error
+
+    def _continue_python(self, error: _OpenError, line: str) -> bool:
+        """Collect a traceback up to the exception line that ends it."""
+        if TRACEBACK_HEADER in line:
+            return False
+
+        if not line or line[0] in " \t":
+            error.add_line(line)
+            frame = _PYTHON_FRAME.match(line)
+            if frame:
+                error.add_frame(frame.group(1), int(frame.group(2)))
+            return True
+
+        exception = _PYTHON_EXCEPTION.match(line)
+        if exception and self._is_exception(exception):
+            error.error_type = exception.group(1)
+            error.message = exception.group(3) or ""
+            error.lines.append(line)
+            error.complete = True
+            self._close()
+            self.chain_source = error.chain + error.lines
+            return True
+
+        # Output interleaved with the traceback
+        error.add_line(line)
+        return True
+
+    @staticmethod
+    def _is_exception(match: re.Match) -> bool:
+        """Check if a traceback's unindented line names an exception: a
+        mixed-case name with a message, or an exception-like bare name."""
+        name = match.group(2)
+        if match.group(3) is not None:
+            return name[0].isupper() and not name.isupper()
+        return _PYTHON_BARE_EXCEPTION.search(name) is not None
+
+    def _continue_js(self, error: _OpenError, line: str) -> bool:
+        """Collect the ``at`` frames below an error line."""
+        if not _AT_LINE.match(line):
+            return False
+        error.add_line(line)
+        error.complete = True
+        frame = _JS_FRAME.match(line)
+        if frame:
+            error.add_frame(frame.group(1).lstrip('/'), int(frame.group(2)))
+        return True
+
+    def _continue_java(self, error: _OpenError, line: str) -> bool:
+        """Collect ``at`` frames; a ``Caused by:`` line starts a chained error."""
+        if line.startswith('Caused by: '):
+            self.chain = error.chain + error.lines
+            return False
+        if not _JAVA_CONTINUATION.match(line):
+            return False
+        error.add_line(line)
+        frame = _JAVA_FRAME.match(line)
+        if frame:
+            error.add_frame(_java_path(frame.group(1), frame.group(2)), int(frame.group(3)))
+        return True
+
+    def _continue_go_panic(self, error: _OpenError, line: str) -> bool:
+        """Collect the panicking goroutine's stack, up to the blank line after it."""
+        if not line:
+            return not error.frames
+        frame = _GO_FRAME.match(line)
+        if frame:
+            error.add_frame(frame.group(1), int(frame.group(2)))
+        elif not _GO_CONTINUATION.match(line):
+            return False
+        error.add_line(line)
+        return True
+
+    def _continue_rust_panic(self, error: _OpenError, line: str) -> bool:
+        """Take the panic message (on its own line since Rust 1.73) and
+        any backtrace."""
+        if not error.message and line and not line.startswith('note: '):
+            error.message = line
+        elif not _RUST_PANIC_CONTINUATION.match(line):
+            return False
+        error.add_line(line)
+        return True
+
+    def _continue_rust_error(self, error: _OpenError, line: str) -> bool:
+        """Collect a compiler error's annotations and its ``-->`` location."""
+        if not _RUST_ANNOTATION.match(line):
+            return False
+        error.add_line(line)
+        if error.location is None:
+            location = _RUST_LOCATION.match(line)
+            if location:
+                error.location = (location.group(1), int(location.group(2)))
+                error.complete = True
+        return True
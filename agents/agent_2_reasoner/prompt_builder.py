@@ -80,6 +80,8 @@ Output your response in this EXACT format:
             sections.append(f"## Error {i}")
             sections.append(f"**Type**: {error.error_type}")
             sections.append(f"**Message**: {error.message}")
+            if error.occurrences > 1:
+                sections.append(f"**Occurrences**: {error.occurrences}")
             if error.file_path:
                 sections.append(f"**File**: {error.file_path}")
             if error.line_number:
@@ -7,6 +7,8 @@ from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
+from agents.agent_0_sanitizer.service import get_sanitizer_service, shutdown_sanitizer_service
+from agents.agent_0_sanitizer.worker import shutdown_process_pool
 from api.routes import auth, health, incidents, status, webhooks
 from api.middleware.request_logging import RequestLoggingMiddleware
 from config.logging_config import configure_logging, get_logger
@@ -33,12 +35,18 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     await init_db()
     logger.info("Database initialized")
     
+    # Compile sanitizer patterns before the first incident arrives
+    get_sanitizer_service()
+    logger.info("Sanitizer service ready")
+    
     yield
     
     # Shutdown
     logger.info("Shutting down NeverDown API")
     await close_db()
     logger.info("Database connections closed")
+    shutdown_sanitizer_service()
+    shutdown_process_pool()
 
 
 def create_app() -> FastAPI:
@@ -0,0 +1,73 @@
+"""Benchmark: checkouts from a cached mirror vs. a fresh clone per incident.
+
+`GitService.clone_repository` used to run ``git clone --depth 1`` for
+every incident (still its fallback, and what it does with
+``GIT_MIRROR_DIR`` empty). With a mirror, the first incident on a
+repository creates a bare clone (a partial one with ``--filter``, e.g.
+``blob:none``); each incident then fetches into it and checks out a
+``git worktree``, so later incidents transfer only new objects. The upstream is a local repository served through a
+file:// URL, so the timings leave out network latency and bandwidth and
+understate the gap. It comes from `bench_git_history`.
+
+Usage:
+    python -m benchmarks.bench_clone [--commits 300] [--files 3000] [--incidents 5] [--filter blob:none]
+"""
+
+import argparse
+import asyncio
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from benchmarks.bench_git_history import generate_history
+from config.settings import get_settings
+from services.git_service import GitService
+
+
+async def checkouts(service: GitService, url: str, incidents: int) -> List[float]:
+    """Time cloning and cleaning up ``incidents`` checkouts, one after another."""
+    timings = []
+    for n in range(incidents):
+        start = time.perf_counter()
+        result = await service.clone_repository(url, f"bench-{n}")
+        timings.append(time.perf_counter() - start)
+        assert result.success, result.error
+        service.cleanup_clone(result.path)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--commits", type=int, default=300)
+    parser.add_argument("--files", type=int, default=3000)
+    parser.add_argument("--incidents", type=int, default=5)
+    parser.add_argument("--filter", default="", help="GIT_MIRROR_FILTER for the mirror")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    with tempfile.TemporaryDirectory() as tmp:
+        upstream = Path(tmp) / "upstream"
+        generate_history(upstream, args.commits, args.files)
+        subprocess.run(["git", "config", "uploadpack.allowFilter", "true"], cwd=upstream, check=True)
+        url = upstream.as_uri()
+        settings.CLONE_DIR = str(Path(tmp) / "clones")
+
+        settings.GIT_MIRROR_DIR = ""
+        direct = asyncio.run(checkouts(GitService(), url, args.incidents))
+
+        settings.GIT_MIRROR_DIR = str(Path(tmp) / "mirrors")
+        settings.GIT_MIRROR_FILTER = args.filter
+        mirrored = asyncio.run(checkouts(GitService(), url, args.incidents))
+
+    fresh = sum(direct) / len(direct)
+    warm = sum(mirrored[1:]) / max(1, len(mirrored) - 1)
+    print(f"repository:      {args.commits} commits, {args.files} files, {args.incidents} incidents")
+    print(f"fresh clone:     {fresh * 1000:8.1f} ms per incident")
+    print(f"mirror, first:   {mirrored[0] * 1000:8.1f} ms (once per repository)")
+    print(f"mirror, later:   {warm * 1000:8.1f} ms per incident ({fresh / warm:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
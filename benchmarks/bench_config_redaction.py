@@ -0,0 +1,165 @@
+"""Benchmark: config-file key/value engine vs. the previous .env redactor.
+
+The previous implementation split the file into lines, matched each
+stripped line against a regex, tested every key against a list of
+indicator substrings and scored values one at a time. It is kept here as
+the reference; both must find the same secrets in .env content. The
+engine's .properties, .ini and YAML passes are timed on equivalent
+content for comparison.
+
+Usage:
+    python -m benchmarks.bench_config_redaction [--files 500] [--lines 60] [--repeat 5]
+"""
+
+import argparse
+import random
+import re
+import string
+import time
+from typing import Callable, List
+
+from agents.agent_0_sanitizer.config_files import find_config_secrets
+from agents.agent_0_sanitizer.entropy import is_high_entropy
+from agents.agent_0_sanitizer.merging import ENV_PATTERN_NAME
+from agents.agent_0_sanitizer.patterns import SecretMatch
+
+ENV_LINE_PATTERN = re.compile(r'^([A-Za-z_][A-Za-z0-9_]*)=(.*)$')
+
+KEYS = [
+    "DEBUG", "LOG_LEVEL", "PORT", "HOST", "APP_NAME", "WORKERS", "REGION", "TIMEOUT",
+    "DATABASE_URL", "REDIS_URL", "FEATURE_FLAGS", "SENTRY_DSN", "CACHE_TTL",
+    "API_KEY", "SECRET_KEY", "DB_PASSWORD", "GITHUB_TOKEN", "AUTH_CLIENT_ID",
+]
+
+
+def legacy_find_env_secrets(content: str) -> List[SecretMatch]:
+    """The .env detection this benchmark replaces, verbatim."""
+    secret_indicators = [
+        "password", "passwd", "pwd", "secret", "token", "key",
+        "api_key", "apikey", "auth", "credential", "private",
+        "access_key", "secret_key", "db_pass", "database_password",
+    ]
+
+    def is_secret_key(key: str) -> bool:
+        key_lower = key.lower()
+        return any(indicator in key_lower for indicator in secret_indicators)
+
+    def is_secret_value(value: str) -> bool:
+        value = value.strip("\"'")
+        if not value or value.startswith("<") or value == "xxx":
+            return False
+        if any(value.startswith(prefix) for prefix in ["postgresql://", "mysql://", "mongodb://"]):
+            return True
+        if len(value) > 20 and re.match(r'^[A-Za-z0-9+/=\-_]+$', value):
+            return is_high_entropy(value)
+        return False
+
+    matches: List[SecretMatch] = []
+    offset = 0
+    for i, line in enumerate(content.split("\n")):
+        line_start = offset
+        offset += len(line) + 1
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        match = ENV_LINE_PATTERN.match(stripped)
+        if not match:
+            continue
+        key, value = match.groups()
+        if is_secret_key(key) or is_secret_value(value):
+            if value.startswith('"') and value.endswith('"'):
+                redacted_value = '"<REDACTED>"'
+            elif value.startswith("'") and value.endswith("'"):
+                redacted_value = "'<REDACTED>'"
+            else:
+                redacted_value = "<REDACTED>"
+            value_start = line_start + line.index(stripped) + match.start(2)
+            matches.append(SecretMatch(
+                pattern_name=ENV_PATTERN_NAME,
+                match=value,
+                start=value_start,
+                end=value_start + len(value),
+                line_number=i + 1,
+                placeholder=redacted_value,
+                severity="high",
+            ))
+    return matches
+
+
+def random_value(rng: random.Random) -> str:
+    """A mix of plain settings, URLs, tokens and quoted strings."""
+    kind = rng.random()
+    if kind < 0.4:
+        return rng.choice(["true", "false", "info", "8080", "0.0.0.0", "eu-west-1", "30"])
+    if kind < 0.55:
+        return f"postgresql://app:{rng.randrange(10**8)}@db:5432/app"
+    if kind < 0.8:
+        return "".join(rng.choices(string.ascii_letters + string.digits, k=rng.randint(24, 48)))
+    return f'"{rng.choice(["my app", "a b c", "<changeme>", ""])}"'
+
+
+def generate_env(lines: int, rng: random.Random) -> str:
+    """One .env file with comments, blank lines and indented entries."""
+    out = []
+    for _ in range(lines):
+        roll = rng.random()
+        if roll < 0.1:
+            out.append("# " + rng.choice(KEYS).lower())
+        elif roll < 0.15:
+            out.append("")
+        else:
+            indent = " " if roll > 0.95 else ""
+            out.append(f"{indent}{rng.choice(KEYS)}={random_value(rng)}")
+    return "\n".join(out) + "\n"
+
+
+def to_format(env: str, file_format: str) -> str:
+    """Rewrite .env content as .properties, .ini or YAML."""
+    separator = {"properties": "=", "ini": " = ", "yaml": ": "}[file_format]
+    lines = [re.sub(r'^(\s*)([A-Za-z_]\w*)=', rf'\1\2{separator}', line) for line in env.split("\n")]
+    if file_format == "ini":
+        lines.insert(0, "[app]")
+    return "\n".join(lines)
+
+
+def best_time(func: Callable[[], object], repeat: int) -> float:
+    """Return the best wall time over several runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=500)
+    parser.add_argument("--lines", type=int, default=60, help="Lines per file")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    files = [generate_env(args.lines, rng) for _ in range(args.files)]
+
+    found = 0
+    for content in files:
+        expected = legacy_find_env_secrets(content)
+        assert find_config_secrets(content, "env") == expected
+        found += len(expected)
+
+    legacy = best_time(lambda: [legacy_find_env_secrets(c) for c in files], args.repeat)
+    engine = best_time(lambda: [find_config_secrets(c, "env") for c in files], args.repeat)
+
+    print(f"files: {args.files} x {args.lines} lines, {found} .env secrets")
+    print(f"previous .env redactor: {legacy * 1000:8.2f} ms")
+    print(f"config engine (.env):   {engine * 1000:8.2f} ms  ({legacy / engine:.2f}x)")
+
+    for file_format in ("properties", "ini", "yaml"):
+        converted = [to_format(c, file_format) for c in files]
+        seconds = best_time(lambda: [find_config_secrets(c, file_format) for c in converted], args.repeat)
+        print(f"config engine ({file_format}): {seconds * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
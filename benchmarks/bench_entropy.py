@@ -0,0 +1,116 @@
+"""Benchmark: batched vs. scalar Shannon entropy in find_high_entropy_strings.
+
+Usage:
+    python -m benchmarks.bench_entropy [--lockfile-packages 3000] [--bundle-kb 512]
+"""
+
+import argparse
+import base64
+import json
+import random
+import re
+import time
+from typing import Callable
+
+from agents.agent_0_sanitizer import entropy
+from agents.agent_0_sanitizer.patterns import PatternMatcher, is_high_entropy
+
+CANDIDATE_PATTERN = re.compile(r'[A-Za-z0-9+/=\-_]{20,}')
+
+
+def generate_lockfile(packages: int, seed: int = 7) -> str:
+    """Generate a package-lock.json with npm-style integrity hashes."""
+    rng = random.Random(seed)
+    deps = {}
+    for i in range(packages):
+        name = f"package-{i}-{rng.choice(['utils', 'core', 'plugin', 'loader'])}"
+        version = f"{rng.randint(0, 9)}.{rng.randint(0, 30)}.{rng.randint(0, 99)}"
+        digest = base64.b64encode(rng.randbytes(64)).decode()
+        deps[f"node_modules/{name}"] = {
+            "version": version,
+            "resolved": f"https://registry.npmjs.org/{name}/-/{name}-{version}.tgz",
+            "integrity": f"sha512-{digest}",
+            "dev": rng.random() < 0.3,
+        }
+    return json.dumps({"name": "app", "lockfileVersion": 3, "packages": deps}, indent=2)
+
+
+def generate_bundle(size_kb: int, seed: int = 11) -> str:
+    """Generate a minified JS bundle with long identifiers and inline assets."""
+    rng = random.Random(seed)
+    chunks = []
+    size = 0
+    while size < size_kb * 1024:
+        roll = rng.random()
+        if roll < 0.05:
+            chunk = f'url("data:image/png;base64,{base64.b64encode(rng.randbytes(300)).decode()}")'
+        elif roll < 0.5:
+            chunk = f"function {rng.choice(['useMemoizedSelectorCallback', 'createAsyncThunkMiddleware'])}_{rng.randint(0, 99999)}(e,t){{return e.prototype.hasOwnProperty.call(t,n)}}"
+        else:
+            chunk = f"var {''.join(rng.choices('abcdefghijklmnopqrstuvwxyz', k=2))}=__webpack_require__({rng.randint(0, 9999)});"
+        chunks.append(chunk)
+        size += len(chunk)
+    return "".join(chunks)
+
+
+def best_time(func: Callable[[], object], repeat: int) -> float:
+    """Return the best wall time over several runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lockfile-packages", type=int, default=3000)
+    parser.add_argument("--bundle-kb", type=int, default=512)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    matcher = PatternMatcher()
+    inputs = {
+        "lockfile": generate_lockfile(args.lockfile_packages),
+        "bundle": generate_bundle(args.bundle_kb),
+    }
+
+    threshold = matcher.config.entropy_threshold
+    min_length = matcher.config.min_entropy_length
+
+    print(f"numpy available: {entropy.HAS_NUMPY}")
+    for name, content in inputs.items():
+        texts = [m.group(0) for m in CANDIDATE_PATTERN.finditer(content)]
+        scalar_scoring = best_time(
+            lambda: [is_high_entropy(t, threshold, min_length) for t in texts], args.repeat,
+        )
+        batched_scoring = best_time(
+            lambda: entropy.high_entropy_flags(texts, threshold, min_length), args.repeat,
+        )
+
+        numpy_module = entropy.np
+        batched_result = matcher.find_high_entropy_strings(content)
+        batched = best_time(lambda: matcher.find_high_entropy_strings(content), args.repeat)
+
+        # Force the scalar fallback for comparison
+        entropy.np = None
+        try:
+            scalar_result = matcher.find_high_entropy_strings(content)
+            scalar = best_time(lambda: matcher.find_high_entropy_strings(content), args.repeat)
+        finally:
+            entropy.np = numpy_module
+
+        assert batched_result == scalar_result
+        size_mb = len(content) / (1024 * 1024)
+        print(f"{name}: {size_mb:.2f} MB, {len(texts)} candidates, "
+              f"{len(batched_result)} detections")
+        print(f"  scoring  scalar:  {scalar_scoring * 1000:8.2f} ms")
+        print(f"  scoring  batched: {batched_scoring * 1000:8.2f} ms  "
+              f"({scalar_scoring / batched_scoring:.2f}x)")
+        print(f"  end-to-end scalar:  {scalar * 1000:8.2f} ms")
+        print(f"  end-to-end batched: {batched * 1000:8.2f} ms  ({scalar / batched:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Benchmark: one streamed ``git log`` vs. one ``git diff-tree`` per commit.
+
+`DiffAnalyzer.get_recent_commits` used to list commits with ``git log``
+and then fork ``git diff-tree`` for each one to get its files (kept
+here as the reference). It now reads commits and files from a single
+``git log -z --name-only``. The repository is generated with
+``git fast-import``; each commit touches a few files in a tree of
+several hundred.
+
+Usage:
+    python -m benchmarks.bench_git_history [--commits 500] [--depths 10,100,500] [--repeat 3]
+"""
+
+import argparse
+import random
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from agents.agent_1_detective.diff_analyzer import CommitInfo, DiffAnalyzer
+
+
+class LegacyHistory:
+    """The N+1 process implementation this benchmark replaces, verbatim."""
+
+    def __init__(self, repo_path: str):
+        self.repo_path = Path(repo_path)
+
+    def get_recent_commits(self, count: int = 10) -> List[CommitInfo]:
+        result = subprocess.run(
+            ['git', 'log', f'-n{count}', '--format=%H|%an|%ae|%at|%s'],
+            cwd=self.repo_path,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+        commits = []
+        for line in result.stdout.strip().split('\n'):
+            if not line:
+                continue
+
+            parts = line.split('|', 4)
+            if len(parts) < 5:
+                continue
+
+            sha, author, email, timestamp, message = parts
+            commits.append(CommitInfo(
+                sha=sha,
+                author=author,
+                email=email,
+                timestamp=datetime.fromtimestamp(int(timestamp)),
+                message=message,
+                files_changed=self._get_commit_files(sha),
+            ))
+
+        return commits
+
+    def _get_commit_files(self, sha: str) -> List[str]:
+        result = subprocess.run(
+            ['git', 'diff-tree', '--no-commit-id', '--name-only', '-r', sha],
+            cwd=self.repo_path,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return [f for f in result.stdout.strip().split('\n') if f]
+
+
+def generate_history(repo: Path, commits: int, files: int = 400, seed: int = 5) -> None:
+    """Create a repository with ``commits`` commits, each touching 1-6 files."""
+    rng = random.Random(seed)
+    paths = [f"src/pkg{i % 20}/module_{i}.py" for i in range(files)]
+
+    stream: List[bytes] = []
+    for n in range(1, commits + 1):
+        touched = paths if n == 1 else rng.sample(paths, rng.randint(1, 6))
+        message = f"Change {n}".encode()
+        stream.append(b"commit refs/heads/main\n")
+        stream.append(f"committer Dev <dev@example.com> {1700000000 + n * 60} +0000\n".encode())
+        stream.append(b"data %d\n%s\n" % (len(message), message))
+        for path in touched:
+            content = f"VALUE = {n}\n".encode()
+            stream.append(b"M 100644 inline %s\ndata %d\n%s\n" % (path.encode(), len(content), content))
+
+    subprocess.run(["git", "init", "-q", "-b", "main", str(repo)], check=True)
+    subprocess.run(["git", "fast-import", "--quiet"], cwd=repo, input=b"".join(stream), check=True)
+    subprocess.run(["git", "checkout", "-q", "main"], cwd=repo, check=True)
+
+
+def time_history(func: Callable[[], List[CommitInfo]], repeat: int) -> Tuple[float, List[CommitInfo]]:
+    """Best wall time over several runs, with the commits read."""
+    best = float("inf")
+    commits: List[CommitInfo] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        commits = func()
+        best = min(best, time.perf_counter() - start)
+    return best, commits
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--commits", type=int, default=500)
+    parser.add_argument("--depths", default="10,100,500")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = Path(tmp) / "repo"
+        generate_history(repo, args.commits)
+        legacy = LegacyHistory(str(repo))
+        analyzer = DiffAnalyzer(str(repo))
+
+        print(f"repository:  {args.commits} commits")
+        for depth in (int(d) for d in args.depths.split(",")):
+            before, old = time_history(lambda: legacy.get_recent_commits(depth), args.repeat)
+            after, new = time_history(lambda: analyzer.get_recent_commits(depth), args.repeat)
+            # diff-tree lists nothing for the root commit; git log lists its files
+            assert [c.files_changed for c in old[:-1]] == [c.files_changed for c in new[:-1]]
+            print(f"depth {depth:4d}:  diff-tree per commit {before * 1000:8.1f} ms  "
+                  f"single log {after * 1000:7.1f} ms  ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
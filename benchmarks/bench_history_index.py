@@ -0,0 +1,97 @@
+"""Benchmark: history index lookups vs. scanning recent commits per suspect.
+
+Without the index, Detective reads the last N commits with ``git log``
+and `DiffAnalyzer.find_relevant_changes` compares every changed path of
+every commit with each suspected file. With it, the commits are indexed
+once per repository (`HistoryIndex.update`, later incremental) and each
+suspect is an indexed lookup. Reported: the first indexing, an update
+after a few new commits, and the per-incident cost of both approaches
+for the same depth. The repository comes from `bench_git_history`.
+
+Usage:
+    python -m benchmarks.bench_history_index [--commits 3000] [--suspects 20] [--repeat 3]
+"""
+
+import argparse
+import asyncio
+import random
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from agents.agent_1_detective.diff_analyzer import DiffAnalyzer
+from agents.agent_1_detective.git_runner import GitRunner
+from agents.agent_1_detective.history_index import HistoryIndex
+from benchmarks.bench_git_history import generate_history
+
+
+def add_commits(repo: Path, count: int) -> None:
+    """Commit ``count`` more changes on top of the generated history."""
+    for n in range(count):
+        path = repo / "src" / "pkg0" / f"module_{n * 20}.py"
+        path.write_text(f"VALUE = 'new {n}'\n")
+        subprocess.run(
+            ["git", "-c", "user.email=dev@example.com", "-c", "user.name=Dev",
+             "commit", "-q", "-am", f"New {n}"],
+            cwd=repo, check=True,
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--commits", type=int, default=3000)
+    parser.add_argument("--suspects", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = Path(tmp) / "repo"
+        generate_history(repo, args.commits)
+        runner = GitRunner(repo, timeout=600)
+        analyzer = DiffAnalyzer(str(repo))
+        index = HistoryIndex(Path(tmp) / "index.sqlite", max_commits=args.commits)
+        suspects = [
+            (f"src/pkg{i % 20}/module_{i}.py", random.Random(i).randint(1, 50))
+            for i in random.Random(2).sample(range(400), args.suspects)
+        ]
+
+        start = time.perf_counter()
+        asyncio.run(index.update(runner))
+        first = time.perf_counter() - start
+
+        add_commits(repo, 10)
+        start = time.perf_counter()
+        asyncio.run(index.update(runner))
+        incremental = time.perf_counter() - start
+
+        def scan() -> None:
+            commits = analyzer.get_recent_commits(count=args.commits)
+            for path, line in suspects:
+                analyzer.find_relevant_changes(path, line, commits)
+
+        def lookup() -> None:
+            asyncio.run(index.update(runner))
+            for path, line in suspects:
+                analyzer.find_relevant_changes(path, line, index=index, depth=args.commits)
+
+        timings = {}
+        for name, func in (("scan", scan), ("index", lookup)):
+            best = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                func()
+                best = min(best, time.perf_counter() - start)
+            timings[name] = best
+        index.close()
+
+    print(f"repository:       {args.commits} commits, {args.suspects} suspects, depth {args.commits}")
+    print(f"first index:      {first * 1000:8.1f} ms (once per repository)")
+    print(f"update +10:       {incremental * 1000:8.1f} ms")
+    print(f"git log + scan:   {timings['scan'] * 1000:8.1f} ms per incident")
+    print(f"index lookups:    {timings['index'] * 1000:8.1f} ms per incident "
+          f"({timings['scan'] / timings['index']:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
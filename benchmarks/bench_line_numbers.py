@@ -0,0 +1,80 @@
+"""Benchmark: line-number lookup via LineIndex vs. counting newlines per match.
+
+Runs `detect_secrets` on a dense file (10k matches by default), once with
+the shared `LineIndex` and once with the previous per-match
+``content[:offset].count("\\n")`` lookup swapped in.
+
+Usage:
+    python -m benchmarks.bench_line_numbers [--matches 10000] [--filler 4] [--repeat 3]
+"""
+
+import argparse
+import random
+import time
+from typing import List, Tuple
+from unittest import mock
+
+from agents.agent_0_sanitizer import detection, patterns
+from agents.agent_0_sanitizer.detection import detect_secrets
+from agents.agent_0_sanitizer.patterns import PatternMatcher, SecretMatch
+from benchmarks.bench_secret_scanning import SECRET_LINES, SOURCE_LINES
+
+
+class CountingLines:
+    """Previous behaviour: count newlines before every match."""
+
+    def __init__(self, content: str):
+        self.content = content
+
+    def line_number(self, offset: int) -> int:
+        return self.content[:offset].count("\n") + 1
+
+
+def generate_content(matches: int, filler: int, seed: int = 42) -> str:
+    """Source-like content with a secret every ``filler + 1`` lines."""
+    rng = random.Random(seed)
+    lines: List[str] = []
+    for _ in range(matches):
+        lines.append(rng.choice(SECRET_LINES[:3]))
+        lines.extend(rng.choice(SOURCE_LINES) for _ in range(filler))
+    return "\n".join(lines)
+
+
+def time_detect(matcher: PatternMatcher, content: str, repeat: int) -> Tuple[float, List[SecretMatch]]:
+    """Best wall time of `detect_secrets` over several runs, with its result."""
+    best = float("inf")
+    result: List[SecretMatch] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = detect_secrets(content, "dense.txt", True, matcher)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--matches", type=int, default=10000)
+    parser.add_argument("--filler", type=int, default=4, help="Source lines between secrets")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    matcher = PatternMatcher(backend="re")
+    content = generate_content(args.matches, args.filler)
+
+    indexed, indexed_result = time_detect(matcher, content, args.repeat)
+    with mock.patch.object(patterns, "LineIndex", CountingLines), \
+            mock.patch.object(detection, "LineIndex", CountingLines):
+        # Quadratic in the match count: one run is plenty
+        counting, counting_result = time_detect(matcher, content, 1)
+
+    assert indexed_result == counting_result
+
+    print(f"content:  {len(content) / (1024 * 1024):.2f} MB, "
+          f"{content.count(chr(10)) + 1} lines, {len(indexed_result)} matches")
+    print(f"count per match: {counting * 1000:8.2f} ms")
+    print(f"line index:      {indexed * 1000:8.2f} ms")
+    print(f"speedup:         {counting / indexed:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
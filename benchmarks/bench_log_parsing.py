@@ -0,0 +1,325 @@
+"""Benchmark: single-pass LogTokenizer vs. the previous three-pass LogParser.
+
+The previous parser ran Python, JavaScript and generic regex passes over
+the whole log, searched backwards for a traceback header per Python
+error line and copied the rest of the log per JavaScript error. It is
+kept here as the reference. The log is CI-style build output with
+pytest, Jest, JUnit, Go and Rust failures mixed in; each parser's count
+of errors located in a source file is reported alongside its time, as
+is the streaming parser's peak memory while reading the log from disk.
+
+Usage:
+    python -m benchmarks.bench_log_parsing [--lines 200000] [--errors 2000] [--repeat 3]
+"""
+
+import argparse
+import random
+import re
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, List, Tuple
+
+from agents.agent_1_detective.log_parser import LogParser
+from models.analysis import ErrorInfo
+
+BUILD_LINES = [
+    "2024-05-02T10:14:03.1234567Z Collecting requests>=2.31",
+    "2024-05-02T10:14:04.0000000Z   Downloading requests-2.31.0-py3-none-any.whl (62 kB)",
+    "2024-05-02T10:14:05.5550000Z tests/test_api.py::test_health PASSED                [ 12%]",
+    "2024-05-02T10:14:06.0000000Z npm WARN deprecated inflight@1.0.6: This module is not supported",
+    "2024-05-02T10:14:07.0000000Z PASS src/components/Button.test.js (5.123 s)",
+    "2024-05-02T10:14:08.0000000Z [INFO] Building jar: /home/runner/work/app/target/app.jar",
+]
+
+FAILURES = [
+    """Traceback (most recent call last):
+  File "/opt/hostedtoolcache/Python/3.11.7/lib/python3.11/site-packages/_pytest/python.py", line 194, in pytest_pyfunc_call
+    result = testfunction(**testargs)
+  File "/home/runner/work/app/tests/test_orders.py", line {line}, in test_total
+    assert order.total() == 42
+  File "/home/runner/work/app/app/orders.py", line {inner}, in total
+    return sum(item.price for item in self.items) / self.count
+ZeroDivisionError: division by zero""",
+    """TypeError: Cannot read properties of undefined (reading 'id')
+    at getUser (/home/runner/work/app/src/users.js:{line}:17)
+    at Object.<anonymous> (/home/runner/work/app/src/users.test.js:{inner}:5)
+    at Promise.then.completed (/home/runner/work/app/node_modules/jest-circus/build/utils.js:298:28)""",
+    """java.lang.IllegalStateException: order {line} failed
+\tat com.acme.shop.Orders.total(Orders.java:{inner})
+\tat org.junit.platform.engine.support.hierarchical.NodeTestTask.execute(NodeTestTask.java:151)""",
+    """panic: runtime error: index out of range [{line}] with length 3
+
+goroutine 7 [running]:
+github.com/acme/shop.(*Cart).Total(...)
+\t/home/runner/work/shop/cart.go:{inner} +0x1d
+""",
+    """error[E0425]: cannot find value `totl` in this scope
+ --> src/cart.rs:{line}:5
+  |
+{inner} |     totl
+  |     ^^^^ not found in this scope
+""",
+]
+
+
+class LegacyLogParser:
+    """The three-pass parser this benchmark replaces, verbatim."""
+
+    # Patterns for different log formats
+    PYTHON_TRACEBACK = re.compile(
+        r'Traceback \(most recent call last\):\n(.*?)(?:^(\w+(?:Error|Exception|Warning)): (.+))$',
+        re.MULTILINE | re.DOTALL
+    )
+
+    PYTHON_FRAME = re.compile(
+        r'^\s*File "([^"]+)", line (\d+), in (\w+)\n\s*(.+)?$',
+        re.MULTILINE
+    )
+
+    PYTHON_ERROR_LINE = re.compile(
+        r'^(\w+(?:Error|Exception|Warning)): (.+)$',
+        re.MULTILINE
+    )
+
+    # Node.js/JavaScript patterns
+    JS_STACK_FRAME = re.compile(
+        r'^\s+at (?:(.+?) \()?((?:[A-Za-z]:)?[^:]+):(\d+):\d+\)?$',
+        re.MULTILINE
+    )
+
+    JS_ERROR = re.compile(
+        r'^((?:\w+)?Error): (.+)$',
+        re.MULTILINE
+    )
+
+    # Generic error patterns
+    GENERIC_ERROR = re.compile(
+        r'(?:ERROR|Error|error|FATAL|Fatal|fatal)[:\s]+(.+)',
+        re.MULTILINE
+    )
+
+    HTTP_ERROR = re.compile(
+        r'(?:HTTP[/\s]?\d+\.\d+\s+)?(\d{3})\s+(.+)',
+    )
+
+    def parse(self, log_content: str) -> List[ErrorInfo]:
+        """Parse log content and extract errors.
+
+        Args:
+            log_content: Raw log content
+
+        Returns:
+            List of extracted error information
+        """
+        errors: List[ErrorInfo] = []
+
+        # Try Python traceback parsing first
+        python_errors = self._parse_python_traceback(log_content)
+
+        # Try JavaScript stack trace
+        js_errors = self._parse_js_stack(log_content)
+
+        # Prefer the parser that found file paths
+        if python_errors and any(e.file_path for e in python_errors):
+            errors.extend(python_errors)
+        elif js_errors and any(e.file_path for e in js_errors):
+            errors.extend(js_errors)
+        elif python_errors:
+            errors.extend(python_errors)
+        elif js_errors:
+            errors.extend(js_errors)
+
+        # Try generic error patterns if no structured errors found
+        if not errors:
+            generic_errors = self._parse_generic_errors(log_content)
+            errors.extend(generic_errors)
+
+        return errors
+
+    def _parse_python_traceback(self, content: str) -> List[ErrorInfo]:
+        """Parse Python traceback format."""
+        errors: List[ErrorInfo] = []
+
+        # Find error lines
+        for match in self.PYTHON_ERROR_LINE.finditer(content):
+            error_type = match.group(1)
+            error_message = match.group(2)
+
+            # Try to find associated stack trace
+            stack_start = content.rfind('Traceback (most recent call last):', 0, match.start())
+
+            file_path = None
+            line_number = None
+            stack_trace = None
+
+            if stack_start != -1:
+                stack_trace = content[stack_start:match.end()]
+
+                # Parse frames to find the last user code frame
+                frames = list(self.PYTHON_FRAME.finditer(stack_trace))
+
+                # Find the most relevant frame (last non-library frame)
+                for frame in reversed(frames):
+                    frame_path = frame.group(1)
+                    # Skip standard library and site-packages
+                    if not any(skip in frame_path for skip in [
+                        'site-packages', 'lib/python', '/usr/lib/',
+                        'venv/', '.venv/', 'anaconda', 'miniconda'
+                    ]):
+                        file_path = frame_path
+                        line_number = int(frame.group(2))
+                        break
+
+                # Fallback to last frame if no user code found
+                if file_path is None and frames:
+                    file_path = frames[-1].group(1)
+                    line_number = int(frames[-1].group(2))
+
+            errors.append(ErrorInfo(
+                error_type=error_type,
+                message=error_message,
+                file_path=file_path,
+                line_number=line_number,
+                stack_trace=stack_trace,
+            ))
+
+        return errors
+
+    def _parse_js_stack(self, content: str) -> List[ErrorInfo]:
+        """Parse JavaScript stack trace format."""
+        errors: List[ErrorInfo] = []
+
+        for match in self.JS_ERROR.finditer(content):
+            error_type = match.group(1)
+            error_message = match.group(2)
+
+            # Look for stack frames after this error
+            stack_start = match.end()
+            remaining = content[stack_start:]
+
+            # Collect stack frames
+            frames: List[Tuple[str, str, int]] = []
+            for frame_match in self.JS_STACK_FRAME.finditer(remaining):
+                func_name = frame_match.group(1) or "<anonymous>"
+                file_path = frame_match.group(2)
+                line_num = int(frame_match.group(3))
+                frames.append((func_name, file_path, line_num))
+
+                # Stop after finding frames (before next error or end)
+                if len(frames) > 20:
+                    break
+
+            # Find first non-node_modules frame
+            file_path = None
+            line_number = None
+            for func, path, line in frames:
+                if 'node_modules' not in path:
+                    # Normalize path: strip leading slash for relative paths
+                    file_path = path.lstrip('/')
+                    line_number = line
+                    break
+
+            if file_path is None and frames:
+                _, path, line_number = frames[0]
+                file_path = path.lstrip('/')
+
+            errors.append(ErrorInfo(
+                error_type=error_type,
+                message=error_message,
+                file_path=file_path,
+                line_number=line_number,
+                stack_trace=remaining[:500] if frames else None,
+            ))
+
+        return errors
+
+    def _parse_generic_errors(self, content: str) -> List[ErrorInfo]:
+        """Parse generic error patterns."""
+        errors: List[ErrorInfo] = []
+
+        for match in self.GENERIC_ERROR.finditer(content):
+            message = match.group(1).strip()
+
+            # Try to extract file/line from message
+            file_match = re.search(r'([^\s:]+):(\d+)', message)
+            file_path = file_match.group(1) if file_match else None
+            line_number = int(file_match.group(2)) if file_match else None
+
+            errors.append(ErrorInfo(
+                error_type="Error",
+                message=message,
+                file_path=file_path,
+                line_number=line_number,
+            ))
+
+        # Deduplicate by message
+        seen_messages = set()
+        unique_errors = []
+        for error in errors:
+            if error.message not in seen_messages:
+                seen_messages.add(error.message)
+                unique_errors.append(error)
+
+        return unique_errors
+
+
+def generate_log(lines: int, errors: int, seed: int = 3) -> str:
+    """A CI log of ``lines`` build lines with ``errors`` failures mixed in."""
+    rng = random.Random(seed)
+    out: List[str] = [rng.choice(BUILD_LINES) for _ in range(lines)]
+    for position in sorted(rng.sample(range(lines), errors), reverse=True):
+        failure = rng.choice(FAILURES)
+        out.insert(position, failure.format(line=rng.randint(1, 500), inner=rng.randint(1, 500)))
+    return "\n".join(out) + "\n"
+
+
+def time_parse(func: Callable[[], List[ErrorInfo]], repeat: int) -> Tuple[float, List[ErrorInfo]]:
+    """Best wall time over several runs, with the errors found."""
+    best = float("inf")
+    errors: List[ErrorInfo] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        errors = func()
+        best = min(best, time.perf_counter() - start)
+    return best, errors
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=200000)
+    parser.add_argument("--errors", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    log_parser = LogParser()
+    content = generate_log(args.lines, args.errors)
+
+    # Quadratic in the error count: one run is plenty
+    legacy, legacy_errors = time_parse(lambda: LegacyLogParser().parse(content), 1)
+    single, single_errors = time_parse(lambda: log_parser.parse(content), args.repeat)
+
+    with tempfile.NamedTemporaryFile("w", suffix=".log") as f:
+        f.write(content)
+        f.flush()
+        tracemalloc.start()
+        with open(f.name) as log_file:
+            for _ in log_parser.parse_stream(log_file):
+                pass
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    def located(errors: List[ErrorInfo]) -> int:
+        return sum(1 for e in errors if e.file_path)
+
+    print(f"log:          {len(content) / (1024 * 1024):.1f} MB, "
+          f"{content.count(chr(10))} lines, {args.errors} failures")
+    print(f"three-pass:   {legacy * 1000:8.1f} ms  "
+          f"{len(legacy_errors)} errors, {located(legacy_errors)} located")
+    print(f"single-pass:  {single * 1000:8.1f} ms  "
+          f"{len(single_errors)} errors, {located(single_errors)} located  ({legacy / single:.2f}x)")
+    print(f"stream peak:  {peak / (1024 * 1024):8.2f} MB (reading the file)")
+
+
+if __name__ == "__main__":
+    main()
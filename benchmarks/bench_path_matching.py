@@ -0,0 +1,98 @@
+"""Benchmark: precompiled PathFilter vs. per-pattern fnmatch loops.
+
+Usage:
+    python -m benchmarks.bench_path_matching [--paths 200000] [--repeat 5]
+"""
+
+import argparse
+import random
+import time
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Callable, List
+
+from agents.agent_0_sanitizer.globs import PathFilter
+
+# Mirrors config/security_rules.yaml
+SCAN_PATTERNS = [
+    "*.env*", "*.yaml", "*.yml", "*.json", "*.ini", "*.cfg", "*.conf",
+    "*.properties", "*.toml", "*.xml", "*.py", "*.js", "*.ts", "*.go", "*.rb",
+    "*.java", "*.sh", "Dockerfile",
+]
+SKIP_PATTERNS = [
+    "node_modules/**", ".git/**", "__pycache__/**", "*.pyc", ".venv/**",
+    "venv/**", "*.lock", "package-lock.json", "yarn.lock",
+]
+
+DIRS = ["src", "lib", "app/models", "app/views", "tests", "config", "scripts", "docs"]
+VENDORED = ["node_modules", "venv", "__pycache__"]
+EXTENSIONS = [".py", ".js", ".ts", ".md", ".png", ".json", ".yaml", ".pyc", ".txt", ".lock"]
+
+
+def generate_paths(count: int, seed: int = 5) -> List[str]:
+    """Generate relative paths, about half of them under vendored directories."""
+    rng = random.Random(seed)
+    paths = []
+    for i in range(count):
+        if rng.random() < 0.5:
+            top = rng.choice(VENDORED)
+            parts = [top] + [f"pkg{rng.randint(0, 500)}" for _ in range(rng.randint(1, 4))]
+        else:
+            parts = [rng.choice(DIRS)] + [f"mod{rng.randint(0, 50)}" for _ in range(rng.randint(0, 2))]
+        name = rng.choice(["Dockerfile", ".env.local"]) if rng.random() < 0.01 else (
+            f"file{i}{rng.choice(EXTENSIONS)}"
+        )
+        paths.append("/".join(parts + [name]))
+    return paths
+
+
+def fnmatch_should_scan(file_path: str) -> bool:
+    """The per-pattern loop PathFilter replaces."""
+    for pattern in SKIP_PATTERNS:
+        if fnmatch(file_path, pattern):
+            return False
+    for pattern in SCAN_PATTERNS:
+        if fnmatch(file_path, pattern) or fnmatch(Path(file_path).name, pattern):
+            return True
+    return False
+
+
+def best_time(func: Callable[[], object], repeat: int) -> float:
+    """Return the best wall time over several runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--paths", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    paths = generate_paths(args.paths)
+    path_filter = PathFilter(SCAN_PATTERNS, SKIP_PATTERNS)
+
+    expected = [fnmatch_should_scan(p) for p in paths]
+    assert [path_filter.should_scan(p) for p in paths] == expected
+
+    legacy = best_time(lambda: [fnmatch_should_scan(p) for p in paths], args.repeat)
+    compiled = best_time(lambda: [path_filter.should_scan(p) for p in paths], args.repeat)
+
+    # With pruning, files under skipped directories are never matched at all
+    pruned_dirs = {d for d in VENDORED if path_filter.should_prune(d)}
+    walked = [p for p in paths if p.split("/", 1)[0] not in pruned_dirs]
+    with_pruning = best_time(lambda: [path_filter.should_scan(p) for p in walked], args.repeat)
+
+    print(f"{len(paths)} paths, {sum(expected)} scanned, "
+          f"{len(paths) - len(walked)} under pruned directories {sorted(pruned_dirs)}")
+    print(f"  fnmatch loop: {legacy * 1000:8.2f} ms")
+    print(f"  PathFilter:   {compiled * 1000:8.2f} ms  ({legacy / compiled:.2f}x)")
+    print(f"  + pruning:    {with_pruning * 1000:8.2f} ms  ({legacy / with_pruning:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
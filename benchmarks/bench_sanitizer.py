@@ -0,0 +1,266 @@
+"""Benchmark: end-to-end SanitizerAgent throughput on a synthetic repository.
+
+Reports files/sec, MB/sec, peak RSS and, for in-process runs, the time
+spent in each phase of `_sanitize_directory` (exclusive of nested
+phases): walk, read, match, entropy, redact and write. Use ``--json`` to
+write the results for tracking across releases.
+
+Usage:
+    python -m benchmarks.bench_sanitizer [--files 2000] [--workers 0] [--cache]
+        [--json results.json]
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from dataclasses import asdict
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from unittest import mock
+from uuid import uuid4
+
+from agents.agent_0_sanitizer import detection, sanitizer, worker
+from agents.agent_0_sanitizer.patterns import PatternMatcher
+from agents.agent_0_sanitizer.redactor import Redactor
+from agents.agent_0_sanitizer.sanitizer import SanitizerAgent
+from agents.agent_0_sanitizer.worker import shutdown_process_pool
+from benchmarks.synthetic_repo import DEFAULT_MIX, RepoSpec, generate_repo, parse_mix
+from config.settings import get_settings
+
+PHASES = ("walk", "read", "match", "entropy", "redact", "write")
+
+
+class PhaseTimer:
+    """Accumulates exclusive wall time per phase from wrapped callables."""
+
+    def __init__(self):
+        self.totals: Dict[str, float] = defaultdict(float)
+        self._nested: List[float] = []  # Time spent in timed callees, per active frame
+
+    def _record(self, phase: str, func: Callable[[], Any]) -> Any:
+        self._nested.append(0.0)
+        start = time.perf_counter()
+        try:
+            return func()
+        finally:
+            elapsed = time.perf_counter() - start
+            self.totals[phase] += elapsed - self._nested.pop()
+            if self._nested:
+                self._nested[-1] += elapsed
+
+    def wrap(self, phase: str, func: Callable) -> Callable:
+        """Time every call of ``func`` as ``phase``."""
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            return self._record(phase, lambda: func(*args, **kwargs))
+        return timed
+
+    def iterate(self, phase: str, iterator: Iterator) -> Iterator:
+        """Time every step of ``iterator`` as ``phase``."""
+        sentinel = object()
+        while True:
+            item = self._record(phase, lambda: next(iterator, sentinel))
+            if item is sentinel:
+                return
+            yield item
+
+
+@contextmanager
+def instrument(agent: SanitizerAgent, timer: PhaseTimer) -> Iterator[None]:
+    """Route the sanitizer's phase functions through ``timer``."""
+    targets = [
+        (Path, "read_bytes", "read"),
+        (worker, "is_binary", "read"),
+        (worker, "decode_text", "read"),
+        (PatternMatcher, "find_secrets", "match"),
+        (Redactor, "find_env_secrets", "match"),
+        (detection, "find_config_secrets", "match"),
+        (PatternMatcher, "find_high_entropy_strings", "entropy"),
+        (detection, "resolve_overlaps", "redact"),
+        (Redactor, "redact", "redact"),
+        (worker, "write_output", "write"),
+        (worker, "link_file", "write"),
+        (sanitizer, "link_file", "write"),
+    ]
+    walk = agent._iter_scannable_files
+
+    with ExitStack() as stack:
+        for owner, attr, phase in targets:
+            stack.enter_context(
+                mock.patch.object(owner, attr, timer.wrap(phase, getattr(owner, attr)))
+            )
+        stack.enter_context(mock.patch.object(
+            agent, "_iter_scannable_files",
+            lambda root, shadow=None: timer.iterate("walk", walk(root, shadow)),
+        ))
+        yield
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process and its children so far."""
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024  # Bytes vs. KB
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    return peak / divisor
+
+
+async def run_once(
+    agent: SanitizerAgent,
+    repo: Path,
+    work_dir: Path,
+    include_entropy: bool,
+    phases: bool,
+) -> Dict[str, Any]:
+    """Sanitize ``repo`` into a fresh shadow directory once."""
+    shadow = Path(tempfile.mkdtemp(prefix="shadow-", dir=work_dir))
+    timer = PhaseTimer()
+
+    try:
+        with instrument(agent, timer) if phases else ExitStack():
+            start = time.perf_counter()
+            report = await agent._sanitize_directory(shadow, uuid4(), include_entropy, source=repo)
+            seconds = time.perf_counter() - start
+    finally:
+        shutil.rmtree(shadow, ignore_errors=True)
+
+    result: Dict[str, Any] = {
+        "seconds": seconds,
+        "files_scanned": report.total_files_scanned,
+        "secrets_found": report.total_secrets_found,
+        "cache_hits": report.cache_hits,
+        "phases": None,
+    }
+    if phases:
+        breakdown = {phase: timer.totals.get(phase, 0.0) for phase in PHASES}
+        breakdown["other"] = max(0.0, seconds - sum(breakdown.values()))
+        result["phases"] = breakdown
+    return result
+
+
+async def run_benchmark(args: argparse.Namespace, work_dir: Path) -> Dict[str, Any]:
+    """Generate the repository and time the requested sanitizer runs."""
+    spec = RepoSpec(
+        files=args.files,
+        languages=parse_mix(args.languages),
+        binary_ratio=args.binary_ratio,
+        secret_density=args.secret_density,
+        file_kb=args.file_kb,
+        bundles=args.bundles,
+        bundle_kb=args.bundle_kb,
+        lockfiles=args.lockfiles,
+        lockfile_packages=args.lockfile_packages,
+        seed=args.seed,
+    )
+    repo = work_dir / "repo"
+    stats = generate_repo(repo, spec)
+
+    settings = get_settings()
+    settings.SANITIZER_WORKERS = args.workers
+    settings.SANITIZER_CACHE_DIR = str(work_dir / "cache") if args.cache else ""
+    agent = SanitizerAgent()
+    phases = args.workers == 0
+
+    runs = []
+    passes = ["cold", "warm"] if args.cache else ["cold"]
+    try:
+        for name in passes:
+            best: Optional[Dict[str, Any]] = None
+            for _ in range(args.repeat):
+                if name == "cold" and args.cache:
+                    shutil.rmtree(work_dir / "cache", ignore_errors=True)
+                    agent = SanitizerAgent()
+                result = await run_once(agent, repo, work_dir, not args.no_entropy, phases)
+                if best is None or result["seconds"] < best["seconds"]:
+                    best = result
+            assert best is not None
+
+            seconds = best["seconds"]
+            runs.append({
+                "name": name,
+                "workers": args.workers,
+                **best,
+                "files_per_sec": stats.files / seconds,
+                "mb_per_sec": stats.bytes / (1024 * 1024) / seconds,
+                "peak_rss_mb": peak_rss_mb(),
+            })
+    finally:
+        shutdown_process_pool()
+
+    try:
+        version = metadata.version("neverdown")
+    except metadata.PackageNotFoundError:
+        version = "unknown"
+
+    return {
+        "benchmark": "sanitizer",
+        "neverdown_version": version,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "regex_backend": agent.pattern_matcher.scanner.name,
+        "include_entropy": not args.no_entropy,
+        "repo": {"spec": asdict(spec), "generated": stats.to_dict()},
+        "runs": runs,
+    }
+
+
+def print_summary(results: Dict[str, Any]) -> None:
+    """Print a human-readable summary of the results."""
+    generated = results["repo"]["generated"]
+    print(f"repo: {generated['files']} files, {generated['bytes'] / (1024 * 1024):.1f} MB, "
+          f"{generated['binary_files']} binary, {generated['secrets_planted']} secrets planted")
+    for run in results["runs"]:
+        print(f"{run['name']} (workers={run['workers']}): {run['seconds']:.2f} s, "
+              f"{run['files_per_sec']:.0f} files/s, {run['mb_per_sec']:.1f} MB/s, "
+              f"peak RSS {run['peak_rss_mb']:.0f} MB, {run['secrets_found']} secrets")
+        if run["phases"]:
+            for phase, seconds in run["phases"].items():
+                share = seconds / run["seconds"] * 100 if run["seconds"] else 0.0
+                print(f"  {phase:8s} {seconds * 1000:9.1f} ms  {share:5.1f}%")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--languages", default=DEFAULT_MIX, help="language=weight,...")
+    parser.add_argument("--binary-ratio", type=float, default=0.05)
+    parser.add_argument("--secret-density", type=float, default=0.002)
+    parser.add_argument("--file-kb", type=float, default=6.0)
+    parser.add_argument("--bundles", type=int, default=2)
+    parser.add_argument("--bundle-kb", type=int, default=512)
+    parser.add_argument("--lockfiles", type=int, default=1)
+    parser.add_argument("--lockfile-packages", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--workers", type=int, default=0, help="0 = in-process with phase times")
+    parser.add_argument("--cache", action="store_true", help="Also time a warm-cache pass")
+    parser.add_argument("--no-entropy", action="store_true")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="Write results as JSON to this path ('-' for stdout)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="neverdown-bench-") as tmp:
+        results = asyncio.run(run_benchmark(args, Path(tmp)))
+
+    if args.json == "-":
+        json.dump(results, sys.stdout, indent=2)
+        print()
+        return
+
+    print_summary(results)
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Benchmark: secret scanning throughput of each installed regex backend.
+
+Usage:
+    python -m benchmarks.bench_scan_backends [--size-kb 2048] [--repeat 5]
+"""
+
+import argparse
+import time
+
+from agents.agent_0_sanitizer.backends import available_backends
+from agents.agent_0_sanitizer.patterns import PatternMatcher
+from benchmarks.bench_secret_scanning import generate_content
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-kb", type=int, default=2048)
+    parser.add_argument("--secret-ratio", type=float, default=0.01)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    content = generate_content(args.size_kb, args.secret_ratio)
+    size_mb = len(content) / (1024 * 1024)
+    reference = PatternMatcher(backend="re").find_secrets_sequential(content)
+
+    print(f"content: {size_mb:.2f} MB, {len(reference)} secrets")
+    for name in available_backends():
+        matcher = PatternMatcher(backend=name)
+        if matcher.find_secrets(content) != reference:
+            print(f"{name:10s} MISMATCH with re reference, skipped")
+            continue
+
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            matcher.scanner.scan(content)
+            best = min(best, time.perf_counter() - start)
+        print(f"{name:10s} {best * 1000:8.2f} ms  ({size_mb / best:7.1f} MB/s)")
+
+
+if __name__ == "__main__":
+    main()
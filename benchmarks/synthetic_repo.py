@@ -0,0 +1,182 @@
+"""Synthetic repository generator for sanitizer benchmarks.
+
+Builds a deterministic source tree with a configurable number of files,
+language mix, share of binary files and secret density, plus optional
+minified bundles and giant lockfiles (the inputs that dominate real
+sanitizer runs).
+"""
+
+import random
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.bench_entropy import generate_bundle, generate_lockfile
+from benchmarks.bench_secret_scanning import SECRET_LINES
+
+# File extension and representative lines per language
+LANGUAGES: Dict[str, tuple] = {
+    "python": (".py", [
+        "def handle_request(request, session):",
+        "    user = session.query(User).filter_by(id=request.user_id).first()",
+        "    if not user:",
+        "        raise NotFoundError(f\"user {request.user_id} not found\")",
+        "    logger.info(\"Processing batch\", batch_size=len(batch))",
+        "    return {\"status\": \"ok\", \"items\": [i.to_dict() for i in user.items]}",
+        "",
+    ]),
+    "javascript": (".js", [
+        "const config = require('./config');",
+        "export async function fetchData(url) { return await fetch(url).then(r => r.json()); }",
+        "module.exports = { handler: async (event) => ({ statusCode: 200 }) };",
+        "  if (!user) { throw new Error(`user ${id} not found`); }",
+        "",
+    ]),
+    "typescript": (".ts", [
+        "export interface Order { id: string; total: number; items: OrderItem[] }",
+        "export const getOrder = async (id: string): Promise<Order> => api.get(`/orders/${id}`);",
+        "  private readonly cache = new Map<string, Order>();",
+        "",
+    ]),
+    "go": (".go", [
+        "func (s *Server) HandleOrder(w http.ResponseWriter, r *http.Request) {",
+        "\tif err := json.NewDecoder(r.Body).Decode(&order); err != nil {",
+        "\t\thttp.Error(w, err.Error(), http.StatusBadRequest)",
+        "\t}",
+        "}",
+    ]),
+    "java": (".java", [
+        "public class OrderService {",
+        "    private final OrderRepository repository;",
+        "    public Order find(String id) { return repository.findById(id).orElseThrow(); }",
+        "}",
+    ]),
+    "yaml": (".yaml", [
+        "services:",
+        "  api:",
+        "    image: registry.example.com/api:1.4.2",
+        "    replicas: 3",
+        "    env: production",
+    ]),
+    "json": (".json", [
+        "{\"name\": \"service\", \"version\": \"1.2.3\", \"private\": true,",
+        " \"scripts\": {\"build\": \"tsc -p .\", \"test\": \"jest --coverage\"}}",
+    ]),
+    "markdown": (".md", [
+        "# Service",
+        "Run `make dev` to start the stack locally.",
+        "- Requests are authenticated with the session cookie.",
+        "",
+    ]),
+    "env": (".env", [
+        "DEBUG=false",
+        "LOG_LEVEL=info",
+        "PORT=8080",
+    ]),
+}
+
+DEFAULT_MIX = "python=4,javascript=3,typescript=2,go=1,java=1,yaml=1,json=1,markdown=1,env=0.1"
+
+DIRECTORIES = ["src", "src/api", "src/models", "lib", "app/views", "tests", "config", "scripts"]
+
+
+@dataclass
+class RepoSpec:
+    """Shape of a synthetic repository."""
+    files: int = 2000
+    languages: Dict[str, float] = field(default_factory=lambda: parse_mix(DEFAULT_MIX))
+    binary_ratio: float = 0.05
+    secret_density: float = 0.002  # Probability that a source line is a secret
+    file_kb: float = 6.0  # Mean source file size
+    bundles: int = 2
+    bundle_kb: int = 512
+    lockfiles: int = 1
+    lockfile_packages: int = 5000
+    seed: int = 1234
+
+
+@dataclass
+class RepoStats:
+    """What was generated."""
+    files: int = 0
+    bytes: int = 0
+    binary_files: int = 0
+    secrets_planted: int = 0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """Parse a ``language=weight,...`` mix."""
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        if name.strip() not in LANGUAGES:
+            raise ValueError(f"Unknown language {name!r}; choose from {sorted(LANGUAGES)}")
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+def _source_file(rng: random.Random, lines: List[str], size: int, density: float) -> tuple:
+    """Build a source file of about ``size`` bytes; returns (text, secrets)."""
+    out: List[str] = []
+    secrets = 0
+    length = 0
+    while length < size:
+        if rng.random() < density:
+            line = rng.choice(SECRET_LINES)
+            secrets += 1
+        else:
+            line = rng.choice(lines)
+        out.append(line)
+        length += len(line) + 1
+    return "\n".join(out) + "\n", secrets
+
+
+def generate_repo(root: Path, spec: RepoSpec) -> RepoStats:
+    """Write a synthetic repository under ``root``.
+
+    Args:
+        root: Directory to create the repository in
+        spec: Repository shape
+
+    Returns:
+        Counts of what was written
+    """
+    rng = random.Random(spec.seed)
+    stats = RepoStats()
+    names = list(spec.languages)
+    weights = [spec.languages[name] for name in names]
+
+    def write(rel_path: str, data: bytes) -> None:
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        stats.files += 1
+        stats.bytes += len(data)
+
+    for i in range(spec.files):
+        directory = rng.choice(DIRECTORIES)
+        if rng.random() < spec.binary_ratio:
+            data = b"\x89PNG\r\n\x1a\n" + rng.randbytes(rng.randint(2_000, 60_000))
+            write(f"{directory}/assets/image_{i}.png", data)
+            stats.binary_files += 1
+            continue
+
+        language = rng.choices(names, weights)[0]
+        extension, lines = LANGUAGES[language]
+        size = int(rng.expovariate(1 / (spec.file_kb * 1024))) + 64
+        text, secrets = _source_file(rng, lines, size, spec.secret_density)
+        stats.secrets_planted += secrets
+        name = f".env.{i}" if language == "env" else f"module_{i}{extension}"
+        write(f"{directory}/{name}", text.encode())
+
+    for i in range(spec.bundles):
+        write(f"dist/bundle.{i}.min.js", generate_bundle(spec.bundle_kb, seed=spec.seed + i).encode())
+
+    for i in range(spec.lockfiles):
+        lockfile = generate_lockfile(spec.lockfile_packages, seed=spec.seed + 100 + i)
+        write(f"packages/app{i}/package-lock.json", lockfile.encode())
+
+    return stats
@@ -0,0 +1,37 @@
+"""Environment for git commands, with GitHub credentials when configured.
+
+``GITHUB_TOKEN`` is passed to git as an ``http.extraHeader`` scoped to
+https://github.com/, through ``GIT_CONFIG_COUNT``/``GIT_CONFIG_KEY_n``
+environment variables rather than the remote URL. Tokens in a URL end up
+in the repository's config and in process listings; this way they live
+only in the environment of the git processes that need them, including
+the blob fetches of partial clones (mirror worktrees) that any git
+command may start.
+"""
+
+import base64
+import os
+from typing import Dict
+
+from config.settings import get_settings
+
+GITHUB_URL = "https://github.com/"
+
+
+def git_env() -> Dict[str, str]:
+    """Environment for git: never prompt, authenticate to GitHub if a token is set."""
+    env = os.environ.copy()
+    env["GIT_TERMINAL_PROMPT"] = "0"
+
+    token = get_settings().GITHUB_TOKEN
+    if token:
+        credentials = base64.b64encode(
+            f"x-access-token:{token.get_secret_value()}".encode()
+        ).decode()
+        # Append to any config the caller's environment already passes
+        index = int(env.get("GIT_CONFIG_COUNT") or 0)
+        env[f"GIT_CONFIG_KEY_{index}"] = f"http.{GITHUB_URL}.extraheader"
+        env[f"GIT_CONFIG_VALUE_{index}"] = f"AUTHORIZATION: basic {credentials}"
+        env["GIT_CONFIG_COUNT"] = str(index + 1)
+
+    return env
@@ -64,6 +64,24 @@ class Settings(BaseSettings):
     # Agent Configuration
     SANITIZER_CONFIDENCE_THRESHOLD: float = 0.9
     SANITIZER_MAX_SECRETS: int = 100
+    SANITIZER_WORKERS: int = 0  # 0 = sanitize in a thread, >0 = process pool size
+    SANITIZER_BATCH_SIZE: int = 32  # Max files per process pool task
+    SANITIZER_CACHE_DIR: Optional[str] = "/tmp/neverdown-sanitizer-cache"  # Empty disables
+    SANITIZER_CACHE_MAX_MB: int = 512
+    SANITIZER_SHADOW_LINK_MODE: str = "auto"  # auto, reflink, hardlink or copy
+    SANITIZER_STREAM_THRESHOLD_MB: int = 32  # Larger files are streamed in chunks; 0 disables
+    SANITIZER_MMAP_THRESHOLD_MB: int = 4  # Larger files are scanned memory-mapped; 0 disables
+    SANITIZER_SNAPSHOT_DIR: Optional[str] = "/tmp/neverdown-sanitizer-snapshots"  # Empty disables
+    SANITIZER_SNAPSHOTS_PER_REPO: int = 2
+    SANITIZER_CLEAN_INDEX_DIR: Optional[str] = "/tmp/neverdown-sanitizer-clean-index"  # Empty disables
+    SANITIZER_REGEX_BACKEND: str = "re"  # re, regex, re2, hyperscan or auto
+    SANITIZER_SERVICE_CONCURRENCY: int = 1  # Incidents sanitized at once by the shared service
+    DETECTIVE_HISTORY_COMMITS: int = 10  # Recent commits searched for related changes
+    DETECTIVE_GIT_CONCURRENCY: int = 4  # Git processes one analysis runs at once
+    DETECTIVE_GIT_TIMEOUT_SECONDS: float = 60.0
+    DETECTIVE_BLAME_CACHE_FILES: int = 512  # Whole-file blames kept for all incidents
+    DETECTIVE_HISTORY_INDEX_DIR: Optional[str] = "/tmp/neverdown-history-index"  # Empty disables
+    DETECTIVE_HISTORY_INDEX_COMMITS: int = 5000  # Commits kept per repository index
     REASONER_CONFIDENCE_THRESHOLD: float = 0.7
     MAX_RETRIES: int = 3
     RETRY_BACKOFF_BASE: float = 2.0
@@ -76,6 +94,9 @@ class Settings(BaseSettings):
     WORKSPACE_DIR: str = "/tmp/neverdown-workspaces"
     SANITIZED_REPO_DIR: str = "/tmp/neverdown-sanitized"
     CLONE_DIR: str = "/tmp/neverdown-clones"
+    GIT_MIRROR_DIR: Optional[str] = "/tmp/neverdown-git-mirrors"  # Empty disables
+    GIT_MIRROR_MAX_MB: int = 10240  # Total mirror size before eviction
+    GIT_MIRROR_FILTER: str = ""  # Partial clone filter, e.g. "blob:none"; empty mirrors every object
     
     @field_validator("ALLOWED_REPOS", mode="before")
     @classmethod
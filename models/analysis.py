@@ -49,6 +49,8 @@ class ErrorInfo(BaseModel):
     file_path: Optional[str] = Field(default=None, description="File where error occurred")
     line_number: Optional[int] = Field(default=None, description="Line number")
     stack_trace: Optional[str] = Field(default=None, description="Full stack trace")
+    fingerprint: Optional[str] = Field(default=None, description="Hash of type, normalized message and frames")
+    occurrences: int = Field(default=1, description="Times this error appeared in the logs")
 
 
 class RecentChange(BaseModel):
@@ -104,6 +106,9 @@ class SanitizationReport(BaseModel):
     by_severity: Dict[str, int] = Field(default_factory=dict)
     by_type: Dict[str, int] = Field(default_factory=dict)
     halted: bool = Field(default=False, description="Whether processing was halted due to too many secrets")
+    cache_hits: int = Field(default=0, description="Files served from the sanitization cache")
+    cache_misses: int = Field(default=0, description="Files scanned and added to the cache")
+    base_commit: Optional[str] = Field(default=None, description="Snapshot commit an incremental run started from")
     duration_ms: int = Field(default=0)
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
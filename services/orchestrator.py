@@ -10,7 +10,9 @@ from uuid import UUID
 
 import httpx
 
-from agents.agent_0_sanitizer.sanitizer import SanitizerAgent, SanitizeInput
+from agents.agent_0_sanitizer.sanitizer import SanitizeInput
+from agents.agent_0_sanitizer.service import get_sanitizer_service
+from agents.agent_0_sanitizer.snapshots import Snapshot, open_snapshot_store
 from agents.agent_1_detective.detective import DetectiveAgent, DetectiveInput
 from agents.agent_2_reasoner.reasoner import ReasonerAgent, ReasonerInput
 from agents.agent_3_verifier.verifier import VerifierAgent, VerifierInput
@@ -20,6 +22,7 @@ from config.settings import get_settings
 from database.repositories.audit_repo import AuditRepository
 from database.repositories.incident_repo import IncidentRepository
 from database.repositories.patch_repo import PatchRepository
+from models.analysis import SanitizationReport
 from models.incident import IncidentStatus
 from services.git_service import GitService
 
@@ -75,9 +78,14 @@ class Orchestrator:
         
         # Services
         self.git_service = GitService()
+        self.snapshots = open_snapshot_store(
+            self.settings.SANITIZER_SNAPSHOT_DIR,
+            self.settings.SANITIZER_SNAPSHOTS_PER_REPO,
+        )
         
-        # Agents
-        self.sanitizer = SanitizerAgent()
+        # Agents (the sanitizer is shared and stays warm across incidents)
+        self.sanitizer_service = get_sanitizer_service()
+        self.sanitizer = self.sanitizer_service.agent
         self.detective = DetectiveAgent()
         self.reasoner = ReasonerAgent()
         self.verifier = VerifierAgent()
@@ -342,12 +350,16 @@ class Orchestrator:
             "Sanitizing repository",
         )
         
-        result = await self.sanitizer.run(
+        head_commit = await asyncio.to_thread(
+            self.git_service.get_commit_sha, context.original_repo_path,
+        )
+        
+        result = await self.sanitizer_service.sanitize(
             SanitizeInput(
                 repo_path=context.original_repo_path,
                 incident_id=context.incident_id,
+                base_snapshot=await self._find_base_snapshot(context),
             ),
-            incident_id=context.incident_id,
         )
         
         if not result.success:
@@ -357,8 +369,61 @@ class Orchestrator:
         context.sanitized_repo_path = result.output.sanitized_repo_path
         context.sanitization_report = result.output.report
         
+        await self._save_snapshot(context, head_commit, result.output.report)
+        
         return True
     
+    async def _find_base_snapshot(self, context: OrchestrationContext) -> Optional[Snapshot]:
+        """Find a previous sanitized snapshot of the repository to build on.
+        
+        The snapshot's commit is fetched into the clone so the sanitizer can
+        diff against it.
+        """
+        if self.snapshots is None:
+            return None
+        
+        try:
+            snapshot = await asyncio.to_thread(
+                self.snapshots.latest,
+                context.repo_url,
+                self.sanitizer.pattern_matcher.ruleset_version,
+                True,
+            )
+        except Exception as e:
+            logger.warning("Failed to load sanitized snapshot", error=str(e))
+            return None
+        
+        if snapshot is None:
+            return None
+        
+        if not await self.git_service.fetch_commit(context.original_repo_path, snapshot.commit):
+            return None
+        
+        return snapshot
+    
+    async def _save_snapshot(
+        self,
+        context: OrchestrationContext,
+        commit: Optional[str],
+        report: SanitizationReport,
+    ) -> None:
+        """Keep the sanitized repository as a snapshot for later incremental runs."""
+        if self.snapshots is None or not commit:
+            return
+        
+        try:
+            await asyncio.to_thread(
+                self.snapshots.save,
+                context.repo_url,
+                commit,
+                Path(context.sanitized_repo_path),
+                report,
+                self.sanitizer.pattern_matcher.ruleset_version,
+                True,
+            )
+        except Exception as e:
+            logger.warning("Failed to save sanitized snapshot", error=str(e))
+    
     async def _run_detective(self, context: OrchestrationContext) -> bool:
         """Run the Detective agent."""
         await self._update_status(
@@ -374,6 +439,8 @@ class Orchestrator:
                 logs=context.logs,
                 stack_trace=context.stack_trace,
                 ci_output=context.ci_output,
+                repository=context.repo_url,
+                git_repo_path=context.original_repo_path,
             ),
             incident_id=context.incident_id,
         )
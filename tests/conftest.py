@@ -0,0 +1,28 @@
+"""Shared test fixtures and helpers."""
+
+import subprocess
+
+import pytest
+
+from config.settings import get_settings
+
+
+@pytest.fixture(autouse=True)
+def isolated_directories(tmp_path_factory, monkeypatch):
+    """Point every directory setting at a fresh temporary directory.
+
+    Caches, indexes, snapshots, mirrors and clones otherwise default to
+    shared paths under /tmp that would outlive the test run.
+    """
+    settings = get_settings()
+    for name in type(settings).model_fields:
+        if name.endswith("_DIR"):
+            monkeypatch.setattr(settings, name, str(tmp_path_factory.mktemp(name.lower())))
+
+
+def git(repo, *args):
+    """Run a git command in a test repository as a test identity, returning its output."""
+    return subprocess.run(
+        ["git", "-c", "user.email=test@example.com", "-c", "user.name=Test", *args],
+        cwd=repo, check=True, capture_output=True, text=True,
+    ).stdout.strip()
@@ -1,9 +1,19 @@
 """Tests for the Detective agent."""
 
+import asyncio
+import subprocess
+from array import array
+
 import pytest
 
+from agents.agent_1_detective.blame import BlameCache, BlameEngine, FileBlame
+from agents.agent_1_detective.fingerprint import ErrorIndex, normalize_message
+from agents.agent_1_detective.git_runner import GitCommandError, GitRunner
+from agents.agent_1_detective.history_index import HistoryIndex
 from agents.agent_1_detective.log_parser import LogParser
+from agents.agent_1_detective.log_tokenizer import MAX_LINE_CHARS
 from agents.agent_1_detective.diff_analyzer import DiffAnalyzer
+from tests.conftest import git
 
 
 class TestLogParser:
@@ -96,6 +106,169 @@ TypeError: Cannot read property 'foo' of undefined
         assert errors[0].message == "Database connection failed"
         assert errors[0].line_number == 42
     
+    def test_stream_matches_parse(self, parser):
+        """Streaming should find the same errors however the log is chunked."""
+        logs = """
+2024-01-15 10:30:45 ERROR: request failed
+Traceback (most recent call last):
+  File "/usr/lib/python3.11/site-packages/flask/app.py", line 80, in wsgi_app
+    response = self.full_dispatch_request()
+  File "/app/views.py", line 12, in index
+    return render(user.name)
+AttributeError: 'NoneType' object has no attribute 'name'
+"""
+        expected = parser.parse(logs)
+        
+        for size in (1, 7, 64, len(logs)):
+            chunks = [logs[i:i + size] for i in range(0, len(logs), size)]
+            assert list(parser.parse_stream(chunks)) == expected
+    
+    def test_stream_attaches_frames_to_nearest_error(self, parser):
+        """Each error should get the frames directly around it."""
+        logs = """
+TypeError: Cannot read property 'foo' of undefined
+    at processData (/app/src/handler.js:45:12)
+ValueError: bare error without a traceback
+Traceback (most recent call last):
+  File "/app/b.py", line 20, in func_b
+    raise KeyError("Missing key")
+KeyError: 'Missing key'
+RangeError: Invalid array length
+    at grow (/app/node_modules/lib/buffer.js:3:1)
+"""
+        errors = list(parser.parse_stream(iter(logs.splitlines(keepends=True))))
+        
+        assert [(e.error_type, e.file_path, e.line_number) for e in errors] == [
+            ("TypeError", "app/src/handler.js", 45),
+            ("ValueError", None, None),
+            ("KeyError", "/app/b.py", 20),
+            ("RangeError", "app/node_modules/lib/buffer.js", 3),
+        ]
+        assert "handler.js" not in errors[2].stack_trace
+    
+    def test_stream_generic_fallback_and_long_lines(self, parser):
+        """Generic errors are reported only without structured ones; lines are capped."""
+        logs = ["x" * (3 * MAX_LINE_CHARS), "\nERROR: disk full\nERROR: disk full\n"]
+        
+        errors = list(parser.parse_stream(logs))
+        
+        assert [e.message for e in errors] == ["disk full"]
+    
+    def test_bare_error_needs_frames(self, parser):
+        """A bare "Error:" line without frames is a generic error, not a JS error."""
+        logs = (
+            "2024-01-15T10:30:45.1234567Z ERROR: tests failed in app/test_api.py:12\n"
+            "2024-01-15T10:30:46.1234567Z Error: Process completed with exit code 1.\n"
+        )
+        
+        errors = list(parser.parse_stream([logs]))
+        
+        assert [(e.error_type, e.message) for e in errors] == [
+            ("Error", "tests failed in app/test_api.py:12"),
+            ("Error", "Process completed with exit code 1."),
+        ]
+        assert errors[0].file_path == "app/test_api.py"
+        assert not any(e.stack_trace for e in errors)
+    
+    async def test_async_stream(self, parser):
+        """The async API should yield the same errors as the sync one."""
+        logs = "Error: boom\n    at run (/srv/app.js:1:2)\n"
+        
+        async def chunks():
+            for line in logs.splitlines(keepends=True):
+                yield line
+        
+        errors = [e async for e in parser.aparse_stream(chunks())]
+        
+        assert errors == list(parser.parse_stream([logs]))
+        assert errors[0].file_path == "srv/app.js"
+    
+    @pytest.mark.parametrize("log, expected", [
+        (
+            """Exception in thread "main" java.lang.IllegalStateException: order failed
+\tat com.acme.shop.Orders.total(Orders.java:42)
+Caused by: java.lang.ArithmeticException: / by zero
+\tat java.base/java.math.BigDecimal.divide(BigDecimal.java:1800)
+\tat com.acme.shop.Price$Calc.ratio(Price.java:17)
+\t... 2 more
+""",
+            [
+                ("java.lang.IllegalStateException", "com/acme/shop/Orders.java", 42),
+                ("java.lang.ArithmeticException", "com/acme/shop/Price.java", 17),
+            ],
+        ),
+        (
+            """panic: runtime error: index out of range [5] with length 3
+
+goroutine 7 [running]:
+github.com/acme/shop.(*Cart).Total(...)
+\t/usr/local/go/src/runtime/panic.go:914 +0x21f
+github.com/acme/shop.TestTotal(0x0?)
+\t/home/runner/work/shop/cart.go:31 +0x1d
+
+goroutine 1 [chan receive]:
+main.main()
+\t/home/runner/work/shop/main.go:5 +0x1
+./cart.go:12:5: undefined: totl
+    cart_test.go:20: got 3, want 4
+""",
+            [
+                ("panic", "/home/runner/work/shop/cart.go", 31),
+                ("CompileError", "./cart.go", 12),
+                ("TestFailure", "cart_test.go", 20),
+            ],
+        ),
+        (
+            """error[E0425]: cannot find value `totl` in this scope
+ --> src/cart.rs:12:5
+  |
+12 |     totl
+  |     ^^^^ not found in this scope
+
+error: could not compile `shop` (lib) due to 1 previous error
+thread 'main' panicked at src/main.rs:5:9:
+index out of bounds: the len is 3 but the index is 5
+note: run with `RUST_BACKTRACE=1` environment variable to display a backtrace
+""",
+            [
+                ("CompileError", "src/cart.rs", 12),
+                ("panic", "src/main.rs", 5),
+            ],
+        ),
+    ])
+    def test_parse_other_languages(self, parser, log, expected):
+        """Java, Go and Rust errors should be located in application code."""
+        errors = parser.parse(log)
+        
+        assert [(e.error_type, e.file_path, e.line_number) for e in errors] == expected
+    
+    def test_parse_chained_python_exceptions(self, parser):
+        """Each exception in a chain gets its own frames and the chain's text."""
+        prefix = "2024-05-02T10:14:03.1234567Z "
+        logs = "\n".join(prefix + line for line in [
+            "Traceback (most recent call last):",
+            '  File "/app/config.py", line 8, in load',
+            '    return settings["db"]',
+            "KeyError: 'db'",
+            "",
+            "The above exception was the direct cause of the following exception:",
+            "",
+            "Traceback (most recent call last):",
+            '  File "/app/main.py", line 3, in <module>',
+            "    load()",
+            '  File "/app/config.py", line 10, in load',
+            '    raise ConfigError("missing db") from e',
+            "app.errors.ConfigError: missing db",
+        ])
+        
+        cause, error = parser.parse(logs)
+        
+        assert (cause.error_type, cause.line_number) == ("KeyError", 8)
+        assert (error.error_type, error.message) == ("app.errors.ConfigError", "missing db")
+        assert (error.file_path, error.line_number) == ("/app/config.py", 10)
+        assert "KeyError: 'db'" in error.stack_trace
+        assert prefix not in error.stack_trace
+    
     def test_categorize_name_error(self, parser):
         """Should categorize NameError correctly."""
         from models.analysis import ErrorInfo
@@ -121,6 +294,342 @@ TypeError: Cannot read property 'foo' of undefined
         assert category == "timeout"
 
 
+class TestErrorFingerprint:
+    """Tests for error fingerprints and deduplication."""
+    
+    def test_normalize_message_masks_variable_parts(self):
+        """Ids, addresses and numbers should not affect the fingerprint."""
+        assert normalize_message("Timeout after 30s (id 0x7f3a)") == normalize_message(
+            "Timeout after 31s (id 0x91bc)"
+        )
+        assert normalize_message(
+            "job 123e4567-e89b-12d3-a456-426614174000 failed"
+        ) == "job <uuid> failed"
+    
+    def test_repeated_tracebacks_share_fingerprint(self):
+        """The same failure printed twice should fingerprint identically."""
+        trace = (
+            "Traceback (most recent call last):\n"
+            '  File "/app/orders.py", line 12, in total\n'
+            "    return total / count\n"
+            "ZeroDivisionError: division by zero ({n})\n"
+        )
+        other = trace.replace("line 12", "line 14")
+        
+        first, second, third = LogParser().parse(
+            trace.format(n=1) + trace.format(n=2) + other.format(n=3)
+        )
+        
+        assert first.fingerprint == second.fingerprint
+        assert first.fingerprint != third.fingerprint
+    
+    def test_error_index_counts_occurrences(self):
+        """Repeats should collapse into the first error with a count."""
+        from models.analysis import ErrorInfo
+        
+        index = ErrorIndex()
+        for attempt in range(3):
+            index.add(ErrorInfo(
+                error_type="ConnectionError",
+                message=f"attempt {attempt} refused",
+                file_path="app/db.py",
+                line_number=40,
+            ))
+        index.add(ErrorInfo(error_type="KeyError", message="'db'"))
+        
+        errors = index.errors()
+        
+        assert [(e.error_type, e.occurrences) for e in errors] == [
+            ("ConnectionError", 3),
+            ("KeyError", 1),
+        ]
+        assert errors[0].message == "attempt 0 refused"
+
+
+# (message, files) of the commits in `history_repo`, newest first
+HISTORY = [
+    ("Change app", ["app.py", "pkg/mod.py"]),
+    ("Empty", []),
+    ("Initial | setup", ["a b.txt", "app.py"]),
+]
+
+
+@pytest.fixture
+def history_repo(tmp_path):
+    """A repository with the commits in `HISTORY`."""
+    git(tmp_path, "init", "-q")
+    (tmp_path / "app.py").write_text("x = 1\n")
+    (tmp_path / "a b.txt").write_text("notes\n")
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "Initial | setup")
+    git(tmp_path, "commit", "-q", "--allow-empty", "-m", "Empty")
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "mod.py").write_text("y = 2\n")
+    (tmp_path / "app.py").write_text("x = 2\n")
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "Change app")
+    return tmp_path
+
+
+class TestGitRunner:
+    """Tests for the non-blocking git runner."""
+    
+    async def test_run_and_stream(self, history_repo):
+        """Buffered and streamed output should match."""
+        runner = GitRunner(history_repo)
+        
+        output = await runner.run("log", "--format=%s")
+        chunks = [chunk async for chunk in runner.stream("log", "--format=%s", chunk_size=4)]
+        
+        assert output == b"Change app\nEmpty\nInitial | setup\n"
+        assert b"".join(chunks) == output
+        assert max(len(chunk) for chunk in chunks) <= 4
+    
+    async def test_failures(self, history_repo):
+        """Failed and slow commands should be reported, not hang."""
+        runner = GitRunner(history_repo, timeout=0.5)
+        
+        assert await runner.run("log", "no-such-ref") is None
+        assert await runner.run("-c", "alias.wait=!sleep 5", "wait") is None
+        with pytest.raises(GitCommandError, match="exited"):
+            async for _ in runner.stream("log", "no-such-ref"):
+                pass
+        with pytest.raises(GitCommandError, match="timed out"):
+            async for _ in runner.stream("-c", "alias.wait=!sleep 5", "wait"):
+                pass
+
+
+class TestHistoryIndex:
+    """Tests for the persistent per-repository history index."""
+    
+    @pytest.fixture
+    def index(self, tmp_path_factory):
+        index = HistoryIndex(tmp_path_factory.mktemp("history-index") / "index.sqlite")
+        yield index
+        index.close()
+    
+    async def test_matches_git_log(self, history_repo, index):
+        """Candidates should score like the commits read from git log."""
+        analyzer = DiffAnalyzer(str(history_repo))
+        
+        assert await index.update(GitRunner(history_repo))
+        
+        assert len(index) == 3
+        for path in ("app.py", "pkg/mod.py", "a b.txt", "tests/test_app.py"):
+            assert analyzer.find_relevant_changes(path, index=index) == analyzer.find_relevant_changes(path)
+    
+    async def test_incremental_update_and_line_ranges(self, history_repo, index):
+        """New commits should be added with the line ranges they changed."""
+        runner = GitRunner(history_repo)
+        await index.update(runner)
+        (history_repo / "app.py").write_text("x = 2\n" + "".join(f"v{i} = {i}\n" for i in range(40)))
+        git(history_repo, "commit", "-q", "-am", "Add values")
+        (history_repo / "app.py").write_text(
+            (history_repo / "app.py").read_text().replace("v30 = 30", "v30 = 31")
+        )
+        (history_repo / 'odd "name"\t.py').write_text("q = 1\n")
+        git(history_repo, "add", ".")
+        git(history_repo, "commit", "-q", "-m", "Change v30")
+        
+        assert await index.update(runner)
+        
+        assert len(index) == 5
+        near = index.relevant_changes("app.py", 30, depth=10)
+        far = index.relevant_changes("app.py", 1, depth=10)
+        assert (near[0].message, near[0].relevance_score) == ("Change v30", 1.0)
+        assert near[0].files_changed == ["app.py", 'odd "name"\t.py']
+        assert {c.message: c.relevance_score for c in far} == {
+            "Add values": 1.0,
+            "Change app": 1.0,
+            "Initial | setup": 1.0,
+            "Change v30": 0.9,
+        }
+        assert [c.message for c in index.relevant_changes("app.py", depth=1)] == ["Change v30"]
+    
+    async def test_rebuilds_after_rewritten_history(self, history_repo, index):
+        """Commits HEAD no longer reaches should leave the index."""
+        runner = GitRunner(history_repo)
+        (history_repo / "app.py").write_text("x = 3\n")
+        git(history_repo, "commit", "-q", "-am", "Abandoned change")
+        await index.update(runner)
+        git(history_repo, "reset", "-q", "--hard", "HEAD~1")
+        (history_repo / "app.py").write_text("x = 4\n")
+        git(history_repo, "commit", "-q", "-am", "Replacement change")
+        
+        assert await index.update(runner)
+        
+        assert len(index) == 4
+        messages = [c.message for c in index.relevant_changes("app.py", depth=10)]
+        assert "Replacement change" in messages
+        assert "Abandoned change" not in messages
+        assert [c.message for c in index.relevant_changes("app.py", depth=1)] == ["Replacement change"]
+
+
+class TestDetectiveAgent:
+    """Tests for the Detective agent's git analysis."""
+    
+    async def test_blames_failing_lines(self, history_repo):
+        """Failing lines in repository files should be blamed."""
+        from uuid import uuid4
+        
+        from agents.agent_1_detective.detective import DetectiveAgent, DetectiveInput
+        
+        logs = (
+            "Traceback (most recent call last):\n"
+            '  File "app.py", line 1, in <module>\n'
+            "    x = 2\n"
+            "ValueError: bad value\n"
+        )
+        
+        result = await DetectiveAgent().run(
+            DetectiveInput(incident_id=uuid4(), sanitized_repo_path=str(history_repo), logs=logs),
+        )
+        
+        assert result.success
+        (suspect,) = result.output.report.suspected_files
+        assert suspect.path == "app.py"
+        assert any(e.startswith("Line 1 last changed in") and e.endswith("Change app") for e in suspect.evidence)
+        assert result.output.report.recent_changes[0].message == "Change app"
+    
+    async def test_reads_history_from_git_checkout(self, history_repo):
+        """A sanitized copy without .git is analyzed with the original checkout's history."""
+        from uuid import uuid4
+        
+        from agents.agent_1_detective.detective import DetectiveAgent, DetectiveInput
+        
+        # Inside another repository, git would otherwise find that one
+        sanitized = history_repo / "sanitized"
+        sanitized.mkdir()
+        (sanitized / "app.py").write_text("x = 2\n")
+        logs = (
+            "Traceback (most recent call last):\n"
+            '  File "app.py", line 1, in <module>\n'
+            "ValueError: bad value\n"
+        )
+        
+        copy_only = await DetectiveAgent().run(
+            DetectiveInput(incident_id=uuid4(), sanitized_repo_path=str(sanitized), logs=logs),
+        )
+        with_checkout = await DetectiveAgent().run(
+            DetectiveInput(
+                incident_id=uuid4(),
+                sanitized_repo_path=str(sanitized),
+                logs=logs,
+                git_repo_path=str(history_repo),
+            ),
+        )
+        
+        assert copy_only.success
+        assert copy_only.output.report.recent_changes == []
+        assert not any(e.startswith("Line 1") for e in copy_only.output.report.suspected_files[0].evidence)
+        assert with_checkout.output.report.recent_changes[0].message == "Change app"
+        assert any(e.startswith("Line 1 last changed") for e in with_checkout.output.report.suspected_files[0].evidence)
+    
+    @pytest.mark.parametrize("failing", [
+        (BlameEngine, "blame_line"),
+        (DiffAnalyzer, "find_relevant_changes"),
+    ])
+    async def test_history_index_closed_on_failure(self, history_repo, monkeypatch, failing):
+        """The history index is closed even when analysis fails."""
+        from uuid import uuid4
+        
+        from agents.agent_1_detective.detective import DetectiveAgent, DetectiveInput
+        
+        async def fail_async(*args, **kwargs):
+            raise RuntimeError("analysis failed")
+        
+        def fail(*args, **kwargs):
+            raise RuntimeError("analysis failed")
+        
+        cls, name = failing
+        monkeypatch.setattr(cls, name, fail_async if name == "blame_line" else fail)
+        closed = []
+        original_close = HistoryIndex.close
+        def recording_close(index):
+            closed.append(index)
+            original_close(index)
+        monkeypatch.setattr(HistoryIndex, "close", recording_close)
+        logs = (
+            "Traceback (most recent call last):\n"
+            '  File "app.py", line 1, in <module>\n'
+            "ValueError: bad value\n"
+        )
+        
+        result = await DetectiveAgent().run(
+            DetectiveInput(incident_id=uuid4(), sanitized_repo_path=str(history_repo), logs=logs),
+        )
+        
+        assert not result.success
+        assert len(closed) == 1
+
+
+class TestBlameEngine:
+    """Tests for whole-file blame and the shared blame cache."""
+    
+    @pytest.fixture
+    def blamed_repo(self, history_repo):
+        """``app.py`` with lines from three commits and an uncommitted edit."""
+        (history_repo / "app.py").write_text("x = 2\ny = 3\nz = 4\n")
+        git(history_repo, "commit", "-q", "-am", "Add y and z")
+        (history_repo / "app.py").write_text("x = 2\ny = 5\nz = 4\n")
+        git(history_repo, "commit", "-q", "-am", "Change y")
+        (history_repo / "app.py").write_text("x = 2\ny = [REDACTED]\nz = 4\n")
+        return history_repo
+    
+    async def test_lines_match_line_blame(self, blamed_repo):
+        """Every line should be attributed like a single-line blame at HEAD."""
+        engine = BlameEngine(GitRunner(blamed_repo), str(blamed_repo), BlameCache(8))
+        analyzer = DiffAnalyzer(str(blamed_repo))
+        
+        blame = await engine.file_blame("app.py")
+        
+        assert len(blame) == 3
+        assert len(blame.commits) == 3
+        for line in (1, 2, 3):
+            expected = analyzer._parse_blame_output(subprocess.run(
+                ["git", "blame", f"-L{line},{line}", "--porcelain", "HEAD", "--", "app.py"],
+                cwd=blamed_repo, capture_output=True, text=True, check=True,
+            ).stdout)
+            assert blame.commit_for_line(line) == expected
+        assert (await engine.blame_line("app.py", 2)).message == "Change y"
+        assert await engine.blame_line("app.py", 4) is None
+        assert await engine.blame_line("missing.py", 1) is None
+    
+    async def test_blame_shared_across_engines(self, blamed_repo):
+        """Concurrent lookups share one blame; later engines reuse the cache."""
+        class CountingRunner(GitRunner):
+            blames = 0
+            
+            def stream(self, *args, **kwargs):
+                CountingRunner.blames += args[0] == "blame"
+                return super().stream(*args, **kwargs)
+        
+        cache = BlameCache(8)
+        first = BlameEngine(CountingRunner(blamed_repo), "https://example.com/repo.git", cache)
+        second = BlameEngine(CountingRunner(blamed_repo), "https://example.com/repo.git", cache)
+        
+        commits = await asyncio.gather(*(first.blame_line("app.py", line) for line in (1, 2, 3)))
+        again = await second.blame_line("app.py", 3)
+        
+        assert CountingRunner.blames == 1
+        assert again == commits[2]
+        assert [c.message for c in commits] == ["Change app", "Change y", "Add y and z"]
+    
+    def test_cache_evicts_least_recently_used(self):
+        """The cache should keep at most ``max_files`` blames."""
+        cache = BlameCache(2)
+        blame = FileBlame([], array("H"))
+        
+        cache.put(("repo", "c1", "a.py"), blame)
+        cache.put(("repo", "c1", "b.py"), blame)
+        cache.get(("repo", "c1", "a.py"))
+        cache.put(("repo", "c1", "c.py"), blame)
+        
+        assert cache.get(("repo", "c1", "b.py")) is None
+        assert cache.get(("repo", "c1", "a.py")) is blame
+        assert len(cache) == 2
+
+
 class TestDiffAnalyzer:
     """Tests for git diff analysis."""
     
@@ -158,6 +667,46 @@ new file mode 100644
         assert len(files) == 1
         assert files[0].status == "added"
     
+    def test_get_recent_commits_reads_files_from_one_log(self, history_repo):
+        """Commits should carry their changed files, including empty commits."""
+        commits = DiffAnalyzer(str(history_repo)).get_recent_commits(count=10)
+        
+        assert [(c.message, c.files_changed) for c in commits] == HISTORY
+        assert commits[0].author == "Test"
+        assert commits[0].email == "test@example.com"
+    
+    async def test_async_history_and_blame(self, history_repo):
+        """Async counterparts should match the blocking methods."""
+        analyzer = DiffAnalyzer(str(history_repo))
+        
+        commits, blame, missing = await asyncio.gather(
+            analyzer.aget_recent_commits(count=10),
+            analyzer.aget_blame("app.py", 1),
+            analyzer.aget_blame("missing.py", 1),
+        )
+        diffs = await analyzer.aget_diff("HEAD~1", "HEAD", paths=["app.py"])
+        
+        assert [(c.message, c.files_changed) for c in commits] == HISTORY
+        assert blame == analyzer.get_blame("app.py", 1)
+        assert blame.message == "Change app"
+        assert missing is None
+        assert [(d.file_path, d.additions, d.deletions) for d in diffs] == [("app.py", 1, 1)]
+    
+    def test_parse_log_stream_across_chunks(self):
+        """Fields split between reads should be reassembled."""
+        output = (
+            b"\0" + b"a" * 40 + b"\0Ann\0ann@example.com\0" + b"1700000000\0Fix\0\nsrc/x.py\0src/y.py\0"
+            b"\0" + b"b" * 40 + b"\0Bob\0bob@example.com\0" + b"1690000000\0Start\0\nREADME\0"
+        )
+        chunks = [output[i:i + 7] for i in range(0, len(output), 7)]
+        
+        commits = list(DiffAnalyzer("/tmp/fake-repo")._parse_log_stream(chunks))
+        
+        assert [(c.sha[0], c.author, c.files_changed) for c in commits] == [
+            ("a", "Ann", ["src/x.py", "src/y.py"]),
+            ("b", "Bob", ["README"]),
+        ]
+    
     def test_calculate_relatedness_same_dir(self):
         """Files in same directory should have high relatedness."""
         analyzer = DiffAnalyzer("/tmp/fake-repo")